@@ -1,7 +1,8 @@
 // client/src/components/SimulationController.tsx
 import { useState, useEffect, useRef } from 'react';
-import { SimulationState, RenderOptions, Diet, ReproductionStyle, ParticleRules } from '../types/simulation';
+import { SimulationState, SimulationMetadata, RenderOptions, Diet, ReproductionStyle, ParticleRules } from '../types/simulation';
 import SimulationRenderer from './SimulationRenderer';
+import { FrameBuffer } from '../lib/frameBuffer';
 import SpeciesPanel from './SpeciesPanel';
 import StatisticsPanel from './StatisticsPanel';
 
@@ -9,6 +10,10 @@ type SimulationControllerProps = {
     websocketUrl: string;
 };
 
+// Frame rates negotiated with the server for visible and background tabs
+const VISIBLE_FRAME_RATE = 60;
+const HIDDEN_FRAME_RATE = 1;
+
 export default function SimulationController({ websocketUrl }: SimulationControllerProps) {
     const [state, setState] = useState<SimulationState>({
         particles: new Map(),
@@ -34,56 +39,129 @@ export default function SimulationController({ websocketUrl }: SimulationControl
     const [selectedSpecies, setSelectedSpecies] = useState<string | null>(null);
 
     const wsRef = useRef<WebSocket | null>(null);
+    const metadataRef = useRef<SimulationMetadata | null>(null);
+    // Frames arrive at the server's tick rate; the renderer samples between them at display rate
+    const frameBufferRef = useRef(new FrameBuffer());
 
     useEffect(() => {
         wsRef.current = new WebSocket(websocketUrl);
 
+        const requestFrameRate = () => {
+            if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+                wsRef.current.send(JSON.stringify({
+                    type: 'set_frame_rate',
+                    fps: document.hidden ? HIDDEN_FRAME_RATE : VISIBLE_FRAME_RATE
+                }));
+            }
+        };
+
         wsRef.current.onopen = () => {
             setIsConnected(true);
+            requestFrameRate();
             console.log('Connected to simulation server');
         };
 
         wsRef.current.onmessage = (event) => {
             const update = JSON.parse(event.data);
+
+            // Control messages carry no simulation state
+            if (update.type === 'ping') {
+                wsRef.current?.send(JSON.stringify({ type: 'pong' }));
+                return;
+            }
+            if (update.type === 'frame_rate') {
+                return;
+            }
+
+            // Static species data arrives once per metadata version
+            if (update.type === 'metadata') {
+                const previous = metadataRef.current;
+                metadataRef.current = update;
+                // The canvas fits the whole world, so tell the server that is what this client shows;
+                // packs outside every client's viewport are simplified
+                if (!previous || previous.worldWidth !== update.worldWidth || previous.worldHeight !== update.worldHeight) {
+                    wsRef.current?.send(JSON.stringify({
+                        type: 'set_viewport',
+                        viewport: { x: 0, y: 0, width: update.worldWidth, height: update.worldHeight }
+                    }));
+                }
+                return;
+            }
+
+            const metadata = metadataRef.current;
+            if (update.type !== 'frame' || !metadata || metadata.version !== update.metadataVersion) {
+                return;
+            }
+
+            const positions = new Map();
+            const velocities = new Map();
+            Object.entries(update.particles).forEach(([id, particle]: [string, any]) => {
+                positions.set(id, particle.position);
+                velocities.set(id, particle.velocity);
+            });
+            frameBufferRef.current.setWorldSize(metadata.worldWidth, metadata.worldHeight);
+            if (typeof update.serverTime === 'number' && update.tickInterval > 0) {
+                frameBufferRef.current.push({
+                    serverTime: update.serverTime,
+                    tickInterval: update.tickInterval,
+                    positions,
+                    velocities
+                });
+            }
+
             setState(prevState => {
                 const newParticles = new Map();
                 const newSpecies = new Map();
                 const newGroups = new Map();
+                const speciesTable = metadata.species;
 
-                // Update particles
-                if (update.particles) {
-                    Object.entries(update.particles).forEach(([id, particle]: [string, any]) => {
-                        newParticles.set(id, {
-                            ...particle,
-                            position: {
-                                x: particle.position.x,
-                                y: particle.position.y
-                            },
-                            velocity: {
-                                x: particle.velocity.x,
-                                y: particle.velocity.y
-                            }
-                        });
+                // Rebuild full particles from dynamic state plus their species entry
+                Object.entries(update.particles).forEach(([id, particle]: [string, any]) => {
+                    const species = speciesTable[particle.speciesIndex];
+                    newParticles.set(id, {
+                        id,
+                        position: {
+                            x: particle.position.x,
+                            y: particle.position.y
+                        },
+                        velocity: {
+                            x: particle.velocity.x,
+                            y: particle.velocity.y
+                        },
+                        attributes: {
+                            ...particle.attributes,
+                            diet: species.diet,
+                            reproductionStyle: species.reproductionStyle
+                        },
+                        rules: species.baseRules,
+                        speciesId: species.id,
+                        color: particle.color ?? species.color
                     });
-                }
+                });
 
                 // Update species
-                if (update.species) {
-                    Object.entries(update.species).forEach(([id, species]: [string, any]) => {
-                        newSpecies.set(id, species);
+                speciesTable.forEach((species) => {
+                    newSpecies.set(species.id, {
+                        id: species.id,
+                        name: species.name,
+                        color: species.color,
+                        baseRules: species.baseRules,
+                        population: update.populations[species.index] ?? 0,
+                        diet: species.diet,
+                        reproductionStyle: species.reproductionStyle
                     });
-                }
+                });
 
                 // Update groups
-                if (update.groups) {
-                    Object.entries(update.groups).forEach(([id, group]: [string, any]) => {
-                        newGroups.set(id, {
-                            ...group,
-                            memberIds: new Set(group.memberIds),
-                            parentIds: group.parentIds ? new Set(group.parentIds) : undefined
-                        });
+                Object.entries(update.groups).forEach(([id, group]: [string, any]) => {
+                    newGroups.set(id, {
+                        id,
+                        memberIds: new Set(group.memberIds),
+                        speciesId: speciesTable[group.speciesIndex].id,
+                        parentIds: group.parentIds ? new Set(group.parentIds) : undefined,
+                        childId: group.childId ?? undefined
                     });
-                }
+                });
 
                 return {
                     ...prevState,
@@ -91,14 +169,15 @@ export default function SimulationController({ websocketUrl }: SimulationControl
                     species: newSpecies,
                     groups: newGroups,
                     tickCount: update.tickCount,
-                    worldWidth: update.worldWidth,
-                    worldHeight: update.worldHeight
+                    worldWidth: metadata.worldWidth,
+                    worldHeight: metadata.worldHeight
                 };
             });
         };
 
         wsRef.current.onclose = () => {
             setIsConnected(false);
+            frameBufferRef.current.clear();
             console.log('Disconnected from simulation server');
         };
 
@@ -106,7 +185,10 @@ export default function SimulationController({ websocketUrl }: SimulationControl
             console.error('WebSocket error:', error);
         };
 
+        document.addEventListener('visibilitychange', requestFrameRate);
+
         return () => {
+            document.removeEventListener('visibilitychange', requestFrameRate);
             if (wsRef.current) {
                 wsRef.current.close();
             }
@@ -167,6 +249,7 @@ export default function SimulationController({ websocketUrl }: SimulationControl
                         <div className="relative w-full h-full">
                             <SimulationRenderer
                                 state={state}
+                                frameBuffer={frameBufferRef.current}
                                 options={options}
                                 width={state.worldWidth}
                                 height={state.worldHeight}
@@ -1,9 +1,12 @@
 // client/src/components/SimulationRenderer.tsx
 import React, { useRef, useEffect } from 'react';
-import { SimulationState, RenderOptions, Particle } from '../types/simulation';
+import { SimulationState, RenderOptions, Particle, Position } from '../types/simulation';
+import { FrameBuffer } from '../lib/frameBuffer';
 
 interface SimulationRendererProps {
   state: SimulationState;
+  // Positions between received frames; particles missing from it are drawn where the last frame put them
+  frameBuffer?: FrameBuffer;
   options: RenderOptions;
   width: number;
   height: number;
@@ -11,6 +14,7 @@ interface SimulationRendererProps {
 
 const SimulationRenderer: React.FC<SimulationRendererProps> = ({
   state,
+  frameBuffer,
   options,
   width,
   height
@@ -19,6 +23,7 @@ const SimulationRenderer: React.FC<SimulationRendererProps> = ({
   const requestIdRef = useRef<number>();
   const stateRef = useRef(state);
   const optionsRef = useRef(options);
+  const frameBufferRef = useRef(frameBuffer);
   
   // Update refs when props change
   useEffect(() => {
@@ -29,6 +34,10 @@ const SimulationRenderer: React.FC<SimulationRendererProps> = ({
     optionsRef.current = options;
   }, [options]);
 
+  useEffect(() => {
+    frameBufferRef.current = frameBuffer;
+  }, [frameBuffer]);
+
   useEffect(() => {
     const canvas = canvasRef.current;
     if (!canvas) return;
@@ -110,6 +119,8 @@ const SimulationRenderer: React.FC<SimulationRendererProps> = ({
 
       const currentState = stateRef.current;
       const currentOptions = optionsRef.current;
+      const positions = frameBufferRef.current?.sample() ?? null;
+      const positionOf = (particle: Particle) => positions?.get(particle.id) ?? particle.position;
 
       // Draw grid if enabled (with reduced opacity for performance)
       if (currentOptions.showGrid && frameCount % 2 === 0) {
@@ -120,19 +131,19 @@ const SimulationRenderer: React.FC<SimulationRendererProps> = ({
       // First draw all plants
       for (const particle of currentState.particles.values()) {
         if (particle.rules.particleType === 'plant') {
-          drawPlant(ctx, particle, currentOptions);
+          drawPlant(ctx, particle, positionOf(particle), currentOptions);
         }
       }
 
       // Then draw all groups
       if (currentOptions.showGroups) {
-        drawGroups(ctx, currentState);
+        drawGroups(ctx, currentState, positionOf);
       }
 
       // Finally draw all creatures
       for (const particle of currentState.particles.values()) {
         if (particle.rules.particleType === 'creature') {
-          drawParticle(ctx, particle, currentOptions);
+          drawParticle(ctx, particle, positionOf(particle), currentOptions);
         }
       }
 
@@ -190,7 +201,8 @@ const drawGrid = (
 
 const drawGroups = (
   ctx: CanvasRenderingContext2D,
-  state: SimulationState
+  state: SimulationState,
+  positionOf: (particle: Particle) => Position
 ) => {
   for (const group of state.groups.values()) {
     const members = Array.from(group.memberIds)
@@ -207,8 +219,10 @@ const drawGroups = (
     // Draw lines between all members
     for (let i = 0; i < members.length; i++) {
       for (let j = i + 1; j < members.length; j++) {
-        ctx.moveTo(members[i].position.x, members[i].position.y);
-        ctx.lineTo(members[j].position.x, members[j].position.y);
+        const from = positionOf(members[i]);
+        const to = positionOf(members[j]);
+        ctx.moveTo(from.x, from.y);
+        ctx.lineTo(to.x, to.y);
       }
     }
 
@@ -220,9 +234,10 @@ const drawGroups = (
 const drawParticle = (
   ctx: CanvasRenderingContext2D,
   particle: Particle,
+  position: Position,
   options: RenderOptions
 ) => {
-  const { position, attributes, color } = particle;
+  const { attributes, color } = particle;
   const radius = attributes.size * options.particleScale;
 
   // Draw vision range if enabled
@@ -318,9 +333,10 @@ const drawParticle = (
 const drawPlant = (
   ctx: CanvasRenderingContext2D,
   plant: Particle,
+  position: Position,
   options: RenderOptions
 ) => {
-  const { position, attributes, color } = plant;
+  const { attributes, color } = plant;
   const radius = attributes.size * options.particleScale;
 
   // Draw plant body
@@ -0,0 +1,134 @@
+import { Position, Velocity } from '../types/simulation';
+
+// Positions of one received frame, stamped with the server's tick time in seconds
+export interface BufferedFrame {
+  serverTime: number;
+  tickInterval: number;
+  positions: Map<string, Position>;
+  velocities: Map<string, Velocity>;
+}
+
+// Frames kept for interpolation; two bracket the render time, the rest absorb jitter
+const MAX_FRAMES = 4;
+
+// Never extrapolate further than this many tick intervals past the newest frame
+const MAX_EXTRAPOLATION_TICKS = 1;
+
+// Velocities are distances per 1/60 s whatever the server's tick rate
+const VELOCITY_RATE = 60;
+
+/**
+ * Buffers recent frames and samples particle positions at any local time, so the canvas
+ * can draw at display rate while the server ticks (and sends frames) more slowly.
+ * Rendering runs one frame spacing behind the server and interpolates between the two
+ * frames around that time, extrapolating with velocity when the next frame is late.
+ */
+export class FrameBuffer {
+  private frames: BufferedFrame[] = [];
+  // Smallest (local clock - server clock) seen, i.e. the offset of the least delayed frame
+  private clockOffset = Infinity;
+
+  constructor(private worldWidth = 0, private worldHeight = 0) {}
+
+  setWorldSize(width: number, height: number) {
+    this.worldWidth = width;
+    this.worldHeight = height;
+  }
+
+  push(frame: BufferedFrame, receivedAt: number = performance.now()) {
+    const newest = this.frames[this.frames.length - 1];
+    if (newest && frame.serverTime <= newest.serverTime) {
+      // A restarted or replaced simulation starts a new timeline
+      if (frame.serverTime < newest.serverTime) {
+        this.clear();
+      } else {
+        return;
+      }
+    }
+    this.clockOffset = Math.min(this.clockOffset, receivedAt / 1000 - frame.serverTime);
+    this.frames.push(frame);
+    if (this.frames.length > MAX_FRAMES) {
+      this.frames.shift();
+    }
+  }
+
+  clear() {
+    this.frames = [];
+    this.clockOffset = Infinity;
+  }
+
+  // Interpolated positions for the given local time (performance.now() milliseconds)
+  sample(now: number = performance.now()): Map<string, Position> | null {
+    const count = this.frames.length;
+    if (count === 0) return null;
+    const newest = this.frames[count - 1];
+    if (count === 1) return newest.positions;
+
+    // Stay one frame spacing behind so there is usually a frame on either side
+    const spacing = Math.max(newest.tickInterval, newest.serverTime - this.frames[count - 2].serverTime);
+    const renderTime = now / 1000 - this.clockOffset - spacing;
+
+    if (renderTime >= newest.serverTime) {
+      const ahead = Math.min(renderTime - newest.serverTime, newest.tickInterval * MAX_EXTRAPOLATION_TICKS);
+      return this.extrapolate(newest, ahead);
+    }
+
+    let index = count - 1;
+    while (index > 0 && this.frames[index - 1].serverTime > renderTime) {
+      index--;
+    }
+    if (index === 0) return this.frames[0].positions;
+
+    const from = this.frames[index - 1];
+    const to = this.frames[index];
+    const alpha = (renderTime - from.serverTime) / (to.serverTime - from.serverTime);
+    return this.interpolate(from, to, alpha);
+  }
+
+  private interpolate(from: BufferedFrame, to: BufferedFrame, alpha: number) {
+    const positions = new Map<string, Position>();
+    for (const [id, end] of to.positions) {
+      const start = from.positions.get(id);
+      if (!start) {
+        // Spawned since the previous frame
+        positions.set(id, end);
+        continue;
+      }
+      positions.set(id, this.wrap({
+        x: start.x + this.shortestDelta(end.x - start.x, this.worldWidth) * alpha,
+        y: start.y + this.shortestDelta(end.y - start.y, this.worldHeight) * alpha
+      }));
+    }
+    return positions;
+  }
+
+  private extrapolate(frame: BufferedFrame, seconds: number) {
+    if (seconds <= 0) return frame.positions;
+    const ticks = seconds * VELOCITY_RATE;
+    const positions = new Map<string, Position>();
+    for (const [id, position] of frame.positions) {
+      const velocity = frame.velocities.get(id);
+      positions.set(id, velocity ? this.wrap({
+        x: position.x + velocity.x * ticks,
+        y: position.y + velocity.y * ticks
+      }) : position);
+    }
+    return positions;
+  }
+
+  // The world wraps, so a particle crossing an edge moves the short way round
+  private shortestDelta(delta: number, size: number) {
+    if (size <= 0) return delta;
+    if (delta > size / 2) return delta - size;
+    if (delta < -size / 2) return delta + size;
+    return delta;
+  }
+
+  private wrap(position: Position): Position {
+    const { worldWidth, worldHeight } = this;
+    return {
+      x: worldWidth > 0 ? ((position.x % worldWidth) + worldWidth) % worldWidth : position.x,
+      y: worldHeight > 0 ? ((position.y % worldHeight) + worldHeight) % worldHeight : position.y
+    };
+  }
+}
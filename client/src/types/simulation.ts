@@ -20,14 +20,14 @@ export interface ParticleAttributes {
   hunger: number;
   size: number;
   age: number;
-  lastReproduced: number;
-  lastAte: number;
+  lastReproduced?: number;
+  lastAte?: number;
   diet: Diet;
   reproductionStyle: ReproductionStyle;
   packMentality: number;
-  highEnergyHungerTime: number;
-  meetingCount: Record<string, number>;
-  groupId?: string;
+  highEnergyHungerTime?: number;
+  meetingCount?: Record<string, number>;
+  groupId?: string | null;
   isChild: boolean;
   timeInGroup: number;
 }
@@ -78,6 +78,25 @@ export interface SimulationState {
   tickCount: number;
 }
 
+// Static species entry sent in versioned metadata messages
+export interface SpeciesMetadata {
+  index: number;
+  id: string;
+  name: string;
+  color: string;
+  baseRules: ParticleRules;
+  diet: Diet;
+  reproductionStyle: ReproductionStyle;
+}
+
+export interface SimulationMetadata {
+  type: 'metadata';
+  version: number;
+  species: SpeciesMetadata[];
+  worldWidth: number;
+  worldHeight: number;
+}
+
 export interface RenderOptions {
   showGrid: boolean;
   showVision: boolean;
@@ -0,0 +1,101 @@
+# server/app/host/frame_ring.py
+import mmap
+import os
+import struct
+from typing import Optional, Tuple
+
+RING_MAGIC = b"GOLRING1"
+# Ring header: magic, slot count, payload bytes per slot, latest committed sequence
+RING_HEADER = struct.Struct("<8sIIQ")
+# Slot header: sequence (odd while being written), metadata version, payload length
+SLOT_HEADER = struct.Struct("<QQQ")
+LATEST_OFFSET = RING_HEADER.size - 8
+
+class FrameRingWriter:
+    """Publishes each encoded frame once into a memory-mapped file every web worker maps too,
+    instead of writing a copy down every worker's socket"""
+    def __init__(self, path: str, slot_count: int = 4, slot_size: int = 16 * 1024 * 1024):
+        self.path = path
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self._sequence = 0
+        # Built under a temporary name so a worker never maps a half-initialized ring
+        temporary = path + ".tmp"
+        self._file = open(temporary, "w+b")
+        self._file.truncate(RING_HEADER.size + slot_count * (SLOT_HEADER.size + slot_size))
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        RING_HEADER.pack_into(self._map, 0, RING_MAGIC, slot_count, slot_size, 0)
+        os.replace(temporary, path)
+
+    def write(self, frame: str, metadata_version: int) -> bool:
+        """Commit a frame to the next slot; False if it doesn't fit, in which case readers are
+        told that tick went over the socket"""
+        data = frame.encode("utf-8")
+        fits = len(data) <= self.slot_size
+        self._sequence += 1
+        offset = RING_HEADER.size + (self._sequence % self.slot_count) * (SLOT_HEADER.size + self.slot_size)
+        committed = self._sequence * 2
+
+        # An odd sequence tells readers the slot is being rewritten
+        SLOT_HEADER.pack_into(self._map, offset, committed - 1, metadata_version, 0)
+        length = 0
+        if fits:
+            start = offset + SLOT_HEADER.size
+            self._map[start:start + len(data)] = data
+            length = len(data)
+        SLOT_HEADER.pack_into(self._map, offset, committed, metadata_version, length)
+        struct.pack_into("<Q", self._map, LATEST_OFFSET, self._sequence)
+        return fits
+
+    def close(self):
+        """Unmap and remove the ring; workers fall back to socket frames when they reconnect"""
+        self._map.close()
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+class FrameRingReader:
+    """A web worker's read-only mapping of the host's frame ring"""
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self._file.close()
+            raise
+        if len(self._map) < RING_HEADER.size or self._map[:len(RING_MAGIC)] != RING_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a frame ring")
+        _, self.slot_count, self.slot_size, _ = RING_HEADER.unpack_from(self._map, 0)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def read(self, after: int) -> Optional[Tuple[int, int, Optional[str]]]:
+        """(sequence, metadata version, frame) of the newest frame committed after sequence
+        `after`, with frame None for a tick too big for a slot; None if there is nothing newer
+        or the writer was rewriting that slot"""
+        (sequence,) = struct.unpack_from("<Q", self._map, LATEST_OFFSET)
+        if sequence <= after:
+            return None
+        offset = RING_HEADER.size + (sequence % self.slot_count) * (SLOT_HEADER.size + self.slot_size)
+        committed, metadata_version, length = SLOT_HEADER.unpack_from(self._map, offset)
+        if committed != sequence * 2:
+            return None  # Lapped by the writer; the next poll sees a newer frame
+        frame = None
+        if length:
+            start = offset + SLOT_HEADER.size
+            # Decoding straight from the mapping is the only copy the worker makes
+            try:
+                with memoryview(self._map) as view, view[start:start + length] as payload:
+                    frame = str(payload, "utf-8")
+            except UnicodeDecodeError:
+                return None  # Torn by a concurrent rewrite
+            (recheck,) = struct.unpack_from("<Q", self._map, offset)
+            if recheck != committed:
+                return None  # Rewritten while we were decoding it
+        return sequence, metadata_version, frame
@@ -0,0 +1,220 @@
+# server/app/host/links.py
+import asyncio
+import json
+from typing import Dict, List, Optional, Tuple
+
+from app.simulation.simulation_manager import SimulationManager
+from app.simulation.commands import apply_command, answer_query
+from app.simulation.seed import initialize_simulation
+from .frame_ring import FrameRingReader
+from .protocol import (
+    encode_message, pack_message, read_message,
+    KIND_METADATA, KIND_FRAME, KIND_STATUS, KIND_COMMAND, KIND_QUERY, KIND_ANSWER, KIND_JOIN, KIND_VIEWERS,
+    KIND_CLOSED, KIND_RING
+)
+
+class LocalSimulationLink:
+    """Runs the authoritative simulation inside this process"""
+    def __init__(self, simulation: SimulationManager):
+        self.simulation = simulation
+        self._metadata: Optional[Tuple[int, str]] = None
+        self._frame: Optional[Tuple[Tuple[int, int], str]] = None
+
+    async def start(self):
+        """Restore or seed the simulation, then start it"""
+        initialize_simulation(self.simulation)
+        await self.simulation.start()
+        await self.set_viewers(0)  # Idle until the first client connects
+
+    async def stop(self):
+        """Stop the simulation"""
+        await self.simulation.pause()
+
+    @property
+    def connected(self) -> bool:
+        """The simulation runs in this process, so it is always reachable"""
+        return True
+
+    @property
+    def metadata_version(self) -> int:
+        return self.simulation.metadata_version
+
+    def metadata(self) -> str:
+        """Encoded metadata for the current version"""
+        version = self.simulation.metadata_version
+        if self._metadata is None or self._metadata[0] != version:
+            self._metadata = (version, encode_message(self.simulation.get_metadata()))
+        return self._metadata[1]
+
+    def frame(self) -> Optional[str]:
+        """Encoded frame for the current tick, built at most once per tick"""
+        key = (self.simulation.current_tick, self.simulation.metadata_version)
+        if self._frame is None or self._frame[0] != key:
+            self._frame = (key, encode_message(self.simulation.get_frame()))
+        return self._frame[1]
+
+    def status(self) -> Dict:
+        return self.simulation.get_status()
+
+    async def submit(self, command: Dict):
+        """Apply a client command"""
+        await apply_command(self.simulation, command)
+
+    async def set_viewers(self, count: int, viewports: Optional[List[List[float]]] = None):
+        """Let the simulation slow down or hibernate while nobody watches it, and simplify what
+        its viewers can't see; viewports None means some viewer sees the whole world"""
+        self.simulation.viewports = viewports if count else []
+        if self.simulation.power:
+            await self.simulation.power.set_viewers(count)
+
+    async def query(self, request: Dict) -> str:
+        """Encoded answer to a read-only request"""
+        # Rebuilding a past frame decompresses a whole segment; keep it off the tick loop
+        answer = await asyncio.to_thread(answer_query, self.simulation, request)
+        return encode_message(answer)
+
+class HostSimulationLink:
+    """Relays frames from the simulation host process and forwards commands to it"""
+    def __init__(self, socket_path: str, room: Optional[str] = None, reconnect_delay: float = 1.0,
+                 frame_ring: Optional[str] = None):
+        self.socket_path = socket_path
+        self.room = room  # Named room to relay instead of the default simulation
+        self.reconnect_delay = reconnect_delay
+        # Path of the host's frame ring; the default room's frames are read from it when it can be mapped
+        self.frame_ring = frame_ring
+        self._ring: Optional[FrameRingReader] = None
+        self._ring_sequence = 0
+        # Set once the host says the room is gone; the link then stops reconnecting
+        self.closed: bool = False
+        self.metadata_version: Optional[int] = None
+        self._metadata: Optional[str] = None
+        self._frame: Optional[str] = None
+        self._status: Dict = {"active": False, "species_count": 0, "total_particles": 0}
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._answers: Dict[int, asyncio.Future] = {}
+        self._next_query_id = 0
+        self._viewers = 0
+        self._viewports: Optional[List[List[float]]] = None
+
+    async def start(self):
+        """Connect to the host in the background, reconnecting when it goes away"""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def connected(self) -> bool:
+        """Whether the host connection is currently up"""
+        return self._writer is not None
+
+    def metadata(self) -> Optional[str]:
+        return self._metadata
+
+    def frame(self) -> Optional[str]:
+        if self._ring is not None:
+            update = self._ring.read(self._ring_sequence)
+            # Metadata still comes over the socket; a frame for a newer version waits for it
+            if update is not None and update[1] == self.metadata_version:
+                self._ring_sequence = update[0]
+                if update[2] is not None:  # Otherwise that tick came over the socket
+                    self._frame = update[2]
+        # Frames are useless to clients until the metadata they refer to has arrived
+        return self._frame if self._metadata is not None else None
+
+    def status(self) -> Dict:
+        return self._status
+
+    async def submit(self, command: Dict, timeout: float = 30.0):
+        """Forward a client command to the host and wait until it has been applied,
+        raising ValueError with the host's message if it was rejected"""
+        answer = await self._request(KIND_COMMAND, command, timeout)
+        if answer != "null":
+            raise ValueError(json.loads(answer).get("message", "Command rejected"))
+
+    async def set_viewers(self, count: int, viewports: Optional[List[List[float]]] = None):
+        """Tell the host how many clients this worker relays the room to, and what they show"""
+        self._viewers = count
+        self._viewports = viewports
+        if self._writer is not None:
+            self._writer.write(pack_message(KIND_VIEWERS, 0, encode_message(self._viewer_payload())))
+            await self._writer.drain()
+
+    def _viewer_payload(self) -> Dict:
+        return {"viewers": self._viewers, "viewports": self._viewports}
+
+    async def query(self, request: Dict, timeout: float = 5.0) -> str:
+        """Ask the host a read-only request and wait for its encoded answer"""
+        return await self._request(KIND_QUERY, request, timeout)
+
+    async def _request(self, kind: int, request: Dict, timeout: float) -> str:
+        if self._writer is None:
+            raise ConnectionError("Simulation host is not connected")
+        self._next_query_id = (self._next_query_id + 1) & 0xFFFFFFFF
+        query_id = self._next_query_id
+        answer = asyncio.get_running_loop().create_future()
+        self._answers[query_id] = answer
+        try:
+            self._writer.write(pack_message(kind, query_id, encode_message(request)))
+            await self._writer.drain()
+            return await asyncio.wait_for(answer, timeout)
+        finally:
+            self._answers.pop(query_id, None)
+
+    def _open_ring(self):
+        """Map the host's frame ring and ask the host to stop sending frames over the socket"""
+        if self.frame_ring is None or self.room is not None:
+            return
+        try:
+            self._ring = FrameRingReader(self.frame_ring)
+        except (OSError, ValueError) as e:
+            print(f"Frame ring unavailable, relaying frames over the socket: {e}")
+            return
+        self._ring_sequence = 0
+        self._writer.write(pack_message(KIND_RING, 0, encode_message({})))
+
+    async def _run(self):
+        while True:
+            try:
+                reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+                if self.room is not None:
+                    self._writer.write(pack_message(KIND_JOIN, 0, encode_message({"room": self.room})))
+                self._writer.write(pack_message(KIND_VIEWERS, 0, encode_message(self._viewer_payload())))
+                self._open_ring()
+                while True:
+                    kind, sequence, payload = await read_message(reader)
+                    if kind == KIND_METADATA:
+                        self._metadata = payload
+                        self.metadata_version = sequence
+                    elif kind == KIND_FRAME:
+                        self._frame = payload
+                    elif kind == KIND_STATUS:
+                        self._status = json.loads(payload)
+                    elif kind == KIND_ANSWER:
+                        answer = self._answers.get(sequence)
+                        if answer is not None and not answer.done():
+                            answer.set_result(payload)
+                    elif kind == KIND_CLOSED:
+                        self.closed = True
+                        return
+            except (OSError, asyncio.IncompleteReadError) as e:
+                print(f"Simulation host connection lost: {e}")
+            finally:
+                if self._writer is not None:
+                    self._writer.close()
+                    self._writer = None
+                if self._ring is not None:
+                    # A restarted host builds a new ring; map that one on reconnect
+                    self._ring.close()
+                    self._ring = None
+                for answer in self._answers.values():
+                    if not answer.done():
+                        answer.set_exception(ConnectionError("Simulation host connection lost"))
+            await asyncio.sleep(self.reconnect_delay)
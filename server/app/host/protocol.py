@@ -0,0 +1,41 @@
+# server/app/host/protocol.py
+import asyncio
+import json
+import struct
+from typing import Dict, Tuple
+
+# Every message is a fixed header followed by a UTF-8 JSON payload
+HEADER = struct.Struct(">BII")  # kind, sequence (tick or metadata version), payload length
+
+KIND_METADATA = 1
+KIND_FRAME = 2
+KIND_STATUS = 3
+KIND_COMMAND = 4
+# Request/response pairs share the request id in the sequence field; commands are answered
+# the same way, with null once applied or an error message
+KIND_QUERY = 5
+KIND_ANSWER = 6
+# Sent by a web worker to switch its connection to a named room
+KIND_JOIN = 7
+# Sent by a web worker whenever the clients it relays a room to, or the areas they show, change
+KIND_VIEWERS = 8
+# Sent by the host before it drops a worker whose room doesn't exist (any more)
+KIND_CLOSED = 9
+# Sent by a web worker that reads the default room's frames from the frame ring; the host then
+# stops sending it those frames over the socket
+KIND_RING = 10
+
+def encode_message(message: Dict) -> str:
+    """Encode a message the same way WebSocket.send_json does"""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+def pack_message(kind: int, sequence: int, payload: str) -> bytes:
+    """Frame an encoded payload for the host socket"""
+    data = payload.encode("utf-8")
+    return HEADER.pack(kind, sequence & 0xFFFFFFFF, len(data)) + data
+
+async def read_message(reader: asyncio.StreamReader) -> Tuple[int, int, str]:
+    """Read one framed message, raising IncompleteReadError on disconnect"""
+    kind, sequence, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+    payload = await reader.readexactly(length)
+    return kind, sequence, payload.decode("utf-8")
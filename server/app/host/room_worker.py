@@ -0,0 +1,216 @@
+# server/app/host/room_worker.py
+import asyncio
+import threading
+from collections import deque
+from multiprocessing.connection import Connection
+from typing import Deque, Dict, Optional, Tuple
+
+from app.models.room import RoomConfig
+from app.simulation.simulation_manager import SimulationManager
+from app.simulation.commands import apply_command, answer_query
+from app.simulation.checkpoint import encode_checkpoint, decode_checkpoint
+from app.simulation.seed import seed_initial_species, configure_power
+from .protocol import encode_message
+
+class Outbox:
+    """Sends to the scheduler from a writer thread, so a slow reader never stalls the rooms' tick loops.
+    Other messages go out in order; of each room's frames only the latest unsent one is kept"""
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.superseded: int = 0  # Frames replaced by a newer one before they were sent
+        self._messages: Deque[Tuple] = deque()
+        self._frames: Dict[str, Tuple] = {}
+        self._ready = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="room-outbox", daemon=True)
+        self._thread.start()
+
+    def send(self, message: Tuple):
+        with self._ready:
+            self._messages.append(message)
+            self._ready.notify()
+
+    def send_frame(self, name: str, frame: str):
+        with self._ready:
+            if name in self._frames:
+                self.superseded += 1
+            self._frames[name] = ("frame", name, frame)
+            self._ready.notify()
+
+    def send_metadata(self, name: str, version: int, metadata: str):
+        """Queue a room's new species table; an unsent frame from before it is dropped, the next one follows it"""
+        with self._ready:
+            self._frames.pop(name, None)
+            self._messages.append(("metadata", name, version, metadata))
+            self._ready.notify()
+
+    def discard_frame(self, name: str):
+        with self._ready:
+            self._frames.pop(name, None)
+
+    def close(self, timeout: float = 5.0):
+        """Send what is queued, then stop the writer"""
+        with self._ready:
+            self._closed = True
+            self._ready.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._ready:
+                while not self._messages and not self._frames and not self._closed:
+                    self._ready.wait()
+                if not self._messages and not self._frames:
+                    return
+                batch = list(self._messages) + list(self._frames.values())
+                self._messages.clear()
+                self._frames.clear()
+            try:
+                for message in batch:
+                    self.connection.send(message)
+            except (OSError, ValueError):
+                return  # Scheduler is gone
+
+class RoomWorker:
+    """Runs the rooms the RoomScheduler places on this process and reports what they cost"""
+    def __init__(self, connection: Connection, report_interval: float = 1.0):
+        self.connection = connection
+        self.outbox = Outbox(connection)
+        self.report_interval = report_interval
+        self.rooms: Dict[str, SimulationManager] = {}
+        self._publishers: Dict[str, asyncio.Task] = {}
+        self._inbox: "asyncio.Queue[Optional[Tuple]]" = asyncio.Queue()
+
+    async def serve(self):
+        """Handle scheduler messages until told to stop or the pipe closes"""
+        loop = asyncio.get_running_loop()
+        loop.add_reader(self.connection.fileno(), self._on_readable)
+        reporter = asyncio.create_task(self._report())
+        try:
+            # One message at a time, so a room's commands never overtake its creation
+            while True:
+                message = await self._inbox.get()
+                if message is None or message[0] == "stop":
+                    break
+                try:
+                    await self._handle(message)
+                except Exception as e:
+                    print(f"Room worker failed to handle {message[0]}: {e}")
+        finally:
+            loop.remove_reader(self.connection.fileno())
+            reporter.cancel()
+            for name in list(self.rooms):
+                await self._close_room(name)
+            self.outbox.close()
+
+    def _on_readable(self):
+        try:
+            while self.connection.poll():
+                self._inbox.put_nowait(self.connection.recv())
+        except (EOFError, OSError):
+            self._inbox.put_nowait(None)  # Scheduler is gone
+
+    async def _handle(self, message: Tuple):
+        kind = message[0]
+        if kind == "create":
+            _, config, checkpoint, running = message
+            await self._open_room(RoomConfig(**config), checkpoint, running)
+        elif kind == "remove":
+            _, name, migrate = message
+            simulation = self.rooms.get(name)
+            if simulation is None:
+                return
+            running = simulation.is_running or simulation.power.suspended
+            await self._close_room(name)
+            if migrate:
+                simulation.pack_lod.flush()
+                checkpoint = encode_checkpoint(simulation.state, simulation.metadata_version)
+                self.outbox.send(("evicted", name, checkpoint, running))
+        elif kind == "command":
+            _, name, data = message
+            if name in self.rooms:
+                # Waits for the room's next tick, so don't hold up the other rooms' messages
+                asyncio.create_task(self._run_command(self.rooms[name], data))
+        elif kind == "viewers":
+            _, name, count, viewports = message
+            if name in self.rooms:
+                self.rooms[name].viewports = viewports if count else []
+                await self.rooms[name].power.set_viewers(count)
+        elif kind == "query":
+            _, name, query_id, data = message
+            if name in self.rooms:
+                try:
+                    answer = await asyncio.to_thread(answer_query, self.rooms[name], data)
+                except (ValueError, KeyError) as e:
+                    answer = {"type": "error", "message": str(e)}
+            else:
+                answer = {"type": "error", "message": f"Room {name} not found"}
+            self.outbox.send(("answer", query_id, encode_message(answer)))
+
+    async def _run_command(self, simulation: SimulationManager, data: Dict):
+        try:
+            await apply_command(simulation, data)
+        except Exception as e:
+            print(f"Rejected room command: {e}")
+
+    async def _open_room(self, config: RoomConfig, checkpoint: Optional[bytes], running: bool):
+        simulation = SimulationManager(
+            world_width=config.worldWidth,
+            world_height=config.worldHeight,
+            max_particles=config.maxParticles
+        )
+        simulation.set_tick_rate(config.tickRate)
+        if checkpoint is not None:
+            # Migrated from another worker: pick up exactly where it stopped
+            state, sections = decode_checkpoint(checkpoint)
+            simulation.load_state(state, sections["metadataVersion"])
+        elif config.seedSpecies:
+            seed_initial_species(simulation)
+
+        configure_power(simulation)
+
+        self.rooms[config.name] = simulation
+        if running:
+            await simulation.start()
+        await simulation.power.set_viewers(0)  # Until the scheduler reports viewers
+        self._publishers[config.name] = asyncio.create_task(self._publish(config.name, simulation))
+
+    async def _close_room(self, name: str):
+        simulation = self.rooms.pop(name)
+        publisher = self._publishers.pop(name)
+        publisher.cancel()
+        self.outbox.discard_frame(name)
+        await simulation.pause()
+
+    async def _publish(self, name: str, simulation: SimulationManager):
+        """Send each new frame of a room, and its metadata whenever the species table changes"""
+        last_key = None
+        metadata_version = None
+        while True:
+            key = (simulation.current_tick, simulation.metadata_version)
+            if key != last_key:
+                if simulation.metadata_version != metadata_version:
+                    metadata_version = simulation.metadata_version
+                    self.outbox.send_metadata(name, metadata_version, encode_message(simulation.get_metadata()))
+                self.outbox.send_frame(name, encode_message(simulation.get_frame()))
+                last_key = key
+            await asyncio.sleep(simulation.tick_rate)
+
+    async def _report(self):
+        """Periodically send each room's status and measured load (fraction of one core)"""
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.outbox.send(("report", {
+                name: {
+                    "load": simulation.tick_cost / simulation.tick_rate if simulation.is_running else 0.0,
+                    "status": simulation.get_status()
+                }
+                for name, simulation in self.rooms.items()
+            }))
+
+def run_worker(connection: Connection):
+    """Process entry point for a room worker"""
+    try:
+        asyncio.run(RoomWorker(connection).serve())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,344 @@
+# server/app/host/rooms.py
+import asyncio
+import itertools
+import json
+import multiprocessing
+from typing import Dict, List, Optional, Tuple
+
+from app.models.room import RoomConfig, DEFAULT_ROOM
+from .links import HostSimulationLink
+from .protocol import encode_message
+from .room_worker import run_worker
+
+# Requests that manage rooms rather than act on one
+ROOM_QUERIES = {"rooms", "create_room", "remove_room"}
+
+# Assumed load of a room until its worker has measured it
+ESTIMATED_ROOM_LOAD = 0.05
+
+class RoomLink:
+    """Relays one scheduled room from whichever worker process currently runs it"""
+    def __init__(self, scheduler: "RoomScheduler", config: RoomConfig):
+        self.scheduler = scheduler
+        self.config = config
+        self.metadata_version: Optional[int] = None
+        self.load: float = ESTIMATED_ROOM_LOAD  # Fraction of one core
+        self.worker: Optional["_Worker"] = None
+        self.closed: bool = False
+        self.viewers: int = 0
+        self.viewports: Optional[List[List[float]]] = None
+        self._metadata: Optional[str] = None
+        self._frame: Optional[str] = None
+        self._status: Dict = {"active": False, "species_count": 0, "total_particles": 0}
+        # Set while the room moves between workers; holds commands until it lands
+        self._migrating_to: Optional["_Worker"] = None
+        self._held: List[Tuple] = []
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+    def metadata(self) -> Optional[str]:
+        return self._metadata
+
+    def frame(self) -> Optional[str]:
+        return self._frame if self._metadata is not None else None
+
+    def status(self) -> Dict:
+        return self._status
+
+    async def submit(self, command: Dict):
+        """Forward a client command to the room's worker"""
+        self.scheduler._send_to_room(self, ("command", self.name, command))
+
+    async def set_viewers(self, count: int, viewports: Optional[List[List[float]]] = None):
+        """Let the room slow down or hibernate while nobody watches it, and simplify what its viewers can't see"""
+        self.viewers = count
+        self.viewports = viewports
+        self.scheduler._send_to_room(self, ("viewers", self.name, count, viewports))
+
+    async def query(self, request: Dict, timeout: float = 5.0) -> str:
+        """Ask the room's worker a read-only request and wait for its encoded answer"""
+        return await self.scheduler._query(self, request, timeout)
+
+    def summary(self) -> Dict:
+        return {
+            "name": self.name,
+            "config": self.config.model_dump(),
+            "worker": self.worker.index if self.worker else None,
+            "load": round(self.load, 4),
+            "status": self._status
+        }
+
+class _Worker:
+    """A room worker process and the rooms placed on it"""
+    def __init__(self, index: int, process: multiprocessing.Process, connection):
+        self.index = index
+        self.process = process
+        self.connection = connection
+        self.rooms: Dict[str, RoomLink] = {}
+
+    @property
+    def load(self) -> float:
+        return sum(room.load for room in self.rooms.values())
+
+class RoomScheduler:
+    """Places named rooms on a pool of worker processes and moves them off overloaded workers"""
+    def __init__(self, worker_count: int = 2, max_rooms: int = 16,
+                 rebalance_interval: float = 5.0, overload: float = 0.8):
+        self.worker_count = worker_count
+        self.max_rooms = max_rooms
+        self.rebalance_interval = rebalance_interval
+        self.overload = overload  # Worker load (fraction of one core) that triggers a migration
+        self._rooms: Dict[str, RoomLink] = {}
+        self._workers: List[_Worker] = []
+        self._answers: Dict[int, asyncio.Future] = {}
+        self._query_ids = itertools.count(1)
+        self._rebalancer: Optional[asyncio.Task] = None
+        # Spawned rather than forked so workers don't inherit the web server's event loop
+        self._context = multiprocessing.get_context("spawn")
+
+    async def start(self):
+        """Begin rebalancing; worker processes start with the first room"""
+        self._rebalancer = asyncio.create_task(self._rebalance_loop())
+
+    async def stop(self):
+        """Stop every room and worker process"""
+        if self._rebalancer:
+            self._rebalancer.cancel()
+            self._rebalancer = None
+        loop = asyncio.get_running_loop()
+        for worker in self._workers:
+            loop.remove_reader(worker.connection.fileno())
+            try:
+                worker.connection.send(("stop",))
+            except OSError:
+                pass
+        for worker in self._workers:
+            await asyncio.to_thread(worker.process.join, 5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.connection.close()
+        self._workers = []
+        for room in self._rooms.values():
+            room.closed = True
+        self._rooms = {}
+
+    async def link(self, name: str) -> Optional[RoomLink]:
+        return self._rooms.get(name)
+
+    async def query(self, data: Dict) -> Dict:
+        """Answer a room management request"""
+        try:
+            if data["type"] == "rooms":
+                return {"type": "rooms", "rooms": self.list_rooms()}
+            elif data["type"] == "create_room":
+                room = self.create_room(RoomConfig(**data["room"]))
+                return {"type": "room", **room.summary()}
+            elif data["type"] == "remove_room":
+                self.remove_room(data["name"])
+                return {"type": "room_removed", "name": data["name"]}
+            raise ValueError(f"Unknown room request {data['type']}")
+        except (ValueError, KeyError, OSError) as e:
+            return {"type": "error", "message": str(e)}
+
+    def list_rooms(self) -> List[Dict]:
+        return [room.summary() for room in self._rooms.values()]
+
+    def create_room(self, config: RoomConfig) -> RoomLink:
+        """Start a room on the least loaded worker"""
+        if config.name == DEFAULT_ROOM or config.name in self._rooms:
+            raise ValueError(f"Room {config.name} already exists")
+        if len(self._rooms) >= self.max_rooms:
+            raise ValueError("Room limit reached")
+        self._ensure_workers()
+
+        room = RoomLink(self, config)
+        worker = min(self._workers, key=lambda worker: worker.load)
+        self._place(room, worker, None, True)
+        self._rooms[config.name] = room
+        return room
+
+    def remove_room(self, name: str):
+        """Stop a room and discard its world"""
+        if name not in self._rooms:
+            raise ValueError(f"Room {name} not found")
+        room = self._rooms.pop(name)
+        room.closed = True
+        if room._migrating_to is None:
+            room.worker.rooms.pop(name, None)
+            room.worker.connection.send(("remove", name, False))
+
+    def rebalance(self):
+        """Move one room off the busiest worker if it is overloaded and another has headroom"""
+        if len(self._workers) < 2 or any(room._migrating_to for room in self._rooms.values()):
+            return
+        busiest = max(self._workers, key=lambda worker: worker.load)
+        idlest = min(self._workers, key=lambda worker: worker.load)
+        if busiest.load <= self.overload:
+            return
+        gap = busiest.load - idlest.load
+        candidates = [room for room in busiest.rooms.values() if 0 < room.load < gap]
+        if not candidates:
+            return
+        # The room closest to half the gap evens the two workers out the most
+        room = min(candidates, key=lambda room: abs(gap / 2 - room.load))
+        print(f"Moving room {room.name} from worker {busiest.index} to worker {idlest.index}")
+        room._migrating_to = idlest
+        busiest.rooms.pop(room.name)
+        busiest.connection.send(("remove", room.name, True))
+
+    async def _rebalance_loop(self):
+        while True:
+            await asyncio.sleep(self.rebalance_interval)
+            try:
+                self.rebalance()
+            except OSError as e:
+                print(f"Room rebalance failed: {e}")
+
+    def _ensure_workers(self):
+        while len(self._workers) < self.worker_count:
+            self._workers.append(self._spawn_worker(len(self._workers)))
+
+    def _spawn_worker(self, index: int) -> _Worker:
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=run_worker, args=(child,), name=f"room-worker-{index}", daemon=True
+        )
+        process.start()
+        child.close()
+        worker = _Worker(index, process, parent)
+        asyncio.get_running_loop().add_reader(parent.fileno(), self._on_readable, worker)
+        return worker
+
+    def _place(self, room: RoomLink, worker: _Worker, checkpoint: Optional[bytes], running: bool):
+        room.worker = worker
+        worker.rooms[room.name] = room
+        worker.connection.send(("create", room.config.model_dump(), checkpoint, running))
+        worker.connection.send(("viewers", room.name, room.viewers, room.viewports))
+
+    def _send_to_room(self, room: RoomLink, message: Tuple):
+        if room.closed:
+            raise ValueError(f"Room {room.name} was removed")
+        if room._migrating_to is not None:
+            room._held.append(message)
+        else:
+            room.worker.connection.send(message)
+
+    async def _query(self, room: RoomLink, request: Dict, timeout: float) -> str:
+        if room._migrating_to is not None:
+            return encode_message({"type": "error", "message": f"Room {room.name} is moving, try again"})
+        query_id = next(self._query_ids) & 0xFFFFFFFF
+        answer = asyncio.get_running_loop().create_future()
+        self._answers[query_id] = answer
+        try:
+            self._send_to_room(room, ("query", room.name, query_id, request))
+            return await asyncio.wait_for(answer, timeout)
+        finally:
+            self._answers.pop(query_id, None)
+
+    def _on_readable(self, worker: _Worker):
+        try:
+            while worker.connection.poll():
+                self._handle(worker, worker.connection.recv())
+        except (EOFError, OSError):
+            self._replace_worker(worker)
+
+    def _handle(self, worker: _Worker, message: Tuple):
+        kind = message[0]
+        if kind == "frame":
+            _, name, frame = message
+            room = worker.rooms.get(name)
+            if room is not None:
+                room._frame = frame
+        elif kind == "metadata":
+            _, name, version, metadata = message
+            room = worker.rooms.get(name)
+            if room is not None:
+                room._metadata = metadata
+                room.metadata_version = version
+        elif kind == "report":
+            for name, report in message[1].items():
+                room = worker.rooms.get(name)
+                if room is not None:
+                    room.load = report["load"]
+                    room._status = report["status"]
+        elif kind == "answer":
+            _, query_id, answer = message
+            future = self._answers.get(query_id)
+            if future is not None and not future.done():
+                future.set_result(answer)
+        elif kind == "evicted":
+            _, name, checkpoint, running = message
+            room = self._rooms.get(name)
+            if room is None or room._migrating_to is None:
+                return  # Removed while it was moving
+            target = room._migrating_to
+            room._migrating_to = None
+            self._place(room, target, checkpoint, running)
+            held, room._held = room._held, []
+            for held_message in held:
+                target.connection.send(held_message)
+
+    def _replace_worker(self, worker: _Worker):
+        """Respawn a dead worker and restart its rooms from their configs"""
+        print(f"Room worker {worker.index} exited; restarting its rooms")
+        asyncio.get_running_loop().remove_reader(worker.connection.fileno())
+        worker.connection.close()
+        replacement = self._spawn_worker(worker.index)
+        self._workers[self._workers.index(worker)] = replacement
+        for room in self._rooms.values():
+            if room._migrating_to is worker:
+                room._migrating_to = replacement
+            elif room.worker is worker:
+                # A room that was leaving this worker lands on its target instead
+                target = room._migrating_to or replacement
+                room._migrating_to = None
+                room._metadata = None
+                room._frame = None
+                self._place(room, target, None, True)
+                held, room._held = room._held, []
+                for held_message in held:
+                    target.connection.send(held_message)
+
+class HostRoomDirectory:
+    """Room access for a web worker whose rooms are scheduled by the simulation host process"""
+    def __init__(self, socket_path: str, control: HostSimulationLink):
+        self.socket_path = socket_path
+        self.control = control
+        self._links: Dict[str, HostSimulationLink] = {}
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        for link in self._links.values():
+            await link.stop()
+        self._links = {}
+
+    async def query(self, data: Dict) -> Dict:
+        """Forward a room management request to the host"""
+        try:
+            answer = json.loads(await self.control.query(data))
+        except (OSError, asyncio.TimeoutError) as e:
+            return {"type": "error", "message": str(e)}
+        if answer.get("type") == "room_removed":
+            link = self._links.pop(answer["name"], None)
+            if link is not None:
+                link.closed = True
+                await link.stop()
+        return answer
+
+    async def link(self, name: str) -> Optional[HostSimulationLink]:
+        """Relay for a room, connecting to the host the first time it is used"""
+        if name in self._links and self._links[name].closed:
+            # Removed, maybe through another worker; the name may have been reused since
+            await self._links.pop(name).stop()
+        if name not in self._links:
+            answer = await self.query({"type": "rooms"})
+            if not any(room["name"] == name for room in answer.get("rooms", [])):
+                return None
+            link = HostSimulationLink(self.socket_path, room=name)
+            await link.start()
+            self._links[name] = link
+        return self._links[name]
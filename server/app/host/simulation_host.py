@@ -0,0 +1,214 @@
+# server/app/host/simulation_host.py
+import asyncio
+import json
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.models.room import DEFAULT_ROOM
+from app.simulation.simulation_manager import SimulationManager
+from .frame_ring import FrameRingWriter
+from .links import LocalSimulationLink
+from .rooms import RoomScheduler, ROOM_QUERIES
+from .protocol import (
+    encode_message, pack_message, read_message,
+    KIND_METADATA, KIND_FRAME, KIND_STATUS, KIND_COMMAND, KIND_QUERY, KIND_ANSWER,
+    KIND_JOIN, KIND_VIEWERS, KIND_CLOSED, KIND_RING
+)
+
+DEFAULT_SOCKET_PATH = "/tmp/simulation-host.sock"
+
+class SimulationHost:
+    """Owns the simulations and publishes encoded frames to web workers, one room per connection"""
+    def __init__(self, link: LocalSimulationLink, socket_path: str,
+                 rooms: Optional[RoomScheduler] = None,
+                 status_interval: float = 1.0, publish_interval: float = 1 / 60,
+                 max_backlog: int = 4 * 1024 * 1024, frame_ring: Optional[FrameRingWriter] = None):
+        self.link = link
+        self.socket_path = socket_path
+        self.rooms = rooms
+        # Optional ring the default room's frames are written to once for every worker
+        self.frame_ring = frame_ring
+        self.status_interval = status_interval
+        self.publish_interval = publish_interval  # Fastest room tick rate
+        self.max_backlog = max_backlog  # Bytes a slow worker may fall behind before frames are dropped
+        # Room name -> the link being relayed and the workers watching it
+        self._subscribers: Dict[str, Tuple[object, Set[asyncio.StreamWriter]]] = {}
+        # Clients each web worker relays its room to
+        self._viewers: Dict[asyncio.StreamWriter, int] = {}
+        # And the areas those clients show; None if any of them hasn't said
+        self._viewports: Dict[asyncio.StreamWriter, Optional[List]] = {}
+        # Room name -> metadata version and frame most recently published
+        self._published: Dict[str, Tuple[Optional[int], Optional[str]]] = {}
+        # Workers reading the default room's frames from the ring rather than their socket
+        self._ring_readers: Set[asyncio.StreamWriter] = set()
+
+    async def serve(self):
+        """Start the simulation and publish it until cancelled"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle_worker, path=self.socket_path)
+        await self.link.start()
+        if self.rooms:
+            await self.rooms.start()
+        try:
+            async with server:
+                await asyncio.gather(self._publish_frames(), self._publish_status())
+        finally:
+            if self.rooms:
+                await self.rooms.stop()
+
+    async def _handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Register a web worker and apply the commands it forwards"""
+        room, link = DEFAULT_ROOM, self.link
+        self._join(room, link, writer)
+        try:
+            while True:
+                kind, sequence, payload = await read_message(reader)
+                if kind == KIND_COMMAND:
+                    # Answered like a query, so the worker can report a rejection to its client
+                    try:
+                        await link.submit(json.loads(payload))
+                        answer = "null"
+                    except Exception as e:
+                        answer = encode_message({"type": "error", "message": str(e)})
+                    writer.write(pack_message(KIND_ANSWER, sequence, answer))
+                elif kind == KIND_QUERY:
+                    data = json.loads(payload)
+                    try:
+                        if data["type"] in ROOM_QUERIES:
+                            answer = encode_message(await self._room_query(data))
+                        else:
+                            answer = await link.query(data)
+                    except Exception as e:
+                        answer = encode_message({"type": "error", "message": str(e)})
+                    writer.write(pack_message(KIND_ANSWER, sequence, answer))
+                elif kind == KIND_VIEWERS:
+                    viewers = json.loads(payload)
+                    self._viewers[writer] = viewers["viewers"]
+                    self._viewports[writer] = viewers.get("viewports")
+                    await self._update_viewers(room, link)
+                elif kind == KIND_RING:
+                    if self.frame_ring is not None:
+                        self._ring_readers.add(writer)
+                elif kind == KIND_JOIN:
+                    name = json.loads(payload)["room"]
+                    room_link = await self.rooms.link(name) if self.rooms else None
+                    if room_link is None:
+                        # Tell the worker, so it moves its clients away instead of rejoining
+                        writer.write(pack_message(KIND_CLOSED, 0, encode_message({"room": name})))
+                        break
+                    self._leave(room, writer)
+                    self._ring_readers.discard(writer)  # The ring only carries the default room
+                    await self._update_viewers(room, link)
+                    room, link = name, room_link
+                    self._join(room, link, writer)
+                    await self._update_viewers(room, link)
+        except (OSError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._leave(room, writer)
+            self._ring_readers.discard(writer)
+            self._viewers.pop(writer, None)
+            self._viewports.pop(writer, None)
+            writer.close()
+            await self._update_viewers(room, link)
+
+    async def _update_viewers(self, room: str, link):
+        """Pass the room's total viewer count and viewports across all web workers on to its simulation"""
+        writers = self._subscribers[room][1] if room in self._subscribers else set()
+        watching = [writer for writer in writers if self._viewers.get(writer, 0)]
+        viewports = []
+        for writer in watching:
+            if self._viewports.get(writer) is None:
+                viewports = None
+                break
+            viewports.extend(self._viewports[writer])
+        try:
+            await link.set_viewers(sum(self._viewers[writer] for writer in watching), viewports)
+        except ValueError:
+            pass  # Room was removed
+
+    async def _room_query(self, data: Dict) -> Dict:
+        if self.rooms is None:
+            return {"type": "error", "message": "Rooms are disabled"}
+        return await self.rooms.query(data)
+
+    def _join(self, room: str, link, writer: asyncio.StreamWriter):
+        metadata = link.metadata()
+        if metadata is not None:
+            writer.write(pack_message(KIND_METADATA, link.metadata_version, metadata))
+        self._subscribers.setdefault(room, (link, set()))[1].add(writer)
+        # Make sure the new worker gets a frame even while the room is paused
+        version, _ = self._published.get(room, (None, None))
+        self._published[room] = (version, None)
+
+    def _leave(self, room: str, writer: asyncio.StreamWriter):
+        if room in self._subscribers:
+            writers = self._subscribers[room][1]
+            writers.discard(writer)
+            if not writers:
+                del self._subscribers[room]
+                self._published.pop(room, None)
+
+    def _broadcast(self, writers: Set[asyncio.StreamWriter], message: bytes, droppable: bool = True):
+        """Write a message to every worker, skipping stalled ones if a later message supersedes it"""
+        for writer in list(writers):
+            if droppable and writer.transport.get_write_buffer_size() > self.max_backlog:
+                continue  # Worker is stalled; it will catch up with a later frame
+            writer.write(message)
+
+    async def _publish_frames(self):
+        while True:
+            for room, (link, writers) in list(self._subscribers.items()):
+                if getattr(link, "closed", False):
+                    # Removed room: tell its workers and drop them
+                    for writer in list(writers):
+                        writer.write(pack_message(KIND_CLOSED, 0, encode_message({"room": room})))
+                        writer.close()
+                    self._subscribers.pop(room, None)
+                    self._published.pop(room, None)
+                    continue
+                published_version, published_frame = self._published.get(room, (None, None))
+                metadata = link.metadata()
+                if metadata is not None and link.metadata_version != published_version:
+                    # Only sent when the version changes, so never dropped: later frames index into it
+                    self._broadcast(writers, pack_message(KIND_METADATA, link.metadata_version, metadata),
+                                    droppable=False)
+                    published_version = link.metadata_version
+                # Links cache the encoded frame, so a new object means a new tick
+                frame = link.frame()
+                if frame is not None and frame is not published_frame:
+                    if (room == DEFAULT_ROOM and self.frame_ring is not None
+                            and self.frame_ring.write(frame, link.metadata_version)):
+                        writers = writers - self._ring_readers
+                    self._broadcast(writers, pack_message(KIND_FRAME, 0, frame))
+                    published_frame = frame
+                self._published[room] = (published_version, published_frame)
+            await asyncio.sleep(self.publish_interval)
+
+    async def _publish_status(self):
+        while True:
+            for link, writers in list(self._subscribers.values()):
+                self._broadcast(writers, pack_message(KIND_STATUS, 0, encode_message(link.status())))
+            await asyncio.sleep(self.status_interval)
+
+async def main():
+    simulation = SimulationManager(world_width=800, world_height=600)
+    room_workers = int(os.getenv("SIMULATION_ROOM_WORKERS", "2"))
+    # Workers on the same machine map this file and read frames from it instead of the socket
+    frame_ring_path = os.getenv("SIMULATION_FRAME_RING")
+    frame_ring = FrameRingWriter(frame_ring_path) if frame_ring_path else None
+    host = SimulationHost(
+        LocalSimulationLink(simulation),
+        os.getenv("SIMULATION_HOST_SOCKET", DEFAULT_SOCKET_PATH),
+        rooms=RoomScheduler(worker_count=room_workers) if room_workers > 0 else None,
+        frame_ring=frame_ring
+    )
+    try:
+        await host.serve()
+    finally:
+        if frame_ring is not None:
+            frame_ring.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
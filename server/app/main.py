@@ -1,22 +1,23 @@
 # server/app/main.py
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+import hmac
 import json
 import asyncio
-from typing import Set, Dict
+from typing import Dict, Optional
 import os
-import time
 
 websocket_server_ready = False
 
 from app.simulation.simulation_manager import SimulationManager
-from app.models.simulation import (
-    ParticleRules, 
-    ParticleType,
-    Diet,
-    ReproductionStyle
-)
+from app.network.client_session import ClientSession, SUPPORTED_FRAME_RATES
+from app.network.connection_hub import ConnectionHub
+from app.host.links import LocalSimulationLink, HostSimulationLink
+from app.host.rooms import RoomScheduler, HostRoomDirectory, ROOM_QUERIES
+from app.models.room import RoomConfig, DEFAULT_ROOM
+from app.simulation.commands import SIMULATION_COMMANDS, SIMULATION_QUERIES, TRUSTED_COMMANDS
+from app.simulation.stats import StatsHistory
 
 app = FastAPI()
 
@@ -40,151 +41,254 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize simulation
-simulation = SimulationManager(world_width=800, world_height=600)
+# With SIMULATION_HOST_SOCKET set, every worker relays the one simulation owned by
+# the simulation host process; otherwise this process runs its own simulation
+SIMULATION_HOST_SOCKET = os.getenv("SIMULATION_HOST_SOCKET")
+
+if SIMULATION_HOST_SOCKET:
+    simulation_link = HostSimulationLink(SIMULATION_HOST_SOCKET, frame_ring=os.getenv("SIMULATION_FRAME_RING"))
+    rooms = HostRoomDirectory(SIMULATION_HOST_SOCKET, simulation_link)
+else:
+    simulation_link = LocalSimulationLink(SimulationManager(world_width=800, world_height=600))
+    # Named rooms run on their own worker processes next to the default world
+    rooms = RoomScheduler(worker_count=int(os.getenv("SIMULATION_ROOM_WORKERS", "2")))
+
+# Clients connecting with ?token=<this> may record and replay; without it set, nobody can
+SIMULATION_ADMIN_TOKEN = os.getenv("SIMULATION_ADMIN_TOKEN")
 
-# Store active connections
-active_connections: Set[WebSocket] = set()
+def is_trusted(token: Optional[str]) -> bool:
+    """Whether a client's token matches the admin token"""
+    if not SIMULATION_ADMIN_TOKEN or token is None:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), SIMULATION_ADMIN_TOKEN.encode("utf-8"))
+
+# Connected clients with their negotiated frame schedule, heartbeat and message limits
+hub = ConnectionHub(
+    message_rate=float(os.getenv("CLIENT_MESSAGE_RATE", "20")),
+    message_burst=float(os.getenv("CLIENT_MESSAGE_BURST", "40"))
+)
 
-# Add some initial species
 @app.on_event("startup")
 async def startup_event():
-    # Add plants
-    simulation.add_species(
-        name="Plants",
-        color="#2ECC71",
-        rules=ParticleRules(
-            reproductionRate=0.02,  # Increased reproduction rate
-            energyConsumption=0,
-            maxSpeed=0,
-            visionRange=0,
-            socialDistance=10,
-            particleType=ParticleType.PLANT
-        ),
-        diet=Diet.HERBIVORE,
-        reproductionStyle=ReproductionStyle.SELF_REPLICATING,
-        initial_count=50  # Increased initial count
-    )
-
-    # Add herbivores
-    simulation.add_species(
-        name="Herbivores",
-        color="#3498DB",
-        rules=ParticleRules(
-            reproductionRate=0.001,
-            energyConsumption=0.05,  # Reduced energy consumption
-            maxSpeed=1.5,  # Slightly reduced speed
-            visionRange=60.0,  # Increased vision range
-            socialDistance=20.0,
-            particleType=ParticleType.CREATURE
-        ),
-        diet=Diet.HERBIVORE,
-        reproductionStyle=ReproductionStyle.TWO_PARENTS,
-        initial_count=20
-    )
-
-    # Add carnivores
-    simulation.add_species(
-        name="Carnivores",
-        color="#E74C3C",
-        rules=ParticleRules(
-            reproductionRate=0.0005,
-            energyConsumption=0.08,  # Balanced energy consumption
-            maxSpeed=2.0,  # Faster than herbivores
-            visionRange=80.0,  # Increased vision range
-            socialDistance=25.0,
-            particleType=ParticleType.CREATURE
-        ),
-        diet=Diet.CARNIVORE,
-        reproductionStyle=ReproductionStyle.SELF_REPLICATING,
-        initial_count=8  # Reduced initial count
-    )
-
-    # Add omnivores
-    simulation.add_species(
-        name="Omnivores",
-        color="#9B59B6",
-        rules=ParticleRules(
-            reproductionRate=0.00075,
-            energyConsumption=0.06,  # Balanced energy consumption
-            maxSpeed=1.8,  # Balanced speed
-            visionRange=70.0,  # Balanced vision range
-            socialDistance=22.0,
-            particleType=ParticleType.CREATURE
-        ),
-        diet=Diet.OMNIVORE,
-        reproductionStyle=ReproductionStyle.TWO_PARENTS,
-        initial_count=12  # Balanced initial count
-    )
-
-    await simulation.start()
-
-# Broadcast state to all clients
+    await simulation_link.start()
+    await rooms.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await rooms.stop()
+    await simulation_link.stop()
+
+async def room_link(name: str):
+    """The link for a room, or None if no such room exists"""
+    if name == DEFAULT_ROOM:
+        return simulation_link
+    return await rooms.link(name)
+
+async def update_viewers(*links):
+    """Tell each link how many clients watch it and where they look, so unwatched worlds can idle"""
+    for link in set(links):
+        sessions = [session for session in hub if session.link is link]
+        # Clients that never sent a viewport count as the default camera; one showing the whole world
+        # keeps every pack simulated in full
+        viewports = None
+        if all(session.viewport is not None for session in sessions):
+            viewports = [session.viewport for session in sessions]
+        try:
+            await link.set_viewers(len(sessions), viewports)
+        except (OSError, ValueError) as e:
+            print(f"Could not update viewer count: {e}")
+
+# Broadcast state to clients whose frame interval has elapsed
 async def broadcast_state():
+    loop = asyncio.get_event_loop()
     while True:
+        await hub.connected.wait()
         try:
-            state = simulation.get_state()
-            if active_connections:  # Only send if there are connections
-                await asyncio.gather(
-                    *[connection.send_json(state) for connection in active_connections]
+            now = loop.time()
+            due_by_link: Dict[object, list] = {}
+            changed = set()
+            for session in hub:
+                if getattr(session.link, "closed", False):
+                    session.join(DEFAULT_ROOM, simulation_link)  # Room was removed
+                    changed.add(simulation_link)
+                if not session.scrubbing and session.is_due(now):
+                    due_by_link.setdefault(session.link, []).append(session)
+
+            sends = []
+            for link, due in due_by_link.items():
+                frame = link.frame()  # Only built for rooms some client is waiting on
+                if frame is None:
+                    continue
+                # A room ticking slower than a client's frame rate has nothing new to send; the
+                # client stays due and gets the next tick as soon as there is one
+                due = [session for session in due if not session.has_sent(frame)]
+                if not due:
+                    continue
+                metadata_version = link.metadata_version
+                metadata = None
+                if any(session.metadata_version != metadata_version for session in due):
+                    metadata = link.metadata()
+                sends.extend(
+                    (session, session.send(frame, metadata_version, metadata)) for session in due
                 )
+
+            results = await asyncio.gather(*[send for _, send in sends], return_exceptions=True)
+            for (session, _), result in zip(sends, results):
+                if isinstance(result, Exception):
+                    hub.remove(session.websocket)
+                    changed.add(session.link)
+                else:
+                    session.mark_sent(now)
+            if changed:
+                await update_viewers(*changed)
         except Exception as e:
             print(f"Broadcast error: {e}")
-        await asyncio.sleep(1/60)  # Match simulation tick rate of 60 FPS
+        await asyncio.sleep(1 / max(SUPPORTED_FRAME_RATES))  # Fastest client frame rate
 
 @app.websocket("/ws/simulation")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
-    active_connections.add(websocket)
-    
-    heartbeat_interval = 30  # seconds
-    last_heartbeat = time.time()
+    room = websocket.query_params.get("room", DEFAULT_ROOM)
+    link = await room_link(room)
+    if link is None:
+        await websocket.send_json({"type": "error", "message": f"Room {room} not found"})
+        await websocket.close(code=4004)
+        return
+    session = ClientSession(websocket, websocket.query_params.get("fps", 60), room, link,
+                            trusted=is_trusted(websocket.query_params.get("token")))
 
     try:
         # Send initial state
-        await websocket.send_json(simulation.get_state())
-        
-        # Handle incoming messages
+        await websocket.send_json({"type": "frame_rate", "fps": session.frame_rate})
+        await websocket.send_json({"type": "room", "name": session.room})
+        frame = session.link.frame()
+        if frame is not None:
+            await session.send(frame, session.link.metadata_version, session.link.metadata())
+        hub.add(session)
+        await update_viewers(session.link)
+
+        # This task only ever waits on the socket; the hub's shared task handles heartbeats
         while True:
-            # Handle heartbeat
-            if time.time() - last_heartbeat > heartbeat_interval:
-                await websocket.send_json({"type": "ping"})
-                last_heartbeat = time.time()
-            
-            # Use receive_json with timeout to prevent blocking
             try:
-                data = await asyncio.wait_for(websocket.receive_json(), timeout=1.0)
-                
-                if data["type"] == "pong":
-                    last_heartbeat = time.time()
-                elif data["type"] == "start":
-                    await simulation.start()
-                elif data["type"] == "pause":
-                    await simulation.pause()
-                elif data["type"] == "add_species":
-                    simulation.add_species(
-                        name=data["name"],
-                        color=data["color"],
-                        rules=ParticleRules(**data["rules"]),
-                        diet=Diet(data["diet"]),
-                        reproductionStyle=ReproductionStyle(data["reproductionStyle"]),
-                        initial_count=data.get("initialCount", 10)
-                    )
-            except asyncio.TimeoutError:
-                continue  # No message received, continue to next iteration
-                
+                data = json.loads(await websocket.receive_text())
+            except ValueError:
+                data = None
+            # Malformed messages count against the limit like any other
+            if not hub.admit(session, data):
+                await websocket.send_json({"type": "error", "message": "Too many messages, slow down"})
+                continue
+            if not isinstance(data, dict) or not isinstance(data.get("type"), str):
+                await websocket.send_json({"type": "error", "message": "Messages must be JSON objects with a type"})
+                continue
+
+            if data["type"] == "pong":
+                pass  # admit() already noted the client is alive
+            elif data["type"] == "set_frame_rate":
+                fps = session.set_frame_rate(data.get("fps"))
+                await websocket.send_json({"type": "frame_rate", "fps": fps})
+            elif data["type"] == "live":
+                session.scrubbing = False
+            elif data["type"] == "set_viewport":
+                if session.set_viewport(data.get("viewport")):
+                    await update_viewers(session.link)
+                else:
+                    await websocket.send_json({"type": "error", "message": "Viewport needs x, y, width and height"})
+            elif data["type"] == "join_room":
+                link = await room_link(data.get("name", DEFAULT_ROOM))
+                if link is None:
+                    await websocket.send_json({"type": "error", "message": f"Room {data.get('name')} not found"})
+                else:
+                    previous = session.link
+                    session.join(data.get("name", DEFAULT_ROOM), link)
+                    await update_viewers(previous, link)
+                    await websocket.send_json({"type": "room", "name": session.room})
+            elif data["type"] in ROOM_QUERIES:
+                await websocket.send_json(await rooms.query(data))
+            elif data["type"] in SIMULATION_QUERIES:
+                try:
+                    answer = await session.link.query(data)
+                except (OSError, ValueError, KeyError, asyncio.TimeoutError) as e:
+                    await websocket.send_json({"type": "error", "message": str(e)})
+                    continue
+                if data["type"] != "scrub":
+                    await websocket.send_text(answer)
+                elif answer == "null":
+                    await websocket.send_json({"type": "error", "message": "Tick is outside the history window"})
+                else:
+                    # Hold live frames back so they don't overwrite the scrubbed one
+                    session.scrubbing = True
+                    await session.send(answer, session.link.metadata_version, session.link.metadata())
+            elif data["type"] in TRUSTED_COMMANDS and not session.trusted:
+                await websocket.send_json({"type": "error", "message": f"{data['type']} needs the admin token"})
+            elif data["type"] in SIMULATION_COMMANDS:
+                # Queued for the next tick boundary; errors come back once it has been applied
+                try:
+                    await session.link.submit(data)
+                except (OSError, ValueError, KeyError) as e:
+                    await websocket.send_json({"type": "error", "message": str(e)})
+
     except WebSocketDisconnect:
-        active_connections.remove(websocket)
+        pass
+    finally:
+        # Also covers clients the heartbeat already dropped
+        hub.remove(websocket)
+        await update_viewers(session.link)
 
 # Start broadcast task
 @app.on_event("startup")
 async def start_broadcast():
     asyncio.create_task(broadcast_state())
+    asyncio.create_task(hub.run_heartbeat())
+
+@app.get("/rooms")
+async def list_rooms():
+    """Named rooms and where they are running"""
+    return await rooms.query({"type": "rooms"})
+
+@app.post("/rooms")
+async def create_room(config: RoomConfig):
+    """Create a named room with its own simulation"""
+    answer = await rooms.query({"type": "create_room", "room": config.model_dump()})
+    if answer["type"] == "error":
+        return JSONResponse(status_code=status.HTTP_409_CONFLICT, content=answer)
+    return answer
+
+@app.delete("/rooms/{name}")
+async def remove_room(name: str):
+    """Stop a named room and discard its world"""
+    answer = await rooms.query({"type": "remove_room", "name": name})
+    if answer["type"] == "error":
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content=answer)
+    return answer
+
+@app.get("/stats")
+async def population_stats(resolution: str = "second", since: Optional[float] = None, room: str = DEFAULT_ROOM):
+    """Sampled population statistics of a room, newer than `since` if given"""
+    if resolution not in StatsHistory.RESOLUTIONS:
+        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST,
+                            content={"type": "error", "message": f"Unknown stats resolution {resolution}"})
+    link = await room_link(room)
+    if link is None:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND,
+                            content={"type": "error", "message": f"Room {room} not found"})
+    try:
+        answer = await link.query({"type": "stats", "resolution": resolution, "since": since})
+    except (OSError, ValueError, asyncio.TimeoutError) as e:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            content={"type": "error", "message": str(e)})
+    # Already encoded by the link, so pass it through untouched
+    return Response(content=answer, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
     try:
-        # Basic application health check
+        # A worker that has lost the simulation host can't serve anything; the host runs as its own
+        # service, and failing here gets this one restarted if the host stays unreachable
+        if not simulation_link.connected:
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"status": "unhealthy", "message": "Simulation host is not connected"}
+            )
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={"status": "healthy"}
@@ -210,15 +314,11 @@ async def websocket_health_check(websocket: WebSocket):
 async def simulation_status():
     """Detailed status endpoint for monitoring the simulation"""
     try:
-        state = simulation.get_state()
+        # Counters the simulation keeps current as it runs; nothing here scales with world size
         return {
             "status": "healthy",
-            "simulation": {
-                "active": simulation.is_running(),
-                "species_count": len(state["species"]),
-                "total_particles": sum(len(species["particles"]) for species in state["species"]),
-            },
-            "websocket_connections": len(active_connections)
+            "simulation": simulation_link.status(),
+            "websocket_connections": len(hub)
         }
     except Exception as e:
         return JSONResponse(
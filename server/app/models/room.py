@@ -0,0 +1,12 @@
+# server/app/models/room.py
+from pydantic import BaseModel, Field
+
+DEFAULT_ROOM = "default"
+
+class RoomConfig(BaseModel):
+    name: str = Field(pattern=r"^[A-Za-z0-9_-]{1,32}$")
+    worldWidth: int = Field(800, ge=100, le=4000)
+    worldHeight: int = Field(600, ge=100, le=4000)
+    tickRate: int = Field(20, ge=1, le=60)  # Ticks per second
+    maxParticles: int = Field(2000, ge=10, le=20000)
+    seedSpecies: bool = True  # Start with the default ecosystem
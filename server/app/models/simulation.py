@@ -1,6 +1,6 @@
 # server/app/models/simulation.py
-from typing import Dict, List, Optional, Set
-from pydantic import BaseModel
+from typing import Dict, Optional, Set
+from pydantic import BaseModel, Field
 from enum import Enum
 
 class ParticleType(str, Enum):
@@ -16,6 +16,12 @@ class ReproductionStyle(str, Enum):
     SELF_REPLICATING = "self_replicating"
     TWO_PARENTS = "two_parents"
 
+class SpawnShape(str, Enum):
+    UNIFORM = "uniform"
+    CLUSTER = "cluster"
+    RING = "ring"
+
+# API schema. The tick loop runs on the slotted mirrors in app.simulation.entities
 class Position(BaseModel):
     x: float
     y: float
@@ -82,6 +88,15 @@ class Species(BaseModel):
     diet: Diet
     reproductionStyle: ReproductionStyle
 
+class NewSpecies(BaseModel):
+    """An add_species command as clients send it"""
+    name: str = Field(min_length=1, max_length=64)
+    color: str = Field(pattern=r"^#[0-9A-Fa-f]{6}$")  # Clients append alpha digits to it
+    rules: ParticleRules
+    diet: Diet
+    reproductionStyle: ReproductionStyle
+    initialCount: int = Field(10, ge=0)
+
 class SimulationState(BaseModel):
     particles: Dict[str, Particle]
     species: Dict[str, Species]
@@ -0,0 +1,102 @@
+# server/app/network/client_session.py
+import math
+from typing import List, Optional
+from fastapi import WebSocket
+
+from app.models.room import DEFAULT_ROOM
+
+SUPPORTED_FRAME_RATES = (60, 30, 10, 1)
+DEFAULT_FRAME_RATE = 60
+# World area [x, y, width, height] a client that hasn't sent set_viewport is assumed to show:
+# the client's default 800x600 camera at the origin
+DEFAULT_VIEWPORT = (0.0, 0.0, 800.0, 600.0)
+
+def negotiate_frame_rate(requested) -> int:
+    """Snap a requested frame rate to the closest supported one"""
+    try:
+        requested = float(requested)
+    except (TypeError, ValueError):
+        return DEFAULT_FRAME_RATE
+    return min(SUPPORTED_FRAME_RATES, key=lambda rate: abs(rate - requested))
+
+class ClientSession:
+    """Per-connection send schedule for simulation frames"""
+    def __init__(self, websocket: WebSocket, frame_rate: int = DEFAULT_FRAME_RATE,
+                 room: str = DEFAULT_ROOM, link=None, trusted: bool = False):
+        self.websocket = websocket
+        # Whether the client presented the admin token, which recording and replay need
+        self.trusted = trusted
+        # Room this client watches and the link its frames come from
+        self.room = room
+        self.link = link
+        self.frame_rate: int = DEFAULT_FRAME_RATE
+        self.frame_interval: float = 1 / DEFAULT_FRAME_RATE
+        self.next_frame_at: float = 0.0
+        # Last frame sent; frames are cached per tick, so the same object means no new tick yet
+        self.last_frame: Optional[str] = None
+        # Last species metadata version this client has received
+        self.metadata_version: Optional[int] = None
+        # While scrubbing through history the client gets requested frames instead of live ones
+        self.scrubbing: bool = False
+        # World area [x, y, width, height] the client shows; None once it says it shows all of it
+        self.viewport: Optional[List[float]] = list(DEFAULT_VIEWPORT)
+        # Heartbeat and message limit bookkeeping, filled in by the ConnectionHub
+        self.last_seen: float = 0.0
+        self.rate_limit = None
+        self.set_frame_rate(frame_rate)
+
+    def join(self, room: str, link):
+        """Switch to another room; its metadata is sent with the next frame"""
+        self.room = room
+        self.link = link
+        self.metadata_version = None
+        self.scrubbing = False
+        self.next_frame_at = 0.0
+        self.last_frame = None
+        # The old room's coordinates mean nothing here; assume the default camera until told otherwise
+        self.viewport = list(DEFAULT_VIEWPORT)
+
+    def set_frame_rate(self, requested) -> int:
+        """Change the target frame rate, returning the negotiated value"""
+        self.frame_rate = negotiate_frame_rate(requested)
+        self.frame_interval = 1 / self.frame_rate
+        # Let the new schedule take effect on the next broadcast pass
+        self.next_frame_at = 0.0
+        return self.frame_rate
+
+    def set_viewport(self, viewport) -> bool:
+        """Set the shown world area from {x, y, width, height}, or None for all of it; False if malformed"""
+        if viewport is None:
+            self.viewport = None
+            return True
+        try:
+            rect = [float(viewport[key]) for key in ("x", "y", "width", "height")]
+        except (TypeError, KeyError, ValueError):
+            return False
+        if not all(math.isfinite(value) for value in rect) or rect[2] < 0 or rect[3] < 0:
+            return False
+        self.viewport = rect
+        return True
+
+    async def send(self, frame: str, metadata_version: int, metadata: Optional[str] = None):
+        """Send a frame, preceded by the metadata it refers to if the client lacks it"""
+        if self.metadata_version != metadata_version and metadata is not None:
+            await self.websocket.send_text(metadata)
+            self.metadata_version = metadata_version
+        await self.websocket.send_text(frame)
+        self.last_frame = frame
+
+    def is_due(self, now: float) -> bool:
+        """Whether this client should receive a frame now"""
+        return now >= self.next_frame_at
+
+    def has_sent(self, frame: str) -> bool:
+        """Whether this frame already went out, i.e. the simulation hasn't ticked since"""
+        return frame is self.last_frame
+
+    def mark_sent(self, now: float):
+        """Record a sent frame and schedule the next one"""
+        # Stay on the client's grid instead of drifting by the loop's jitter
+        self.next_frame_at += self.frame_interval
+        if self.next_frame_at < now:
+            self.next_frame_at = now + self.frame_interval
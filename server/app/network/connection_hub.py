@@ -0,0 +1,78 @@
+# server/app/network/connection_hub.py
+import asyncio
+from typing import Dict, Iterator, Optional
+from fastapi import WebSocket
+
+from .client_session import ClientSession
+
+class RateLimit:
+    """Token bucket: a steady message rate with room for short bursts"""
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = 0.0
+
+    def allow(self, now: float) -> bool:
+        if self.updated_at:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+class ConnectionHub:
+    """Registry of connected clients with one shared heartbeat and per-client message limits"""
+    def __init__(self, heartbeat_interval: float = 30.0, heartbeat_timeout: float = 90.0,
+                 message_rate: float = 20.0, message_burst: float = 40.0):
+        self.heartbeat_interval = heartbeat_interval  # Quiet seconds before a client is pinged
+        self.heartbeat_timeout = heartbeat_timeout  # Quiet seconds before a client is dropped
+        self.message_rate = message_rate
+        self.message_burst = message_burst
+        self.sessions: Dict[WebSocket, ClientSession] = {}
+        # Set while any client is connected, so idle loops can sleep on it
+        self.connected = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __iter__(self) -> Iterator[ClientSession]:
+        return iter(list(self.sessions.values()))
+
+    def add(self, session: ClientSession):
+        session.last_seen = asyncio.get_running_loop().time()
+        session.rate_limit = RateLimit(self.message_rate, self.message_burst)
+        self.sessions[session.websocket] = session
+        self.connected.set()
+
+    def remove(self, websocket: WebSocket) -> Optional[ClientSession]:
+        session = self.sessions.pop(websocket, None)
+        if not self.sessions:
+            self.connected.clear()
+        return session
+
+    def admit(self, session: ClientSession, data) -> bool:
+        """Note that the client is alive and decide whether its message, parsed or not, may be handled"""
+        now = asyncio.get_running_loop().time()
+        session.last_seen = now
+        if isinstance(data, dict) and data.get("type") == "pong":
+            return True  # Heartbeat replies never count against the limit
+        return session.rate_limit.allow(now)
+
+    async def run_heartbeat(self):
+        """Ping quiet clients and drop the ones that stopped answering, all from one task"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.connected.wait()
+            await asyncio.sleep(self.heartbeat_interval / 3)
+            now = loop.time()
+            pings = []
+            for session in self:
+                quiet = now - session.last_seen
+                if quiet > self.heartbeat_timeout:
+                    self.remove(session.websocket)
+                    pings.append(session.websocket.close(code=1001))
+                elif quiet > self.heartbeat_interval:
+                    pings.append(session.websocket.send_json({"type": "ping"}))
+            await asyncio.gather(*pings, return_exceptions=True)
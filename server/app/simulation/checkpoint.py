@@ -0,0 +1,306 @@
+# server/app/simulation/checkpoint.py
+import gc
+import json
+import os
+import random
+import struct
+import threading
+import time
+import zlib
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.simulation import ParticleType, Diet, ReproductionStyle
+from .entities import (
+    SimulationState, Particle, Species, ParticleGroup, Position, Velocity,
+    ParticleAttributes, ParticleRules
+)
+
+CHECKPOINT_MAGIC = b"GOLCKPT1"
+CHECKPOINT_FORMAT = 1
+# Format version, crc32 of the compressed body, body length
+CHECKPOINT_HEADER = struct.Struct("<IIQ")
+# Inside the body: length of the particle table, length of the JSON section
+BODY_HEADER = struct.Struct("<QQ")
+
+# One fixed-width row per particle; strings live in the JSON section's tables
+PARTICLE_DTYPE = np.dtype([
+    ("id", "S36"),
+    ("species", "<u2"),
+    ("color", "<u4"),
+    ("group", "<i4"),
+    ("x", "<f8"),
+    ("y", "<f8"),
+    ("vx", "<f8"),
+    ("vy", "<f8"),
+    ("energy", "<f8"),
+    ("hunger", "<f8"),
+    ("size", "<f8"),
+    ("packMentality", "<f8"),
+    ("age", "<i8"),
+    ("lastReproduced", "<i8"),
+    ("lastAte", "<i8"),
+    ("highEnergyHungerTime", "<i8"),
+    ("timeInGroup", "<i8"),
+    ("isChild", "?"),
+])
+
+def encode_checkpoint(state: SimulationState, metadata_version: int = 0) -> bytes:
+    """Serialize the full simulation state, including the RNG, to the checkpoint format"""
+    return pack_checkpoint(*snapshot_checkpoint(state, metadata_version))
+
+def snapshot_checkpoint(state: SimulationState, metadata_version: int = 0) -> Tuple[np.ndarray, Dict]:
+    """Copy the state into a particle table and JSON-ready sections that share nothing mutable
+    with it, so they can be packed while the simulation keeps ticking"""
+    species_ids = list(state.species)
+    species_index = {species_id: index for index, species_id in enumerate(species_ids)}
+    group_ids = list(state.groups)
+    group_index = {group_id: index for index, group_id in enumerate(group_ids)}
+    colors: Dict[str, int] = {}
+
+    particles = list(state.particles.values())
+    attributes = [particle.attributes for particle in particles]
+    positions = [particle.position for particle in particles]
+    velocities = [particle.velocity for particle in particles]
+    count = len(particles)
+
+    def column(name, values):
+        return np.fromiter(values, dtype=PARTICLE_DTYPE[name], count=count)
+
+    # Filled a column at a time; a row at a time goes through a Python tuple and a struct assignment per particle
+    rows = np.empty(count, dtype=PARTICLE_DTYPE)
+    rows["id"] = column("id", (particle.id.encode("ascii") for particle in particles))
+    rows["species"] = column("species", (species_index[particle.speciesId] for particle in particles))
+    rows["color"] = column("color", (colors.setdefault(particle.color, len(colors)) for particle in particles))
+    rows["group"] = column("group", (group_index.get(entry.groupId, -1) for entry in attributes))
+    rows["x"] = column("x", (position.x for position in positions))
+    rows["y"] = column("y", (position.y for position in positions))
+    rows["vx"] = column("vx", (velocity.x for velocity in velocities))
+    rows["vy"] = column("vy", (velocity.y for velocity in velocities))
+    rows["energy"] = column("energy", (entry.energy for entry in attributes))
+    rows["hunger"] = column("hunger", (entry.hunger for entry in attributes))
+    rows["size"] = column("size", (entry.size for entry in attributes))
+    rows["packMentality"] = column("packMentality", (entry.packMentality for entry in attributes))
+    rows["age"] = column("age", (entry.age for entry in attributes))
+    rows["lastReproduced"] = column("lastReproduced", (entry.lastReproduced for entry in attributes))
+    rows["lastAte"] = column("lastAte", (entry.lastAte for entry in attributes))
+    rows["highEnergyHungerTime"] = column("highEnergyHungerTime", (entry.highEnergyHungerTime for entry in attributes))
+    rows["timeInGroup"] = column("timeInGroup", (entry.timeInGroup for entry in attributes))
+    rows["isChild"] = column("isChild", (entry.isChild for entry in attributes))
+
+    member_ids: Dict[str, List[str]] = {group_id: [] for group_id in group_ids}
+    for particle in particles:
+        if particle.attributes.groupId in member_ids:
+            member_ids[particle.attributes.groupId].append(particle.id)
+    meeting_counts = {
+        row: dict(entry.meetingCount) for row, entry in enumerate(attributes) if entry.meetingCount
+    }
+
+    rng_version, rng_internal, rng_gauss = random.getstate()
+    sections = {
+        "tickCount": state.tickCount,
+        "worldWidth": state.worldWidth,
+        "worldHeight": state.worldHeight,
+        "metadataVersion": metadata_version,
+        "species": [asdict(state.species[species_id]) for species_id in species_ids],
+        "groups": [
+            {
+                "id": group.id,
+                "memberIds": member_ids.get(group.id, []),
+                "speciesId": group.speciesId,
+                "parentIds": list(group.parentIds) if group.parentIds is not None else None,
+                "childId": group.childId
+            }
+            for group in (state.groups[group_id] for group_id in group_ids)
+        ],
+        "colors": list(colors),
+        "meetingCounts": meeting_counts,
+        "rng": [rng_version, list(rng_internal), rng_gauss],
+    }
+    return rows, sections
+
+def pack_checkpoint(rows: np.ndarray, sections: Dict) -> bytes:
+    """Compress a snapshot into checkpoint bytes; the expensive half, safe to run off the tick loop"""
+    table = rows.tobytes()
+    extra = json.dumps(sections, separators=(",", ":")).encode("utf-8")
+    body = zlib.compress(BODY_HEADER.pack(len(table), len(extra)) + table + extra, 1)
+    return (
+        CHECKPOINT_MAGIC +
+        CHECKPOINT_HEADER.pack(CHECKPOINT_FORMAT, zlib.crc32(body), len(body)) +
+        body
+    )
+
+def decode_checkpoint(data: bytes) -> Tuple[SimulationState, Dict]:
+    """Rebuild a SimulationState from checkpoint bytes; raises ValueError if they are corrupt"""
+    if data[:len(CHECKPOINT_MAGIC)] != CHECKPOINT_MAGIC:
+        raise ValueError("Not a simulation checkpoint")
+    offset = len(CHECKPOINT_MAGIC)
+    version, crc, length = CHECKPOINT_HEADER.unpack_from(data, offset)
+    body = data[offset + CHECKPOINT_HEADER.size:]
+    if version != CHECKPOINT_FORMAT or len(body) != length or zlib.crc32(body) != crc:
+        raise ValueError("Checkpoint is truncated or corrupt")
+
+    body = zlib.decompress(body)
+    table_length, extra_length = BODY_HEADER.unpack_from(body, 0)
+    table_start = BODY_HEADER.size
+    rows = np.frombuffer(body, dtype=PARTICLE_DTYPE, count=table_length // PARTICLE_DTYPE.itemsize,
+                         offset=table_start)
+    sections = json.loads(body[table_start + table_length:table_start + table_length + extra_length])
+
+    species_list: List[Species] = []
+    for entry in sections["species"]:
+        species_list.append(Species(
+            **{**entry,
+               "baseRules": ParticleRules(**{
+                   **entry["baseRules"],
+                   "particleType": ParticleType(entry["baseRules"]["particleType"])
+               }),
+               "diet": Diet(entry["diet"]),
+               "reproductionStyle": ReproductionStyle(entry["reproductionStyle"])}
+        ))
+    group_ids = [group["id"] for group in sections["groups"]]
+    colors = sections["colors"]
+    meeting_counts = sections["meetingCounts"]
+
+    ids = [particle_id.decode("ascii") for particle_id in rows["id"].tolist()]
+    columns = {name: rows[name].tolist() for name in PARTICLE_DTYPE.names if name != "id"}
+    particles: Dict[str, Particle] = {}
+    for row, particle_id in enumerate(ids):
+        species = species_list[columns["species"][row]]
+        group = columns["group"][row]
+        particles[particle_id] = Particle(
+            id=particle_id,
+            position=Position(columns["x"][row], columns["y"][row]),
+            velocity=Velocity(columns["vx"][row], columns["vy"][row]),
+            attributes=ParticleAttributes(
+                energy=columns["energy"][row],
+                hunger=columns["hunger"][row],
+                size=columns["size"][row],
+                age=columns["age"][row],
+                lastReproduced=columns["lastReproduced"][row],
+                lastAte=columns["lastAte"][row],
+                diet=species.diet,
+                reproductionStyle=species.reproductionStyle,
+                packMentality=columns["packMentality"][row],
+                highEnergyHungerTime=columns["highEnergyHungerTime"][row],
+                meetingCount=dict(meeting_counts.get(str(row), {})),
+                groupId=group_ids[group] if group >= 0 else None,
+                isChild=columns["isChild"][row],
+                timeInGroup=columns["timeInGroup"][row]
+            ),
+            rules=species.baseRules,
+            speciesId=species.id,
+            color=colors[columns["color"][row]]
+        )
+
+    state = SimulationState(
+        particles=particles,
+        species={species.id: species for species in species_list},
+        groups={
+            # Membership is read back from the particles' group ids
+            group["id"]: ParticleGroup(
+                id=group["id"],
+                speciesId=group["speciesId"],
+                parentIds=set(group["parentIds"]) if group["parentIds"] is not None else None,
+                childId=group["childId"]
+            )
+            for group in sections["groups"]
+        },
+        worldWidth=sections["worldWidth"],
+        worldHeight=sections["worldHeight"],
+        tickCount=sections["tickCount"]
+    )
+    return state, sections
+
+class Checkpointer:
+    """Periodically writes checkpoints without stalling the tick loop, and restores the newest one"""
+    def __init__(self, directory: str, interval: float = 30.0, keep: int = 3):
+        self.directory = directory
+        self.interval = interval
+        self.keep = keep
+        self._last_checkpoint = time.monotonic()
+        self._writer: Optional[threading.Thread] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def maybe_checkpoint(self, simulation):
+        """Start a checkpoint if the interval has passed and the previous one has finished"""
+        if time.monotonic() - self._last_checkpoint >= self.interval:
+            self.checkpoint(simulation)
+
+    def checkpoint(self, simulation):
+        """Start a checkpoint now unless the previous one is still being written"""
+        if self._busy():
+            return
+        self._last_checkpoint = time.monotonic()
+        simulation.pack_lod.flush()  # Aggregated packs hold back their members' attribute changes
+        path = os.path.join(self.directory, f"checkpoint-{simulation.state.tickCount:012d}.bin")
+
+        # Only the copy happens on the tick loop; compressing and writing run on a thread
+        # (not a fork, which would copy the locks of the process's other threads mid-use)
+        snapshot = snapshot_checkpoint(simulation.state, simulation.metadata_version)
+        self._writer = threading.Thread(target=self._save, args=(path, snapshot), daemon=True)
+        self._writer.start()
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until the checkpoint being written, if any, is on disk"""
+        if self._writer is not None:
+            self._writer.join(timeout)
+
+    def restore_latest(self, simulation) -> bool:
+        """Load the newest readable checkpoint into the simulation"""
+        for path in reversed(self._checkpoints()):
+            # Collections triggered by hundreds of thousands of new objects would double the restore time
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                with open(path, "rb") as checkpoint_file:
+                    state, sections = decode_checkpoint(checkpoint_file.read())
+            except (OSError, ValueError, KeyError, zlib.error) as e:
+                print(f"Skipping unreadable checkpoint {path}: {e}")
+                continue
+            finally:
+                if gc_enabled:
+                    gc.enable()
+
+            simulation.load_state(state, sections["metadataVersion"])
+            rng_version, rng_internal, rng_gauss = sections["rng"]
+            random.setstate((rng_version, tuple(rng_internal), rng_gauss))
+            return True
+        return False
+
+    def _busy(self) -> bool:
+        return self._writer is not None and self._writer.is_alive()
+
+    def _save(self, path: str, snapshot: Tuple[np.ndarray, Dict]):
+        try:
+            self._write(path, pack_checkpoint(*snapshot))
+        except OSError as e:
+            print(f"Could not write checkpoint {path}: {e}")
+            return
+        # Only once the new one is safely on disk, so there are never fewer than keep good ones
+        self._prune()
+
+    def _write(self, path: str, data: bytes):
+        # Write-then-rename so a crash never leaves a half-written "latest" checkpoint
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as checkpoint_file:
+            checkpoint_file.write(data)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary, path)
+
+    def _checkpoints(self) -> List[str]:
+        names = sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith("checkpoint-") and name.endswith(".bin")
+        )
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _prune(self):
+        for path in self._checkpoints()[:-self.keep]:
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"Could not remove old checkpoint {path}: {e}")
@@ -0,0 +1,114 @@
+# server/app/simulation/commands.py
+import math
+import os
+from typing import Dict, Optional
+
+from app.models import simulation as schema
+from app.models.simulation import SpawnShape
+from .entities import ParticleRules
+from .simulation_manager import SimulationManager
+
+# Commands a client may send that act on the shared simulation
+SIMULATION_COMMANDS = {
+    "start", "pause", "add_species", "spawn",
+    "start_recording", "stop_recording", "replay", "stop_replay"
+}
+
+# Commands that write to or read from the server's disk; only trusted clients may send them
+TRUSTED_COMMANDS = {"start_recording", "stop_recording", "replay", "stop_replay"}
+
+# Read-only requests answered with a single message to the asking client
+SIMULATION_QUERIES = {"history", "scrub", "stats"}
+
+# Most particles a single spawn or add_species command may create
+MAX_SPAWN = 10000
+
+RECORDINGS_DIR = os.getenv("SIMULATION_RECORDINGS_DIR", "recordings")
+# Size at which a recording stops growing
+RECORDING_MAX_BYTES = int(os.getenv("SIMULATION_RECORDING_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Fastest replay, in recorded ticks per simulation tick
+MAX_REPLAY_SPEED = 16.0
+
+def tick_number(value, field: str = "tick") -> int:
+    """A client-supplied tick as an int; ValueError for anything that isn't a number"""
+    if isinstance(value, bool):
+        raise ValueError(f"{field} must be a tick number")
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"{field} must be a tick number") from None
+
+def replay_speed(value) -> float:
+    """A client-supplied replay speed, capped at MAX_REPLAY_SPEED; ValueError unless it is a positive number"""
+    try:
+        speed = float(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("speed must be a number") from None
+    if not math.isfinite(speed) or speed <= 0:
+        raise ValueError("speed must be a positive number")
+    return min(speed, MAX_REPLAY_SPEED)
+
+def recording_path(name: str) -> str:
+    """Resolve a client-supplied recording name inside the recordings directory"""
+    name = os.path.basename(str(name))
+    if not name or name.startswith("."):
+        raise ValueError("Invalid recording name")
+    return os.path.join(RECORDINGS_DIR, f"{name}.ticklog")
+
+async def apply_command(simulation: SimulationManager, data: Dict):
+    """Apply a client command to the simulation at the next tick boundary"""
+    await simulation.at_tick_boundary(lambda: _apply_command(simulation, data))
+
+async def _apply_command(simulation: SimulationManager, data: Dict):
+    if data["type"] == "start":
+        await simulation.start()
+    elif data["type"] == "pause":
+        await simulation.pause()
+    elif data["type"] == "add_species":
+        species = schema.NewSpecies.model_validate(data)
+        simulation.add_species(
+            name=species.name,
+            color=species.color,
+            rules=ParticleRules.from_schema(species.rules),
+            diet=species.diet,
+            reproductionStyle=species.reproductionStyle,
+            initial_count=min(species.initialCount, MAX_SPAWN)
+        )
+    elif data["type"] == "spawn":
+        center = (float(data["x"]), float(data["y"])) if "x" in data and "y" in data else None
+        simulation.spawn(
+            species_id=data["speciesId"],
+            count=max(0, min(int(data.get("count", 100)), MAX_SPAWN)),
+            shape=SpawnShape(data.get("shape", SpawnShape.UNIFORM)),
+            center=center,
+            radius=float(data["radius"]) if "radius" in data else None
+        )
+    elif data["type"] == "start_recording":
+        os.makedirs(RECORDINGS_DIR, exist_ok=True)
+        simulation.start_recording(recording_path(data["name"]), max_bytes=RECORDING_MAX_BYTES)
+    elif data["type"] == "stop_recording":
+        simulation.stop_recording()
+    elif data["type"] == "replay":
+        await simulation.start_replay(
+            recording_path(data["name"]),
+            speed=replay_speed(data.get("speed", 1.0)),
+            start_tick=tick_number(data["fromTick"], "fromTick") if data.get("fromTick") is not None else None
+        )
+    elif data["type"] == "stop_replay":
+        await simulation.stop_replay()
+
+def answer_query(simulation: SimulationManager, data: Dict) -> Optional[Dict]:
+    """Answer a read-only client request"""
+    if data["type"] == "history":
+        return simulation.get_history_window()
+    elif data["type"] == "scrub":
+        return simulation.get_history_frame(tick_number(data.get("tick")))
+    elif data["type"] == "stats":
+        since = data.get("since")
+        try:
+            since = float(since) if since is not None else None
+        except (TypeError, ValueError):
+            raise ValueError("since must be a timestamp") from None
+        return simulation.get_stats(data.get("resolution", "second"), since)
+    return None
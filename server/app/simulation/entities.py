@@ -0,0 +1,89 @@
+# server/app/simulation/entities.py
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+
+from app.models import simulation as schema
+from app.models.simulation import ParticleType, Diet, ReproductionStyle
+
+# The tick loop's own representation of the world. These mirror the pydantic models in
+# app.models.simulation field for field, but as slotted dataclasses: no per-field validation
+# on construction or assignment and no per-instance __dict__. Untrusted input is validated
+# against the pydantic schema first and converted with the from_schema helpers.
+
+@dataclass(slots=True)
+class Position:
+    x: float
+    y: float
+
+@dataclass(slots=True)
+class Velocity:
+    x: float
+    y: float
+
+@dataclass(slots=True, kw_only=True)
+class ParticleAttributes:
+    energy: float = 100.0
+    hunger: float = 0.0
+    size: float = 3.0
+    age: int = 0
+    lastReproduced: int = 0
+    lastAte: int = 0
+    diet: Diet
+    reproductionStyle: ReproductionStyle
+    packMentality: float = 0.5  # 0-1 scale
+    highEnergyHungerTime: int = 0  # Tracks time with high energy/hunger
+    meetingCount: Dict[str, int] = field(default_factory=dict)  # Tracks meetings with other particles
+    groupId: Optional[str] = None  # ID of the group this particle belongs to
+    isChild: bool = False
+    timeInGroup: int = 0
+
+@dataclass(slots=True, kw_only=True)
+class ParticleRules:
+    reproductionRate: float
+    energyConsumption: float
+    maxSpeed: float
+    visionRange: float
+    socialDistance: float
+    particleType: ParticleType = ParticleType.CREATURE
+
+    @classmethod
+    def from_schema(cls, rules: schema.ParticleRules) -> "ParticleRules":
+        """Convert rules validated by the API schema"""
+        return cls(**rules.model_dump())
+
+@dataclass(slots=True, kw_only=True)
+class Particle:
+    id: str
+    position: Position
+    velocity: Velocity
+    attributes: ParticleAttributes
+    rules: ParticleRules
+    speciesId: str
+    color: str
+
+@dataclass(slots=True, kw_only=True)
+class ParticleGroup:
+    # Members are tracked by the GroupManager's membership index, not per group
+    id: str
+    speciesId: str
+    parentIds: Optional[Set[str]]
+    childId: Optional[str]
+
+@dataclass(slots=True, kw_only=True)
+class Species:
+    id: str
+    name: str
+    color: str
+    baseRules: ParticleRules
+    population: int = 0
+    diet: Diet
+    reproductionStyle: ReproductionStyle
+
+@dataclass(slots=True, kw_only=True)
+class SimulationState:
+    particles: Dict[str, Particle]
+    species: Dict[str, Species]
+    groups: Dict[str, ParticleGroup]
+    worldWidth: int
+    worldHeight: int
+    tickCount: int = 0
@@ -0,0 +1,42 @@
+# server/app/simulation/frame_delta.py
+from typing import Dict
+
+def diff_frames(previous: Dict, current: Dict) -> Dict:
+    """Describe how to turn one get_frame() output into the next"""
+    previous_particles = previous["particles"]
+    current_particles = current["particles"]
+
+    changed = {
+        particle_id: entry for particle_id, entry in current_particles.items()
+        if previous_particles.get(particle_id) != entry
+    }
+    removed = [
+        particle_id for particle_id in previous_particles
+        if particle_id not in current_particles
+    ]
+
+    return {
+        "tickCount": current["tickCount"],
+        "metadataVersion": current["metadataVersion"],
+        "populations": current["populations"],
+        "particles": changed,
+        "removed": removed,
+        # Groups are few and churn constantly, so they are stored whole
+        "groups": current["groups"]
+    }
+
+def apply_delta(frame: Dict, delta: Dict) -> Dict:
+    """Build the frame a delta describes, leaving the base frame untouched"""
+    particles = dict(frame["particles"])
+    for particle_id in delta["removed"]:
+        particles.pop(particle_id, None)
+    particles.update(delta["particles"])
+
+    return {
+        "type": "frame",
+        "metadataVersion": delta["metadataVersion"],
+        "tickCount": delta["tickCount"],
+        "populations": delta["populations"],
+        "particles": particles,
+        "groups": delta["groups"]
+    }
@@ -1,35 +1,88 @@
 # server/app/simulation/group_manager.py
 import uuid
 import random
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
-from app.models.simulation import (
+import numpy as np
+
+from app.models.simulation import ParticleType
+from .entities import (
     SimulationState, Particle, ParticleGroup
 )
+from .group_membership import GroupMembership
+from .spatial_index import neighbor_pairs
+from .stats import PopulationStats
+
+def _find(parent: List[int], node: int) -> int:
+    """Union-find root of a node, halving the path on the way up"""
+    while parent[node] != node:
+        parent[node] = parent[parent[node]]
+        node = parent[node]
+    return node
 
 class GroupManager:
-    def __init__(self, state: SimulationState):
+    def __init__(self, state: SimulationState, stats: Optional[PopulationStats] = None):
         self.state = state
+        self.stats = stats or PopulationStats()
+        # Who is in which group; the groups in the state only hold per-group details
+        self.membership = GroupMembership()
+        # Largest pack merging will build; packs that would outgrow it stay apart
+        self.max_pack_size: int = 12
+        # Group id -> packs currently stepped as one agent by the level-of-detail pass; their
+        # members sit out the per-member updates until the pack is expanded
+        self.aggregated: Dict[str, object] = {}
+        # Reference ticks per tick; see SimulationManager.set_tick_rate
+        self.time_scale: float = 1.0
+
+    def _add_group(self, group: ParticleGroup):
+        self.state.groups[group.id] = group
+        self.membership.add_group(group.id)
+        self.stats.group_added(group.speciesId)
+
+    def _delete_group(self, group_id: str):
+        self.membership.remove_group(group_id)
+        self.stats.group_removed(self.state.groups.pop(group_id).speciesId)
+
+    def member_ids(self) -> Dict[str, List[str]]:
+        """Member ids of every group"""
+        return self.membership.member_ids()
+
+    def rebuild(self):
+        """Re-index membership from the particles' group ids, for when the whole world is replaced"""
+        self.membership.clear()
+        self.aggregated.clear()
+        for group_id in self.state.groups:
+            self.membership.add_group(group_id)
+        for particle in self.state.particles.values():
+            group_id = particle.attributes.groupId
+            if group_id in self.state.groups:
+                self.membership.join(particle, group_id)
+            elif group_id is not None:
+                particle.attributes.groupId = None
 
     def create_group(self, members: List[Particle], parent_ids: Optional[Set[str]] = None, child_id: Optional[str] = None) -> str:
         """Create a new group with the given members"""
         if len(members) < 2:
             return None
 
+        # A particle belongs to one group at a time
+        for member in members:
+            if member.attributes.groupId is not None:
+                self.leave_group(member, member.attributes.groupId)
+
         group_id = str(uuid.uuid4())
-        member_ids = {member.id for member in members}
         species_id = members[0].speciesId
 
-        self.state.groups[group_id] = ParticleGroup(
+        self._add_group(ParticleGroup(
             id=group_id,
-            memberIds=member_ids,
             speciesId=species_id,
             parentIds=parent_ids if parent_ids is not None else set(),
             childId=child_id
-        )
+        ))
 
         # Update member particles with group ID
         for member in members:
+            self.membership.join(member, group_id)
             member.attributes.groupId = group_id
             member.attributes.meetingCount = {}
 
@@ -37,115 +90,201 @@ class GroupManager:
 
     def leave_group(self, particle: Particle, group_id: str):
         """Remove a particle from its group"""
-        if group_id not in self.state.groups:
+        if group_id not in self.state.groups or self.membership.slot(particle.id) is None:
             return
+        pack = self.aggregated.pop(group_id, None)
+        if pack is not None:
+            pack.flush()  # Back to individual members before one of them goes
+        self.membership.leave(particle)
 
-        group = self.state.groups[group_id]
-        
-        # Remove particle from group
-        if particle.id in group.memberIds:
-            group.memberIds.remove(particle.id)
-        
         # Clear particle's group reference
         particle.attributes.groupId = None
         particle.attributes.timeInGroup = 0
         particle.attributes.meetingCount = {}
-        
+
         # Remove empty or single-member groups
-        if len(group.memberIds) < 2:
-            for member_id in group.memberIds:
-                if member_id in self.state.particles:
-                    self.state.particles[member_id].attributes.groupId = None
-                    self.state.particles[member_id].attributes.timeInGroup = 0
-                    self.state.particles[member_id].attributes.meetingCount = {}
-            del self.state.groups[group_id]
+        if self.membership.size(group_id) < 2:
+            for member in self.membership.members(group_id):
+                self.membership.leave(member)
+                member.attributes.groupId = None
+                member.attributes.timeInGroup = 0
+                member.attributes.meetingCount = {}
+            self._delete_group(group_id)
 
     def merge_groups(self, group1_id: str, group2_id: str):
         """Merge two groups if they are compatible"""
         if group1_id not in self.state.groups or group2_id not in self.state.groups:
             return
 
-        group1 = self.state.groups[group1_id]
-        group2 = self.state.groups[group2_id]
-
-        if group1.speciesId != group2.speciesId:
+        if self.state.groups[group1_id].speciesId != self.state.groups[group2_id].speciesId:
             return
 
-        new_members = group1.memberIds.union(group2.memberIds)
-        parent_ids = (group1.parentIds or set()).union(group2.parentIds or set())
-        child_ids = set()
-        if group1.childId:
-            child_ids.add(group1.childId)
-        if group2.childId:
-            child_ids.add(group2.childId)
-
-        new_group_id = str(uuid.uuid4())
-        self.state.groups[new_group_id] = ParticleGroup(
-            id=new_group_id,
-            memberIds=new_members,
-            speciesId=group1.speciesId,
-            parentIds=parent_ids,
-            childId=list(child_ids)[0] if child_ids else None
-        )
+        self._merge([([group1_id, group2_id], [])])
+
+    def _merge(self, packs: List[Tuple[List[str], List[Particle]]]):
+        """Fold each pack's groups into its largest one and add its loners, relabelling all at once"""
+        membership = self.membership
+        targets: Dict[int, int] = {}
+        absorbed: Dict[str, str] = {}  # Absorbed group id -> the group it went into
+        for group_ids, loners in packs:
+            survivor_id = max(group_ids, key=membership.size)
+            survivor = self.state.groups[survivor_id]
+            survivor_number = membership.number(survivor_id)
+            for group_id in group_ids:
+                if group_id == survivor_id:
+                    continue
+                group = self.state.groups[group_id]
+                survivor.parentIds = (survivor.parentIds or set()).union(group.parentIds or set())
+                if survivor.childId is None:
+                    survivor.childId = group.childId
+                targets[membership.number(group_id)] = survivor_number
+                absorbed[group_id] = survivor_id
+            for loner in loners:
+                membership.join(loner, survivor_id)
+                loner.attributes.groupId = survivor_id
+                loner.attributes.meetingCount = {}
 
         # Update member references
-        for member_id in new_members:
-            if member_id in self.state.particles:
-                self.state.particles[member_id].attributes.groupId = new_group_id
+        for member in membership.relabel(targets):
+            member.attributes.groupId = absorbed[member.attributes.groupId]
 
         # Remove old groups
-        del self.state.groups[group1_id]
-        del self.state.groups[group2_id]
+        for group_id in absorbed:
+            self._delete_group(group_id)
 
-    def update_groups(self):
-        """Update particle groups"""
-        groups_to_remove = set()
-        
-        for group_id, group in list(self.state.groups.items()):
-            valid_members = set()
-            
-            for member_id in list(group.memberIds):
-                if member_id not in self.state.particles:
-                    continue
-                    
-                particle = self.state.particles[member_id]
-                particle.attributes.timeInGroup += 1
-                particle.attributes.energy = min(100, particle.attributes.energy + 0.1)
-                
-                should_leave = self._should_leave_group(particle, group)
-                
-                if should_leave:
-                    self.leave_group(particle, group_id)
+    def merge_packs(self):
+        """Merge same-species groups, and the loners around them, that are within social distance"""
+        membership = self.membership
+        if not self.state.groups:
+            return
+        species_ids = {group.speciesId for group in self.state.groups.values()}
+        candidates: Dict[str, List[Particle]] = {species_id: [] for species_id in species_ids}
+        for particle in self.state.particles.values():
+            if (particle.speciesId in candidates and particle.rules.particleType != ParticleType.PLANT
+                    and particle.attributes.groupId not in self.aggregated):
+                candidates[particle.speciesId].append(particle)
+
+        packs: List[Tuple[List[str], List[Particle]]] = []
+        for species_id, particles in candidates.items():
+            count = len(particles)
+            if count < 2:
+                continue
+            xs = np.fromiter((p.position.x for p in particles), dtype=np.float64, count=count)
+            ys = np.fromiter((p.position.y for p in particles), dtype=np.float64, count=count)
+            slots = [membership.slot(p.id) for p in particles]
+            groups = membership.groups
+            numbers = np.fromiter(
+                (groups[slot] if slot is not None else -1 for slot in slots), dtype=np.int64, count=count
+            )
+
+            first, second = neighbor_pairs(xs, ys, self.state.species[species_id].baseRules.socialDistance)
+            # Members of one group are already together. Loner pairs stay in: they link loners
+            # into a pack through each other, though loners alone never make a pack
+            useful = (numbers[first] < 0) | (numbers[first] != numbers[second])
+            first, second = first[useful], second[useful]
+            if len(first) == 0:
+                continue
+
+            # Union-find over the particles, with every group's members starting out joined
+            parent = np.arange(count)
+            size = np.ones(count, dtype=np.int64)
+            grouped = np.flatnonzero(numbers >= 0)
+            _, leaders, leader_of = np.unique(numbers[grouped], return_index=True, return_inverse=True)
+            parent[grouped] = grouped[leaders][leader_of]
+            size[grouped[leaders]] = np.bincount(leader_of)
+            parent, size = parent.tolist(), size.tolist()
+            for a, b in zip(first.tolist(), second.tolist()):
+                root_a, root_b = _find(parent, a), _find(parent, b)
+                if root_a != root_b and size[root_a] + size[root_b] <= self.max_pack_size:
+                    if size[root_a] < size[root_b]:
+                        root_a, root_b = root_b, root_a
+                    parent[root_b] = root_a
+                    size[root_a] += size[root_b]
+
+            components: Dict[int, Tuple[Set[int], List[Particle]]] = {}
+            for node in np.unique(np.concatenate([first, second])).tolist():
+                group_numbers, loners = components.setdefault(_find(parent, node), (set(), []))
+                if numbers[node] >= 0:
+                    group_numbers.add(int(numbers[node]))
                 else:
-                    valid_members.add(member_id)
-            
-            group.memberIds = valid_members
-            
-            if len(group.memberIds) < 2:
-                groups_to_remove.add(group_id)
-                for member_id in group.memberIds:
-                    if member_id in self.state.particles:
-                        self.state.particles[member_id].attributes.groupId = None
-        
-        for group_id in groups_to_remove:
-            if group_id in self.state.groups:
-                del self.state.groups[group_id]
-
-    def _should_leave_group(self, particle: Particle, group: ParticleGroup) -> bool:
-        """Determine if a particle should leave its group"""
-        # Leave if energy is high enough and not a child
-        if particle.attributes.energy >= 70 and not particle.attributes.isChild:
-            return True
-        
-        # Random chance to leave based on pack mentality
-        if random.random() > particle.attributes.packMentality:
-            return True
-        
-        # Children leave when they're old enough
-        if (particle.attributes.isChild and 
-            particle.attributes.age > 100 and 
-            particle.id == group.childId):
-            particle.attributes.isChild = False  # Update child status
-            return True
-        
-        return False
\ No newline at end of file
+                    loners.append(particles[node])
+            for group_numbers, loners in components.values():
+                if group_numbers and (len(group_numbers) > 1 or loners):
+                    packs.append(([membership.group_id(number) for number in group_numbers], loners))
+
+        if packs:
+            self._merge(packs)
+
+    def update_groups(self):
+        """Update particle groups: the energy bonus, departures and dissolving, each as one bulk step"""
+        membership = self.membership
+        count = len(membership)
+        if count == 0:
+            return
+
+        groups = membership.groups
+        attributes = [particle.attributes for particle in membership.particles]
+        energy = np.fromiter((a.energy for a in attributes), dtype=np.float64, count=count)
+        pack_mentality = np.fromiter((a.packMentality for a in attributes), dtype=np.float64, count=count)
+        age = np.fromiter((a.age for a in attributes), dtype=np.int64, count=count)
+        is_child = np.fromiter((a.isChild for a in attributes), dtype=bool, count=count)
+
+        # Aggregated packs account for their own members
+        dormant = None
+        if self.aggregated:
+            dormant = np.isin(groups, [membership.number(group_id) for group_id in self.aggregated])
+
+        boosted = np.minimum(100.0, energy + 0.1 * self.time_scale)
+        if dormant is not None:
+            boosted[dormant] = energy[dormant]
+
+        # Seeded from random, like the rest of the tick, so departures replay from a checkpoint
+        rng = np.random.default_rng(random.getrandbits(64))
+        # Leave if energy is high enough and not a child, or by chance against pack mentality;
+        # staying is a pack_mentality chance per reference tick
+        leaving = ((boosted >= 70) & ~is_child) | (rng.random(count) > pack_mentality ** self.time_scale)
+        if dormant is not None:
+            leaving &= ~dormant
+
+        # Children leave when they're old enough, but only the child the group formed around
+        group_child = np.zeros(count, dtype=bool)
+        for group in self.state.groups.values():
+            if group.childId is not None:
+                slot = membership.slot(group.childId)
+                if slot is not None and groups[slot] == membership.number(group.id):
+                    group_child[slot] = True
+        graduating = ~leaving & is_child & (age * self.time_scale > 100) & group_child  # Age is in ticks
+        leaving |= graduating
+
+        # Remove empty or single-member groups
+        used = np.unique(groups)
+        staying = np.bincount(groups[~leaving], minlength=int(used[-1]) + 1)
+        dissolved = used[staying[used] < 2]
+        if len(dissolved):
+            leaving |= np.isin(groups, dissolved)
+
+        if dormant is None:
+            for attribute, value in zip(attributes, boosted.tolist()):
+                attribute.energy = value
+                attribute.timeInGroup += 1
+        else:
+            awake = np.flatnonzero(~dormant)
+            for slot, value in zip(awake.tolist(), boosted[awake].tolist()):
+                attributes[slot].energy = value
+                attributes[slot].timeInGroup += 1
+        gains = np.bincount(groups, weights=boosted - energy)
+        for number in used.tolist():
+            group_id = membership.group_id(number)
+            self.stats.changed(self.state.groups[group_id].speciesId, energy=float(gains[number]))
+
+        for slot in np.flatnonzero(graduating).tolist():
+            attributes[slot].isChild = False
+        for slot in np.flatnonzero(leaving).tolist():
+            attribute = attributes[slot]
+            attribute.groupId = None
+            attribute.timeInGroup = 0
+            attribute.meetingCount = {}
+        membership.keep(~leaving)
+
+        for number in dissolved.tolist():
+            self._delete_group(membership.group_id(number))
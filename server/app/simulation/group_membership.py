@@ -0,0 +1,131 @@
+# server/app/simulation/group_membership.py
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .entities import Particle
+
+class GroupMembership:
+    """Which group each grouped particle is in, as dense arrays indexed by member slot"""
+    # Groups get small reusable numbers, so per-group work (sizes, energy sums, dissolving)
+    # runs as numpy operations over the slot arrays instead of set lookups
+    def __init__(self, capacity: int = 256):
+        self.particles: List[Particle] = []  # Slot -> member
+        self._groups = np.empty(capacity, dtype=np.int32)  # Slot -> group number
+        self._slots: Dict[str, int] = {}  # Particle id -> slot
+        self._numbers: Dict[str, int] = {}  # Group id -> group number
+        self._ids: List[Optional[str]] = []  # Group number -> group id
+        self._sizes: List[int] = []  # Group number -> member count
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.particles)
+
+    @property
+    def groups(self) -> np.ndarray:
+        """Group number of every slot"""
+        return self._groups[:len(self.particles)]
+
+    def group_id(self, number: int) -> Optional[str]:
+        return self._ids[number]
+
+    def number(self, group_id: str) -> Optional[int]:
+        return self._numbers.get(group_id)
+
+    def size(self, group_id: str) -> int:
+        number = self._numbers.get(group_id)
+        return self._sizes[number] if number is not None else 0
+
+    def add_group(self, group_id: str) -> int:
+        number = self._free.pop() if self._free else len(self._ids)
+        if number == len(self._ids):
+            self._ids.append(group_id)
+            self._sizes.append(0)
+        else:
+            self._ids[number] = group_id
+            self._sizes[number] = 0
+        self._numbers[group_id] = number
+        return number
+
+    def remove_group(self, group_id: str):
+        """Forget an empty group and recycle its number"""
+        number = self._numbers.pop(group_id)
+        self._ids[number] = None
+        self._free.append(number)
+
+    def join(self, particle: Particle, group_id: str):
+        number = self._numbers[group_id]
+        slot = len(self.particles)
+        if slot == len(self._groups):
+            self._groups = np.resize(self._groups, slot * 2)
+        self.particles.append(particle)
+        self._groups[slot] = number
+        self._slots[particle.id] = slot
+        self._sizes[number] += 1
+
+    def leave(self, particle: Particle) -> Optional[str]:
+        """Drop one member, moving the last slot into its place; returns the group it left"""
+        slot = self._slots.pop(particle.id, None)
+        if slot is None:
+            return None
+        number = int(self._groups[slot])
+        self._sizes[number] -= 1
+        last = self.particles.pop()
+        if slot < len(self.particles):
+            self.particles[slot] = last
+            self._groups[slot] = self._groups[len(self.particles)]
+            self._slots[last.id] = slot
+        return self._ids[number]
+
+    def slot(self, particle_id: str) -> Optional[int]:
+        return self._slots.get(particle_id)
+
+    def members(self, group_id: str) -> List[Particle]:
+        number = self._numbers.get(group_id)
+        if number is None:
+            return []
+        return [self.particles[slot] for slot in np.flatnonzero(self.groups == number).tolist()]
+
+    def relabel(self, targets: Dict[int, int]) -> List[Particle]:
+        """Move every member of each source group into its target group in one pass"""
+        remap = np.arange(len(self._ids), dtype=np.int32)
+        for number, target in targets.items():
+            remap[number] = target
+            self._sizes[target] += self._sizes[number]
+            self._sizes[number] = 0
+        groups = self.groups
+        moved = np.flatnonzero(remap[groups] != groups)
+        groups[moved] = remap[groups[moved]]
+        return [self.particles[slot] for slot in moved.tolist()]
+
+    def keep(self, mask: np.ndarray):
+        """Keep only the slots where mask is set, compacting the arrays in one pass"""
+        kept = np.flatnonzero(mask)
+        groups = self.groups[kept]
+        self.particles = [self.particles[slot] for slot in kept.tolist()]
+        self._groups[:len(groups)] = groups
+        self._slots = {particle.id: slot for slot, particle in enumerate(self.particles)}
+        sizes = np.bincount(groups, minlength=len(self._sizes)).tolist()
+        self._sizes[:] = sizes
+
+    def member_ids(self) -> Dict[str, List[str]]:
+        """Member ids of every group, read off contiguous runs of the slots sorted by group"""
+        if not self.particles:
+            return {}
+        order = np.argsort(self.groups, kind="stable")
+        groups = self.groups[order]
+        ids = [self.particles[slot].id for slot in order.tolist()]
+        starts = [0, *(np.flatnonzero(np.diff(groups)) + 1).tolist()]
+        ends = starts[1:] + [len(ids)]
+        return {
+            self._ids[number]: ids[start:end]
+            for number, start, end in zip(groups[starts].tolist(), starts, ends)
+        }
+
+    def clear(self):
+        self.particles = []
+        self._slots.clear()
+        self._numbers.clear()
+        self._ids.clear()
+        self._sizes.clear()
+        self._free.clear()
@@ -0,0 +1,123 @@
+# server/app/simulation/history.py
+import bisect
+import json
+import queue
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from .frame_delta import diff_frames, apply_delta
+
+def _pack(record: Dict) -> bytes:
+    return zlib.compress(json.dumps(record, separators=(",", ":")).encode("utf-8"), 1)
+
+def _unpack(data: bytes) -> Dict:
+    return json.loads(zlib.decompress(data))
+
+class _Segment:
+    """A keyframe and the deltas that follow it, all compressed"""
+    __slots__ = ("first_tick", "last_tick", "keyframe", "deltas", "delta_ticks", "size", "updated_at")
+
+    def __init__(self, frame: Dict):
+        self.first_tick: int = frame["tickCount"]
+        self.last_tick: int = frame["tickCount"]
+        self.keyframe: bytes = _pack(frame)
+        self.deltas: List[bytes] = []
+        self.delta_ticks: List[int] = []
+        self.size: int = len(self.keyframe)
+        self.updated_at: float = time.monotonic()
+
+    def append(self, tick: int, data: bytes):
+        self.deltas.append(data)
+        self.delta_ticks.append(tick)
+        self.last_tick = tick
+        self.size += len(data)
+        self.updated_at = time.monotonic()
+
+class TickHistory:
+    """Memory-bounded window of recent frames: keyframes every K ticks plus compact deltas"""
+    def __init__(self, keyframe_interval: int = 60, max_age: float = 300.0,
+                 max_bytes: int = 64 * 1024 * 1024, max_pending: int = 600):
+        self.keyframe_interval = keyframe_interval
+        self.max_age = max_age  # Seconds
+        self.max_bytes = max_bytes
+        self.dropped: int = 0
+        self.total_bytes: int = 0
+        self._segments: List[_Segment] = []
+        self._lock = threading.Lock()
+        self._pending: "queue.Queue[Optional[Dict]]" = queue.Queue(max_pending)
+        self._thread = threading.Thread(target=self._compress_loop, name="tick-history", daemon=True)
+        self._thread.start()
+
+    def record(self, frame: Dict):
+        """Queue a live frame; compression happens off the tick loop"""
+        try:
+            self._pending.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self._pending.put(None)
+        self._thread.join()
+
+    def window(self) -> Tuple[Optional[int], Optional[int]]:
+        """First and last tick that can currently be rebuilt"""
+        with self._lock:
+            if not self._segments:
+                return None, None
+            return self._segments[0].first_tick, self._segments[-1].last_tick
+
+    def frame_at(self, tick: int) -> Optional[Dict]:
+        """Rebuild the frame for a tick (or the closest earlier one) from its keyframe"""
+        with self._lock:
+            if not self._segments or tick < self._segments[0].first_tick:
+                return None
+            position = bisect.bisect_right([segment.first_tick for segment in self._segments], tick) - 1
+            segment = self._segments[position]
+            keyframe = segment.keyframe
+            count = bisect.bisect_right(segment.delta_ticks, tick)
+            deltas = segment.deltas[:count]
+
+        # Decompression runs outside the lock so the compressor thread is never held up
+        frame = _unpack(keyframe)
+        for data in deltas:
+            frame = apply_delta(frame, _unpack(data))
+        return frame
+
+    def _compress_loop(self):
+        previous: Optional[Dict] = None
+        while True:
+            frame = self._pending.get()
+            if frame is None:
+                break
+            # Only this thread mutates the segment list, so it can look without the lock
+            # and keep compression outside it
+            tick = frame["tickCount"]
+            segment = self._segments[-1] if self._segments else None
+            # A tick that doesn't move forward means the world was replaced (e.g. restored)
+            restarted = segment is not None and tick <= segment.last_tick
+            if (segment is None or restarted or previous is None or
+                    tick - segment.first_tick >= self.keyframe_interval):
+                segment = _Segment(frame)
+                with self._lock:
+                    if restarted:
+                        self._segments.clear()
+                        self.total_bytes = 0
+                    self._segments.append(segment)
+                    self.total_bytes += segment.size
+                    self._evict()
+            else:
+                data = _pack(diff_frames(previous, frame))
+                with self._lock:
+                    segment.append(tick, data)
+                    self.total_bytes += len(data)
+                    self._evict()
+            previous = frame
+
+    def _evict(self):
+        """Drop whole segments from the front until age and byte budgets hold"""
+        cutoff = time.monotonic() - self.max_age
+        while len(self._segments) > 1 and (
+                self.total_bytes > self.max_bytes or self._segments[0].updated_at < cutoff):
+            self.total_bytes -= self._segments.pop(0).size
@@ -0,0 +1,215 @@
+# server/app/simulation/pack_lod.py
+import math
+from typing import Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from app.models.simulation import ParticleType, Diet
+from .entities import SimulationState, Particle
+from .group_manager import GroupManager
+from .stats import PopulationStats
+
+# [x, y, width, height] of the world area one client is looking at
+Viewport = Sequence[float]
+
+class AggregatePack:
+    """A pack stepped as one agent: centroid, spread, mean velocity and summed energy"""
+    # Members keep their offsets from the centroid, so they come back where they were relative to
+    # each other. What the full update would have done to each of them (movement cost, the group's
+    # energy bonus, hunger, age) is the same for every member at the shared velocity, and is
+    # accumulated here and written back when the pack expands
+    __slots__ = (
+        "group_id", "species_id", "members", "offsets", "centroid", "velocity", "spread",
+        "energy", "energy_rate", "hunger_rate", "time_scale", "lowest_energy", "highest_energy",
+        "highest_hunger", "ticks", "flushed"
+    )
+
+    def __init__(self, group_id: str, members: List[Particle], width: float, height: float,
+                 time_scale: float = 1.0):
+        self.group_id = group_id
+        self.species_id = members[0].speciesId
+        self.members = members
+        count = len(members)
+
+        # Offsets from the first member, unwrapped across the world's edges
+        anchor = members[0].position
+        dx = np.fromiter((p.position.x - anchor.x for p in members), dtype=np.float64, count=count)
+        dy = np.fromiter((p.position.y - anchor.y for p in members), dtype=np.float64, count=count)
+        dx -= width * np.round(dx / width)
+        dy -= height * np.round(dy / height)
+        center_x, center_y = float(dx.mean()), float(dy.mean())
+        self.offsets = np.column_stack([dx - center_x, dy - center_y])
+        self.centroid = [(anchor.x + center_x) % width, (anchor.y + center_y) % height]
+        self.spread = float(np.sqrt((self.offsets ** 2).sum(axis=1).mean()))
+
+        velocity_x = sum(p.velocity.x for p in members) / count
+        velocity_y = sum(p.velocity.y for p in members) / count
+        self.velocity = (velocity_x, velocity_y)
+        for member in members:
+            member.velocity.x, member.velocity.y = velocity_x, velocity_y
+
+        rules = members[0].rules
+        speed = math.hypot(velocity_x, velocity_y)
+        self.energy_rate = 0.1 - rules.energyConsumption * (speed / rules.maxSpeed) * 0.5
+        if speed < 0.1:
+            self.energy_rate += 0.02
+        # Per tick, like the full update at this tick rate
+        self.time_scale = time_scale
+        self.energy_rate *= time_scale
+        self.hunger_rate = 0.05 * time_scale
+        energies = [p.attributes.energy for p in members]
+        self.energy = sum(energies)
+        self.lowest_energy = min(energies)
+        self.highest_energy = max(energies)
+        self.highest_hunger = max(p.attributes.hunger for p in members)
+        self.ticks = 0  # Ticks stepped as a whole
+        self.flushed = 0  # Of those, ticks already written back to the members
+
+    def step(self, width: float, height: float, stats: PopulationStats):
+        """Move the pack and age it by one tick"""
+        self.centroid[0] = (self.centroid[0] + self.velocity[0] * self.time_scale) % width
+        self.centroid[1] = (self.centroid[1] + self.velocity[1] * self.time_scale) % height
+        self.ticks += 1
+        count = len(self.members)
+        self.energy += self.energy_rate * count
+        stats.changed(self.species_id, self.energy_rate * count, self.hunger_rate * count)
+
+        # Other particles still see the members, so keep them where the pack is
+        xs = ((self.offsets[:, 0] + self.centroid[0]) % width).tolist()
+        ys = ((self.offsets[:, 1] + self.centroid[1]) % height).tolist()
+        for member, x, y in zip(self.members, xs, ys):
+            member.position.x, member.position.y = x, y
+
+    def needs_members(self, low_energy: float, high_energy: float, hungry: float) -> bool:
+        """Whether a member would now do something the aggregate does not model"""
+        drift = self.energy_rate * self.ticks
+        return (self.lowest_energy + drift <= low_energy or self.highest_energy + drift >= high_energy
+                or self.highest_hunger + self.hunger_rate * self.ticks >= hungry)
+
+    def flush(self):
+        """Write the changes accumulated so far back to the members"""
+        ticks = self.ticks - self.flushed
+        if ticks == 0:
+            return
+        energy_change = self.energy_rate * ticks
+        for member in self.members:
+            attributes = member.attributes
+            attributes.energy = min(100, attributes.energy + energy_change)
+            attributes.hunger += self.hunger_rate * ticks
+            attributes.age += ticks
+            attributes.timeInGroup += ticks
+        self.flushed = self.ticks
+
+class PackLevelOfDetail:
+    """Steps stable packs nobody is looking at as single agents, expanding them when that changes"""
+    def __init__(self, state: SimulationState, group_manager: GroupManager, stats: PopulationStats):
+        self.state = state
+        self.group_manager = group_manager
+        self.stats = stats
+        self.packs: Dict[str, AggregatePack] = group_manager.aggregated  # Group id -> pack
+        self.min_size: int = 6  # Smaller packs cost little to simulate in full
+        self.stable_ticks: int = 60  # Every member must have been in the pack this long
+        self.margin: float = 100.0  # Distance outside a viewport still treated as visible
+        self.max_ticks: int = 600  # Expand at least this often so departures and drift catch up
+        # Members expand before they would leave for high energy, starve or go looking for food
+        self.low_energy: float = 20.0
+        self.high_energy: float = 70.0
+        self.hungry: float = 50.0
+        # Reference ticks per tick; see SimulationManager.set_tick_rate
+        self.time_scale: float = 1.0
+
+    def update(self, viewports: Optional[List[Viewport]], collapse: bool = False):
+        """Expand packs that are visible, threatened or need their members, step the rest,
+        and optionally collapse newly eligible packs; viewports None means everything is visible"""
+        if not self.packs and (not collapse or viewports is None):
+            return
+        width, height = self.state.worldWidth, self.state.worldHeight
+        prey = {pack.species_id for pack in self.packs.values()}
+        if collapse and viewports is not None:
+            prey.update(group.speciesId for group in self.state.groups.values())
+        predators = self._predators(prey)
+        for pack in list(self.packs.values()):
+            if (viewports is None or pack.ticks >= self.max_ticks
+                    or pack.needs_members(self.low_energy, self.high_energy, self.hungry)
+                    or self._visible(pack.centroid, pack.spread, viewports)
+                    or self._threatened(pack.species_id, pack.centroid, pack.spread, predators)):
+                self.expand(pack.group_id)
+            else:
+                pack.step(width, height, self.stats)
+        if collapse and viewports is not None:
+            self._collapse(viewports, predators)
+
+    def expand(self, group_id: str):
+        """Hand a pack's members back to the full simulation"""
+        pack = self.packs.pop(group_id, None)
+        if pack is not None:
+            pack.flush()
+
+    def expand_all(self):
+        for group_id in list(self.packs):
+            self.expand(group_id)
+
+    def flush(self):
+        """Bring every aggregated member's attributes up to date, e.g. before a checkpoint"""
+        for pack in self.packs.values():
+            pack.flush()
+
+    def _collapse(self, viewports: List[Viewport], predators: Dict[str, np.ndarray]):
+        width, height = self.state.worldWidth, self.state.worldHeight
+        particles = self.state.particles
+        for group_id, member_ids in self.group_manager.member_ids().items():
+            if len(member_ids) < self.min_size or group_id in self.packs:
+                continue
+            members = [particles[member_id] for member_id in member_ids]
+            if any(
+                p.rules.particleType == ParticleType.PLANT or p.attributes.isChild
+                or p.attributes.timeInGroup < self.stable_ticks
+                for p in members
+            ):
+                continue
+            pack = AggregatePack(group_id, members, width, height, self.time_scale)
+            if (pack.needs_members(self.low_energy, self.high_energy, self.hungry)
+                    or self._visible(pack.centroid, pack.spread, viewports)
+                    or self._threatened(pack.species_id, pack.centroid, pack.spread, predators)):
+                continue
+            self.packs[group_id] = pack
+
+    def _visible(self, centroid: List[float], spread: float, viewports: List[Viewport]) -> bool:
+        reach = 2 * spread + self.margin
+        for x, y, width, height in viewports:
+            dx = max(x - centroid[0], 0.0, centroid[0] - (x + width))
+            dy = max(y - centroid[1], 0.0, centroid[1] - (y + height))
+            if dx * dx + dy * dy <= reach * reach:
+                return True
+        return False
+
+    def _predators(self, prey: Set[str]) -> Dict[str, np.ndarray]:
+        """Rows of x, y and vision range of the creatures able to eat each of the prey species"""
+        species = self.state.species
+        prey = {species_id for species_id in prey if species_id in species}
+        if not prey:
+            return {}
+        hunters: Dict[Diet, List] = {Diet.CARNIVORE: [], Diet.OMNIVORE: []}
+        for particle in self.state.particles.values():
+            rows = hunters.get(particle.attributes.diet)
+            if rows is not None and particle.rules.particleType != ParticleType.PLANT:
+                rows.append((particle.position.x, particle.position.y,
+                             particle.rules.visionRange, particle.speciesId))
+        # Carnivores only eat herbivores; omnivores eat any other species
+        threats: Dict[str, np.ndarray] = {}
+        for species_id in prey:
+            entry = species[species_id]
+            rows = [row for row in hunters[Diet.OMNIVORE] if row[3] != species_id]
+            if entry.diet == Diet.HERBIVORE:
+                rows.extend(hunters[Diet.CARNIVORE])
+            threats[species_id] = np.array([row[:3] for row in rows], dtype=np.float64).reshape(-1, 3)
+        return threats
+
+    def _threatened(self, species_id: str, centroid: List[float], spread: float,
+                    predators: Dict[str, np.ndarray]) -> bool:
+        rows = predators.get(species_id)
+        if rows is None or len(rows) == 0:
+            return False
+        reach = rows[:, 2] + 2 * spread
+        distance_sq = (rows[:, 0] - centroid[0]) ** 2 + (rows[:, 1] - centroid[1]) ** 2
+        return bool((distance_sq <= reach * reach).any())
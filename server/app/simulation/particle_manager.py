@@ -1,20 +1,35 @@
 # server/app/simulation/particle_manager.py
+import gc
+import os
 import uuid
 import random
 import math
 from typing import Dict, List, Optional
 
-from app.models.simulation import (
-    SimulationState, Particle, Species, Position, 
-    Velocity, ParticleAttributes, ParticleRules,
-    ParticleType, Diet, ReproductionStyle
+import numpy as np
+
+from app.models.simulation import ParticleType, Diet, ReproductionStyle, SpawnShape
+from .entities import (
+    SimulationState, Particle, Species, Position,
+    Velocity, ParticleAttributes, ParticleRules
 )
 from .group_manager import GroupManager
+from .stats import PopulationStats
 
 class ParticleManager:
-    def __init__(self, state: SimulationState):
+    def __init__(self, state: SimulationState, stats: Optional[PopulationStats] = None):
         self.state = state
-        self.group_manager = GroupManager(state)
+        # Every change to a particle's energy or hunger below is mirrored into these sums
+        self.stats = stats or PopulationStats()
+        self.group_manager = GroupManager(state, self.stats)
+        # Optional population cap; births and spawns stop while the world is full
+        self.max_particles: Optional[int] = None
+        # Reference ticks per tick; see SimulationManager.set_tick_rate
+        self.time_scale: float = 1.0
+
+    def has_room(self, pending: int = 0) -> bool:
+        """Whether another particle fits under the population cap"""
+        return self.max_particles is None or len(self.state.particles) + pending < self.max_particles
 
     def add_plant_species(self):
         """Add plant species to simulation"""
@@ -45,17 +60,107 @@ class ParticleManager:
             name=name,
             color=color,
             baseRules=rules,
-            population=initial_count,
+            population=0,  # Counted as the particles are spawned
             diet=diet,
             reproductionStyle=reproductionStyle
         )
 
         # Create initial particles for the species
-        for _ in range(initial_count):
-            self.add_particle(species_id)
+        self.spawn_particles(species_id, initial_count)
 
         return species_id
 
+    def spawn_particles(self, species_id: str, count: int, shape: SpawnShape = SpawnShape.UNIFORM,
+                        center: Optional[tuple] = None, radius: Optional[float] = None) -> List[str]:
+        """Create many particles of a species at once, laid out in the given shape"""
+        if species_id not in self.state.species:
+            raise ValueError("Species not found")
+        if self.max_particles is not None:
+            count = min(count, self.max_particles - len(self.state.particles))
+        if count <= 0:
+            return []
+
+        species = self.state.species[species_id]
+        rules = species.baseRules
+        is_plant = rules.particleType == ParticleType.PLANT
+        width, height = self.state.worldWidth, self.state.worldHeight
+        # Drawn from the stdlib generator so checkpoints, which save its state, stay reproducible
+        rng = np.random.default_rng(random.getrandbits(64))
+
+        if shape == SpawnShape.UNIFORM:
+            xs = rng.uniform(0, width, count)
+            ys = rng.uniform(0, height, count)
+        else:
+            if center is None:
+                center = (width / 2, height / 2) if shape == SpawnShape.RING else (
+                    rng.uniform(0, width), rng.uniform(0, height)
+                )
+            if radius is None:
+                radius = min(width, height) / (3 if shape == SpawnShape.RING else 10)
+            if shape == SpawnShape.CLUSTER:
+                xs = rng.normal(center[0], radius, count)
+                ys = rng.normal(center[1], radius, count)
+            else:
+                angles = rng.uniform(0, 2 * math.pi, count)
+                distances = rng.normal(radius, radius * 0.05, count)
+                xs = center[0] + np.cos(angles) * distances
+                ys = center[1] + np.sin(angles) * distances
+            # The world wraps, so shapes crossing an edge continue on the other side
+            xs = np.mod(xs, width)
+            ys = np.mod(ys, height)
+
+        if is_plant:
+            vxs = vys = np.zeros(count)
+            pack_mentality = np.zeros(count)
+        else:
+            headings = rng.uniform(0, 2 * math.pi, count)
+            speeds = rng.uniform(0, rules.maxSpeed, count)
+            vxs = np.cos(headings) * speeds
+            vys = np.sin(headings) * speeds
+            pack_mentality = rng.random(count)
+        energy = 100.0 if is_plant else 50.0
+
+        # One urandom call for all ids instead of a uuid4() per particle
+        id_bytes = os.urandom(16 * count)
+        ids = [str(uuid.UUID(bytes=id_bytes[i:i + 16], version=4)) for i in range(0, 16 * count, 16)]
+
+        # Collections triggered by tens of thousands of new objects would otherwise dominate the cost
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            particles = self._build_particles(
+                species, ids, xs.tolist(), ys.tolist(), vxs.tolist(), vys.tolist(),
+                pack_mentality.tolist(), energy
+            )
+        finally:
+            if gc_enabled:
+                gc.enable()
+        self.state.particles.update(particles)
+        species.population += count
+        self.stats.added_many(species_id, rules.particleType, count, energy * count, 0.0, float(pack_mentality.sum()))
+        return ids
+
+    def _build_particles(self, species: Species, ids: List[str], xs: List[float], ys: List[float],
+                         vxs: List[float], vys: List[float], pack_mentality: List[float],
+                         energy: float) -> Dict[str, Particle]:
+        return {
+            particle_id: Particle(
+                id=particle_id,
+                position=Position(x, y),
+                velocity=Velocity(vx, vy),
+                attributes=ParticleAttributes(
+                    energy=energy,
+                    diet=species.diet,
+                    reproductionStyle=species.reproductionStyle,
+                    packMentality=mentality
+                ),
+                rules=species.baseRules,
+                speciesId=species.id,
+                color=species.color
+            )
+            for particle_id, x, y, vx, vy, mentality in zip(ids, xs, ys, vxs, vys, pack_mentality)
+        }
+
     def add_particle(self, species_id: str) -> str:
         """Add a new particle to the simulation"""
         if species_id not in self.state.species:
@@ -72,12 +177,12 @@ class ParticleManager:
         angle = random.uniform(0, 2 * math.pi)
         speed = random.uniform(0, species.baseRules.maxSpeed)
         velocity = Velocity(
-            x=math.cos(angle) * speed if species.baseRules.particleType != ParticleType.PLANT else 0,
-            y=math.sin(angle) * speed if species.baseRules.particleType != ParticleType.PLANT else 0
+            x=math.cos(angle) * speed if species.baseRules.particleType != ParticleType.PLANT else 0.0,
+            y=math.sin(angle) * speed if species.baseRules.particleType != ParticleType.PLANT else 0.0
         )
 
         # Set initial energy for plants
-        initial_energy = 100 if species.baseRules.particleType == ParticleType.PLANT else 50
+        initial_energy = 100.0 if species.baseRules.particleType == ParticleType.PLANT else 50.0
 
         particle = Particle(
             id=particle_id,
@@ -87,7 +192,7 @@ class ParticleManager:
                 energy=initial_energy,
                 diet=species.diet,
                 reproductionStyle=species.reproductionStyle,
-                packMentality=random.random() if species.baseRules.particleType == ParticleType.CREATURE else 0
+                packMentality=random.random() if species.baseRules.particleType == ParticleType.CREATURE else 0.0
             ),
             rules=species.baseRules,
             speciesId=species_id,
@@ -96,6 +201,7 @@ class ParticleManager:
 
         self.state.particles[particle_id] = particle
         species.population += 1
+        self.stats.added(particle)
 
         return particle_id
 
@@ -110,8 +216,11 @@ class ParticleManager:
                 self._update_plant(particle, particles_to_remove)
 
         # Then update creatures (foreground layer)
+        aggregated = self.group_manager.aggregated
         for particle in list(self.state.particles.values()):
-            if particle.rules.particleType != ParticleType.PLANT:
+            # Skip creatures eaten earlier in this tick, and members of packs stepped as a whole
+            if (particle.rules.particleType != ParticleType.PLANT and particle.id in self.state.particles
+                    and particle.attributes.groupId not in aggregated):
                 self._update_particle_position(particle)
                 self._update_particle_attributes(particle)
 
@@ -125,7 +234,7 @@ class ParticleManager:
                     self._apply_behaviors(particle, nearby)
                     self._handle_eating(particle, nearby)
 
-                    if self._should_reproduce(particle):
+                    if self.has_room(len(new_particles)) and self._should_reproduce(particle):
                         new_particle = self._reproduce(particle)
                         if new_particle:
                             new_particles.append(new_particle)
@@ -137,12 +246,14 @@ class ParticleManager:
         for new_particle in new_particles:
             self.state.particles[new_particle.id] = new_particle
             self.state.species[new_particle.speciesId].population += 1
+            self.stats.added(new_particle)
 
     def _update_plant(self, plant: Particle, particles_to_remove: set):
         """Update plant particle"""
         # Gradual energy decay
-        decay_rate = plant.rules.energyConsumption
+        decay_rate = plant.rules.energyConsumption * self.time_scale
         plant.attributes.energy -= decay_rate
+        self.stats.changed(plant.speciesId, energy=-decay_rate)
 
         # Update color based on energy level
         energy_percentage = plant.attributes.energy / 100
@@ -158,25 +269,31 @@ class ParticleManager:
 
     def _update_particle_position(self, particle: Particle):
         """Update particle position"""
-        particle.position.x = (particle.position.x + particle.velocity.x) % self.state.worldWidth
-        particle.position.y = (particle.position.y + particle.velocity.y) % self.state.worldHeight
+        # Velocities are per reference tick
+        particle.position.x = (particle.position.x + particle.velocity.x * self.time_scale) % self.state.worldWidth
+        particle.position.y = (particle.position.y + particle.velocity.y * self.time_scale) % self.state.worldHeight
 
     def _update_particle_attributes(self, particle: Particle):
         """Update particle attributes"""
+        energy, hunger = particle.attributes.energy, particle.attributes.hunger
         particle.attributes.age += 1
         speed = math.sqrt(particle.velocity.x**2 + particle.velocity.y**2)
         energy_cost = particle.rules.energyConsumption * (speed / particle.rules.maxSpeed)
-        particle.attributes.energy -= energy_cost * 0.5
-        particle.attributes.hunger += 0.05
+        particle.attributes.energy -= energy_cost * 0.5 * self.time_scale
+        particle.attributes.hunger += 0.05 * self.time_scale
 
         if speed < 0.1:
-            particle.attributes.energy = min(100, particle.attributes.energy + 0.02)
+            particle.attributes.energy = min(100, particle.attributes.energy + 0.02 * self.time_scale)
 
         if particle.attributes.energy > 90 and particle.attributes.hunger > 90:
             particle.attributes.highEnergyHungerTime += 1
         else:
             particle.attributes.highEnergyHungerTime = 0
 
+        self.stats.changed(
+            particle.speciesId, particle.attributes.energy - energy, particle.attributes.hunger - hunger
+        )
+
     def _get_nearby_particles(self, particle: Particle) -> List[Particle]:
         """Get particles within vision range, filtered by diet and hunger rules"""
         nearby = []
@@ -218,8 +335,9 @@ class ParticleManager:
         cohesion = self._calculate_cohesion(particle, same_species)  # Only cohese with same species
         alignment = self._calculate_alignment(particle, same_species)  # Only align with same species
 
-        particle.velocity.x += (separation[0] + cohesion[0] + alignment[0]) * 0.1
-        particle.velocity.y += (separation[1] + cohesion[1] + alignment[1]) * 0.1
+        steering = 0.1 * self.time_scale
+        particle.velocity.x += (separation[0] + cohesion[0] + alignment[0]) * steering
+        particle.velocity.y += (separation[1] + cohesion[1] + alignment[1]) * steering
 
         speed = math.sqrt(particle.velocity.x**2 + particle.velocity.y**2)
         if speed > particle.rules.maxSpeed:
@@ -271,7 +389,7 @@ class ParticleManager:
         if particle.attributes.reproductionStyle == ReproductionStyle.SELF_REPLICATING:
             return (particle.attributes.energy > 90 and 
                    particle.attributes.hunger > 90 and
-                   particle.attributes.highEnergyHungerTime > 50)
+                   particle.attributes.highEnergyHungerTime * self.time_scale > 50)  # Counted in ticks
         else:
             nearby = self._get_nearby_particles(particle)
             potential_mates = [
@@ -336,13 +454,14 @@ class ParticleManager:
 
         if mate:
             initial_energy = (parent.attributes.energy + mate.attributes.energy) * 0.25
-            parent.attributes.energy *= 0.5
+            self.stats.changed(mate.speciesId, energy=-mate.attributes.energy * 0.5)
             mate.attributes.energy *= 0.5
             pack_mentality = (parent.attributes.packMentality + mate.attributes.packMentality) / 2
         else:
             initial_energy = parent.attributes.energy * 0.5
-            parent.attributes.energy *= 0.5
             pack_mentality = parent.attributes.packMentality
+        self.stats.changed(parent.speciesId, energy=-parent.attributes.energy * 0.5)
+        parent.attributes.energy *= 0.5
 
         parent.attributes.lastReproduced = 0
         
@@ -374,10 +493,11 @@ class ParticleManager:
             # Remove from species population count
             if particle.speciesId in self.state.species:
                 self.state.species[particle.speciesId].population -= 1
+            self.stats.removed(particle)
             
             # Remove from group if in one
             if particle.attributes.groupId:
-                self._leave_group(particle, particle.attributes.groupId)
+                self.group_manager.leave_group(particle, particle.attributes.groupId)
             
             # Remove from simulation
             del self.state.particles[particle_id]
@@ -449,9 +569,13 @@ class ParticleManager:
                 else:
                     energy_gain = other.attributes.energy * 0.7  # Increased energy transfer
 
-                particle.attributes.energy = min(100, particle.attributes.energy + energy_gain)
-                particle.attributes.hunger = max(0, particle.attributes.hunger - energy_gain)
+                energy, hunger = particle.attributes.energy, particle.attributes.hunger
+                particle.attributes.energy = min(100, energy + energy_gain)
+                particle.attributes.hunger = max(0, hunger - energy_gain)
                 particle.attributes.lastAte = 0
+                self.stats.changed(
+                    particle.speciesId, particle.attributes.energy - energy, particle.attributes.hunger - hunger
+                )
 
                 # Remove eaten particle
                 self._remove_particle(other.id)
@@ -0,0 +1,74 @@
+# server/app/simulation/power.py
+import asyncio
+import time
+from typing import Optional
+
+ACTIVE = "active"
+IDLE = "idle"
+HIBERNATING = "hibernating"
+
+class PowerGovernor:
+    """Slows a simulation down while nobody watches it and suspends it after an idle timeout"""
+    def __init__(self, simulation, idle_tick_rate: float = 5.0, hibernate_after: float = 300.0,
+                 fast_forward_limit: int = 0):
+        self.simulation = simulation
+        self.idle_tick_rate = idle_tick_rate  # Ticks per second without viewers; 0 keeps full speed
+        self.hibernate_after = hibernate_after  # Seconds without viewers before suspending; 0 never
+        self.fast_forward_limit = fast_forward_limit  # Most ticks replayed on wake to cover the suspended time
+        self.state: str = ACTIVE
+        self.viewers: int = 0
+        self._active_tick_rate: float = simulation.tick_rate
+        self._hibernate_timer: Optional[asyncio.TimerHandle] = None
+        self._hibernated_at: float = 0.0
+        self._resume_on_wake: bool = False
+
+    @property
+    def suspended(self) -> bool:
+        """Whether hibernation paused a world that should run again on wake"""
+        return self.state == HIBERNATING and self._resume_on_wake
+
+    async def set_viewers(self, count: int):
+        """Follow the number of connected viewers; the first call with zero starts idling"""
+        self.viewers = count
+        if count > 0 and self.state != ACTIVE:
+            await self._wake()
+        elif count == 0 and self.state == ACTIVE:
+            self._idle()
+
+    def _idle(self):
+        self.state = IDLE
+        self._active_tick_rate = self.simulation.tick_rate
+        if self.idle_tick_rate > 0:
+            self.simulation.tick_rate = max(self._active_tick_rate, 1 / self.idle_tick_rate)
+        if self.hibernate_after > 0:
+            # A timer rather than a polling loop, so an idle process has nothing to wake up for
+            self._hibernate_timer = asyncio.get_running_loop().call_later(
+                self.hibernate_after, lambda: asyncio.create_task(self._hibernate())
+            )
+
+    async def _hibernate(self):
+        self._hibernate_timer = None
+        if self.viewers or self.state != IDLE:
+            return
+        self.state = HIBERNATING
+        self._hibernated_at = time.monotonic()
+        # Only resume what was running; a world the users paused stays paused
+        self._resume_on_wake = self.simulation.is_running
+        await self.simulation.pause()
+        if self.simulation.checkpointer:
+            self.simulation.checkpointer.checkpoint(self.simulation)
+        print(f"Simulation hibernating at tick {self.simulation.state.tickCount}")
+
+    async def _wake(self):
+        if self._hibernate_timer is not None:
+            self._hibernate_timer.cancel()
+            self._hibernate_timer = None
+        hibernating = self.state == HIBERNATING
+        self.state = ACTIVE
+        self.simulation.tick_rate = self._active_tick_rate
+        if hibernating and self._resume_on_wake:
+            if self.fast_forward_limit > 0:
+                # Catch up on the suspended time as if the world had kept idling
+                missed = int((time.monotonic() - self._hibernated_at) * self.idle_tick_rate)
+                await self.simulation.fast_forward(min(missed, self.fast_forward_limit))
+            await self.simulation.start()
@@ -0,0 +1,184 @@
+# server/app/simulation/recorder.py
+import bisect
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import zlib
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .frame_delta import diff_frames, apply_delta
+
+LOG_MAGIC = b"GOLTICK1"
+# Every chunk is length-prefixed so the index can be rebuilt by scanning the log
+CHUNK_HEADER = struct.Struct("<I")
+# Index entry: chunk offset, compressed length, first tick, last tick
+INDEX_ENTRY = struct.Struct("<QIQQ")
+
+def _record_ticks(records: List[Dict]) -> List[int]:
+    """Tick numbers of the frame records in a chunk"""
+    return [
+        record["frame"]["tickCount"] if record["kind"] == "keyframe" else record["delta"]["tickCount"]
+        for record in records if record["kind"] != "metadata"
+    ]
+
+class TickRecorder:
+    """Appends frames to a compressed, chunked tick log from a background thread"""
+    def __init__(self, path: str, chunk_ticks: int = 120, max_pending: int = 600,
+                 max_bytes: Optional[int] = None):
+        self.path = path
+        self.chunk_ticks = chunk_ticks  # Each chunk opens with a keyframe, so this is the seek granularity
+        self.max_bytes = max_bytes
+        self.dropped: int = 0
+        # Set by the writer once the log would outgrow max_bytes; later ticks are not recorded
+        self.full: bool = False
+        self._pending: "queue.Queue[Optional[Tuple[Dict, Optional[Dict]]]]" = queue.Queue(max_pending)
+        self._metadata_version: Optional[int] = None
+        self._log = open(path, "wb")
+        self._log.write(LOG_MAGIC)
+        self._index = open(path + ".idx", "wb")
+        self._thread = threading.Thread(target=self._write_loop, name="tick-recorder", daemon=True)
+        self._thread.start()
+
+    def record(self, frame: Dict, metadata_version: int, get_metadata: Callable[[], Dict]):
+        """Queue a tick for writing; never blocks the tick loop"""
+        if self.full:
+            return
+        metadata = None
+        if metadata_version != self._metadata_version:
+            metadata = get_metadata()
+        try:
+            self._pending.put_nowait((frame, metadata))
+            self._metadata_version = metadata_version
+        except queue.Full:
+            self.dropped += 1  # Disk is behind; the log skips this tick rather than stall
+
+    def close(self):
+        """Flush queued ticks and close the log"""
+        self._pending.put(None)
+        self._thread.join()
+        self._log.close()
+        self._index.close()
+
+    def _write_loop(self):
+        records: List[Dict] = []
+        previous: Optional[Dict] = None
+        metadata: Optional[Dict] = None
+
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            if self.full:
+                continue  # Drain what was queued before the limit was hit
+            frame, new_metadata = item
+            if new_metadata is not None:
+                metadata = new_metadata
+                if records:
+                    records.append({"kind": "metadata", "metadata": metadata})
+
+            if not records:
+                # Chunks are self-contained: current metadata plus a full keyframe
+                records.append({"kind": "metadata", "metadata": metadata})
+                records.append({"kind": "keyframe", "frame": frame})
+            else:
+                records.append({"kind": "delta", "delta": diff_frames(previous, frame)})
+            previous = frame
+
+            if len(records) >= self.chunk_ticks:
+                self._write_chunk(records)
+                records = []
+
+        if records and not self.full:
+            self._write_chunk(records)
+
+    def _write_chunk(self, records: List[Dict]):
+        ticks = _record_ticks(records)
+        data = zlib.compress(json.dumps(records, separators=(",", ":")).encode("utf-8"))
+        offset = self._log.tell()
+        if self.max_bytes is not None and offset + CHUNK_HEADER.size + len(data) > self.max_bytes:
+            # The log stays readable up to its last whole chunk
+            print(f"Recording {self.path} reached {self.max_bytes} bytes, no longer recording")
+            self.full = True
+            return
+        self._log.write(CHUNK_HEADER.pack(len(data)))
+        self._log.write(data)
+        self._log.flush()
+        self._index.write(INDEX_ENTRY.pack(offset, len(data), ticks[0], ticks[-1]))
+        self._index.flush()
+
+class TickLogReader:
+    """Seekable, memory-mapped view over a tick log written by TickRecorder"""
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(LOG_MAGIC)] != LOG_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a tick log")
+        self._index = self._load_index()
+        self._first_ticks = [entry[2] for entry in self._index]
+
+    @property
+    def first_tick(self) -> Optional[int]:
+        return self._index[0][2] if self._index else None
+
+    @property
+    def last_tick(self) -> Optional[int]:
+        return self._index[-1][3] if self._index else None
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def frames(self, start_tick: Optional[int] = None) -> Iterator[Tuple[Dict, Dict]]:
+        """Yield (metadata, frame) for every recorded tick from start_tick onwards"""
+        chunk = 0
+        if start_tick is not None:
+            chunk = max(0, bisect.bisect_right(self._first_ticks, start_tick) - 1)
+
+        for offset, length, _, _ in self._index[chunk:]:
+            metadata: Dict = {}
+            frame: Optional[Dict] = None
+            for record in self._read_chunk(offset, length):
+                if record["kind"] == "metadata":
+                    metadata = record["metadata"]
+                    continue
+                if record["kind"] == "keyframe":
+                    frame = record["frame"]
+                else:
+                    frame = apply_delta(frame, record["delta"])
+                if start_tick is None or frame["tickCount"] >= start_tick:
+                    yield metadata, frame
+
+    def _read_chunk(self, offset: int, length: int) -> List[Dict]:
+        start = offset + CHUNK_HEADER.size
+        return json.loads(zlib.decompress(self._map[start:start + length]))
+
+    def _load_index(self) -> List[Tuple[int, int, int, int]]:
+        index_path = self.path + ".idx"
+        if os.path.exists(index_path):
+            with open(index_path, "rb") as index_file:
+                data = index_file.read()
+            usable = len(data) - len(data) % INDEX_ENTRY.size
+            # Skip chunks appended after the log was mapped
+            return [
+                entry for entry in INDEX_ENTRY.iter_unpack(data[:usable])
+                if entry[0] + CHUNK_HEADER.size + entry[1] <= len(self._map)
+            ]
+        return self._scan_index()
+
+    def _scan_index(self) -> List[Tuple[int, int, int, int]]:
+        """Rebuild the seek index by walking the chunks, stopping at a torn tail"""
+        index = []
+        offset = len(LOG_MAGIC)
+        while offset + CHUNK_HEADER.size <= len(self._map):
+            (length,) = CHUNK_HEADER.unpack_from(self._map, offset)
+            if offset + CHUNK_HEADER.size + length > len(self._map):
+                break
+            ticks = _record_ticks(self._read_chunk(offset, length))
+            index.append((offset, length, ticks[0], ticks[-1]))
+            offset += CHUNK_HEADER.size + length
+        return index
@@ -0,0 +1,117 @@
+# server/app/simulation/seed.py
+import os
+
+from app.models.simulation import (
+    ParticleType,
+    Diet,
+    ReproductionStyle
+)
+from .entities import ParticleRules
+from .simulation_manager import SimulationManager
+from .checkpoint import Checkpointer
+from .history import TickHistory
+from .power import PowerGovernor
+
+def initialize_simulation(simulation: SimulationManager):
+    """Resume from the newest checkpoint when checkpointing is enabled, otherwise seed a fresh world"""
+    # Per-tick changes scale with the tick length, so SIMULATION_TICK_RATE trades step size for
+    # server CPU without changing the world's speed; clients interpolate between the frames
+    simulation.set_tick_rate(float(os.getenv("SIMULATION_TICK_RATE", "20")))
+    # Off by default: recording costs a frame, a diff and an encode every tick whether or not anyone scrubs
+    history_seconds = float(os.getenv("SIMULATION_HISTORY_SECONDS", "0"))
+    if history_seconds > 0:
+        simulation.history = TickHistory(
+            max_age=history_seconds,
+            max_bytes=int(float(os.getenv("SIMULATION_HISTORY_MB", "64")) * 1024 * 1024)
+        )
+
+    configure_power(simulation)
+
+    checkpoint_dir = os.getenv("SIMULATION_CHECKPOINT_DIR")
+    if checkpoint_dir:
+        simulation.checkpointer = Checkpointer(
+            checkpoint_dir,
+            interval=float(os.getenv("SIMULATION_CHECKPOINT_INTERVAL", "30"))
+        )
+        if simulation.checkpointer.restore_latest(simulation):
+            return
+    seed_initial_species(simulation)
+
+def configure_power(simulation: SimulationManager):
+    """Slow down and eventually hibernate the simulation while nobody is watching"""
+    simulation.power = PowerGovernor(
+        simulation,
+        idle_tick_rate=float(os.getenv("SIMULATION_IDLE_TICK_RATE", "5")),
+        hibernate_after=float(os.getenv("SIMULATION_HIBERNATE_AFTER", "300")),
+        fast_forward_limit=int(os.getenv("SIMULATION_WAKE_FAST_FORWARD", "0"))
+    )
+
+def seed_initial_species(simulation: SimulationManager):
+    """Add the starting ecosystem to a fresh simulation"""
+    # Add plants
+    simulation.add_species(
+        name="Plants",
+        color="#2ECC71",
+        rules=ParticleRules(
+            reproductionRate=0.02,  # Increased reproduction rate
+            energyConsumption=0,
+            maxSpeed=0,
+            visionRange=0,
+            socialDistance=10,
+            particleType=ParticleType.PLANT
+        ),
+        diet=Diet.HERBIVORE,
+        reproductionStyle=ReproductionStyle.SELF_REPLICATING,
+        initial_count=50  # Increased initial count
+    )
+
+    # Add herbivores
+    simulation.add_species(
+        name="Herbivores",
+        color="#3498DB",
+        rules=ParticleRules(
+            reproductionRate=0.001,
+            energyConsumption=0.05,  # Reduced energy consumption
+            maxSpeed=1.5,  # Slightly reduced speed
+            visionRange=60.0,  # Increased vision range
+            socialDistance=20.0,
+            particleType=ParticleType.CREATURE
+        ),
+        diet=Diet.HERBIVORE,
+        reproductionStyle=ReproductionStyle.TWO_PARENTS,
+        initial_count=20
+    )
+
+    # Add carnivores
+    simulation.add_species(
+        name="Carnivores",
+        color="#E74C3C",
+        rules=ParticleRules(
+            reproductionRate=0.0005,
+            energyConsumption=0.08,  # Balanced energy consumption
+            maxSpeed=2.0,  # Faster than herbivores
+            visionRange=80.0,  # Increased vision range
+            socialDistance=25.0,
+            particleType=ParticleType.CREATURE
+        ),
+        diet=Diet.CARNIVORE,
+        reproductionStyle=ReproductionStyle.SELF_REPLICATING,
+        initial_count=8  # Reduced initial count
+    )
+
+    # Add omnivores
+    simulation.add_species(
+        name="Omnivores",
+        color="#9B59B6",
+        rules=ParticleRules(
+            reproductionRate=0.00075,
+            energyConsumption=0.06,  # Balanced energy consumption
+            maxSpeed=1.8,  # Balanced speed
+            visionRange=70.0,  # Balanced vision range
+            socialDistance=22.0,
+            particleType=ParticleType.CREATURE
+        ),
+        diet=Diet.OMNIVORE,
+        reproductionStyle=ReproductionStyle.TWO_PARENTS,
+        initial_count=12  # Balanced initial count
+    )
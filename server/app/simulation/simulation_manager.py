@@ -1,17 +1,30 @@
 # server/app/simulation/simulation_manager.py
 import asyncio
-from typing import Dict, Optional
+import time
+from collections import deque
+from dataclasses import asdict
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
 import random
 
 from app.models.simulation import (
-    SimulationState, ParticleRules, Diet, 
-    ReproductionStyle, ParticleType
+    Diet, ReproductionStyle, ParticleType, SpawnShape
 )
+from .entities import SimulationState, ParticleRules
 from .particle_manager import ParticleManager
-from .group_manager import GroupManager
+from .recorder import TickRecorder, TickLogReader
+from .checkpoint import Checkpointer
+from .history import TickHistory
+from .power import PowerGovernor, ACTIVE
+from .stats import PopulationStats, StatsHistory, STATS_FIELDS
+from .pack_lod import PackLevelOfDetail, Viewport
+
+# Rate the rules are tuned for: speeds, energy use and hunger are per tick at this rate, and scaled
+# to the tick length at any other
+REFERENCE_TICK_RATE = 60
 
 class SimulationManager:
-    def __init__(self, world_width: int = 800, world_height: int = 600):
+    def __init__(self, world_width: int = 800, world_height: int = 600,
+                 max_particles: Optional[int] = None):
         self.state = SimulationState(
             particles={},
             species={},
@@ -20,16 +33,73 @@ class SimulationManager:
             worldHeight=world_height,
             tickCount=0
         )
-        self.particle_manager = ParticleManager(self.state)
-        self.group_manager = GroupManager(self.state)
+        # Population aggregates kept up to date by the managers, and their sampled history
+        self.stats = PopulationStats()
+        self.stats_history = StatsHistory()
+        self.particle_manager = ParticleManager(self.state, self.stats)
+        self.group_manager = self.particle_manager.group_manager  # One membership index for both
+        self.particle_manager.max_particles = max_particles
         self.is_running: bool = False
         self.tick_rate: float = 1/60  # 60 FPS
+        # Reference ticks each tick stands for; only set_tick_rate changes it, so the power
+        # governor stretching tick_rate still slows an unwatched world down
+        self.time_scale: float = 1.0
+        # Wall clock time of the latest tick; frames carry it with tick_rate so clients rendering
+        # faster than the simulation ticks can interpolate between frames
+        self.tick_time: float = 0.0
+        # Smoothed seconds of work per tick, used to place rooms on worker processes
+        self.tick_cost: float = 0.0
+        self.last_tick_duration: float = 0.0
         self.plant_spawn_rate: float = 0.1
+        # Ticks between passes that merge nearby packs of a species; 0 turns merging off
+        self.pack_merge_interval: int = 10
+        # Stable packs away from every viewer are stepped as single agents. Viewports are the
+        # areas clients look at; None while some client hasn't said, which keeps every pack whole
+        self.pack_lod = PackLevelOfDetail(self.state, self.group_manager, self.stats)
+        self.viewports: Optional[List[Viewport]] = None
+        # Ticks between passes that look for packs to aggregate; 0 turns aggregation off
+        self.pack_lod_interval: int = 10
         self._simulation_task: Optional[asyncio.Task] = None
+        # Client commands waiting for the next tick boundary, with the futures their senders await
+        self._pending_commands: Deque[Tuple[Callable[[], Awaitable], asyncio.Future]] = deque()
+        # Bumped whenever the static species table changes
+        self.metadata_version: int = 0
+        self._species_index: Dict[str, int] = {}
+        # Optional tick log recorder, and the replayed frames that stand in for the live world
+        self.recorder: Optional[TickRecorder] = None
+        self._replay_task: Optional[asyncio.Task] = None
+        self._replay_metadata: Optional[Dict] = None
+        self._replay_frame: Optional[Dict] = None
+        self._resume_after_replay: bool = False
+        # Optional periodic checkpoints for surviving restarts
+        self.checkpointer: Optional[Checkpointer] = None
+        # Optional in-memory window of recent ticks that clients can scrub through
+        self.history: Optional[TickHistory] = None
+        # Optional viewer-aware slowdown and hibernation
+        self.power: Optional[PowerGovernor] = None
+
+    def set_tick_rate(self, ticks_per_second: float):
+        """Tick this often, scaling the per-tick changes so the world keeps the same speed"""
+        self.tick_rate = 1 / ticks_per_second
+        self.time_scale = REFERENCE_TICK_RATE / ticks_per_second
+        self.particle_manager.time_scale = self.time_scale
+        self.group_manager.time_scale = self.time_scale
+        self.pack_lod.time_scale = self.time_scale
+
+    @property
+    def is_replaying(self) -> bool:
+        return self._replay_frame is not None
+
+    @property
+    def current_tick(self) -> int:
+        """Tick of the frame clients currently see, live or replayed"""
+        if self._replay_frame is not None:
+            return self._replay_frame["tickCount"]
+        return self.state.tickCount
 
     async def start(self):
         """Start the simulation loop"""
-        if not self.is_running:
+        if not self.is_running and not self.is_replaying:
             self.is_running = True
             self._simulation_task = asyncio.create_task(self._simulation_loop())
 
@@ -37,64 +107,352 @@ class SimulationManager:
         """Pause the simulation"""
         self.is_running = False
         if self._simulation_task:
+            # Paused by a command the loop itself is applying: it stops after the batch
+            if self._simulation_task is not asyncio.current_task():
+                try:
+                    self._simulation_task.cancel()
+                    await self._simulation_task
+                except asyncio.CancelledError:
+                    pass
+            self._simulation_task = None
+            await self._apply_pending_commands()
+
+    async def at_tick_boundary(self, action: Callable[[], Awaitable]):
+        """Run a state-changing action between ticks, batched with others into the next one"""
+        if not self.is_running:
+            return await action()
+        future = asyncio.get_running_loop().create_future()
+        self._pending_commands.append((action, future))
+        return await future
+
+    async def _apply_pending_commands(self):
+        """Apply queued commands in arrival order, handing each result back to its sender"""
+        while self._pending_commands:
+            action, future = self._pending_commands.popleft()
             try:
-                self._simulation_task.cancel()
-                await self._simulation_task
+                result = await action()
             except asyncio.CancelledError:
-                pass
-            self._simulation_task = None
+                # The loop was cancelled mid-batch; pause() applies the rest, this one included
+                self._pending_commands.appendleft((action, future))
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
 
     def get_state(self) -> Dict:
         """Get current simulation state"""
-        state_dict = self.state.dict()
+        self.pack_lod.flush()
+        state_dict = asdict(self.state)
         
         # Convert sets to lists in groups
-        for group in state_dict['groups'].values():
-            if 'memberIds' in group:
-                group['memberIds'] = list(group['memberIds'])
+        member_ids = self.group_manager.member_ids()
+        for group_id, group in state_dict['groups'].items():
+            group['memberIds'] = member_ids.get(group_id, [])
             if 'parentIds' in group and group['parentIds'] is not None:
                 group['parentIds'] = list(group['parentIds'])
         
         return state_dict
 
+    def get_status(self) -> Dict:
+        """Get summary counts for monitoring, read from live counters without touching particles"""
+        return {
+            "active": self.is_running,
+            "species_count": len(self.state.species),
+            "total_particles": len(self.state.particles),
+            "particles_by_type": dict(self.stats.particle_types),
+            "particles_by_species": {
+                species_id: self.stats.population(species_id) for species_id in self.state.species
+            },
+            "group_count": self.stats.groups,
+            "aggregated_packs": len(self.pack_lod.packs),
+            "tick_count": self.state.tickCount,
+            "last_tick_ms": round(self.last_tick_duration * 1000, 3),
+            "power": self.power.state if self.power else ACTIVE
+        }
+
+    def get_metadata(self) -> Dict:
+        """Get the static species table that frames refer to by index"""
+        if self._replay_metadata is not None:
+            return {**self._replay_metadata, "version": self.metadata_version}
+
+        species_table: List[Dict] = []
+        for index, species in enumerate(self.state.species.values()):
+            species_table.append({
+                "index": index,
+                "id": species.id,
+                "name": species.name,
+                "color": species.color,
+                "baseRules": asdict(species.baseRules),
+                "diet": species.diet.value,
+                "reproductionStyle": species.reproductionStyle.value
+            })
+
+        return {
+            "type": "metadata",
+            "version": self.metadata_version,
+            "species": species_table,
+            "worldWidth": self.state.worldWidth,
+            "worldHeight": self.state.worldHeight
+        }
+
+    def get_frame(self) -> Dict:
+        """Get the dynamic per-tick state, referencing species by metadata index"""
+        if self._replay_frame is not None:
+            return {**self._replay_frame, "metadataVersion": self.metadata_version}
+
+        species_index = self._species_index
+        species_colors = [species.color for species in self.state.species.values()]
+
+        particles = {}
+        for particle_id, particle in self.state.particles.items():
+            index = species_index[particle.speciesId]
+            attributes = particle.attributes
+            entry = {
+                "position": {"x": particle.position.x, "y": particle.position.y},
+                "velocity": {"x": particle.velocity.x, "y": particle.velocity.y},
+                "attributes": {
+                    "energy": attributes.energy,
+                    "hunger": attributes.hunger,
+                    "size": attributes.size,
+                    "age": attributes.age,
+                    "packMentality": attributes.packMentality,
+                    "groupId": attributes.groupId,
+                    "isChild": attributes.isChild,
+                    "timeInGroup": attributes.timeInGroup
+                },
+                "speciesIndex": index
+            }
+            # Only particles that drifted from their species color (e.g. decaying plants)
+            if particle.color != species_colors[index]:
+                entry["color"] = particle.color
+            particles[particle_id] = entry
+
+        groups = {}
+        member_ids = self.group_manager.member_ids()
+        for group_id, group in self.state.groups.items():
+            groups[group_id] = {
+                "memberIds": member_ids.get(group_id, []),
+                "speciesIndex": species_index[group.speciesId],
+                "parentIds": list(group.parentIds) if group.parentIds is not None else None,
+                "childId": group.childId
+            }
+
+        return {
+            "type": "frame",
+            "metadataVersion": self.metadata_version,
+            "tickCount": self.state.tickCount,
+            "serverTime": self.tick_time,
+            "tickInterval": self.tick_rate,
+            "populations": [species.population for species in self.state.species.values()],
+            "particles": particles,
+            "groups": groups
+        }
+
+    def load_state(self, state: SimulationState, metadata_version: int):
+        """Replace the world with a restored state"""
+        # Swap contents in place; the managers hold references to these dicts
+        self.state.particles.clear()
+        self.state.particles.update(state.particles)
+        self.state.species.clear()
+        self.state.species.update(state.species)
+        self.state.groups.clear()
+        self.state.groups.update(state.groups)
+        self.state.worldWidth = state.worldWidth
+        self.state.worldHeight = state.worldHeight
+        self.state.tickCount = state.tickCount
+        self.metadata_version = metadata_version
+        self._species_changed()
+        self.group_manager.rebuild()
+        self.stats.rebuild(self.state)
+        self.stats_history.clear()
+
+    def start_recording(self, path: str, max_bytes: Optional[int] = None):
+        """Append every tick to a tick log at path until stop_recording or it reaches max_bytes"""
+        self.stop_recording()
+        self.recorder = TickRecorder(path, max_bytes=max_bytes)
+
+    def stop_recording(self):
+        if self.recorder:
+            recorder, self.recorder = self.recorder, None
+            recorder.close()
+
+    async def start_replay(self, path: str, speed: float = 1.0, start_tick: Optional[int] = None):
+        """Stream a recorded tick log to clients in place of the live simulation"""
+        reader = TickLogReader(path)
+        frames = reader.frames(start_tick)
+        first = next(frames, None)
+        if first is None:
+            reader.close()
+            raise ValueError("Recording has no ticks to replay")
+
+        await self.stop_replay()
+        self._resume_after_replay = self.is_running
+        await self.pause()
+        self._show_replayed(*first)
+        self._replay_task = asyncio.create_task(self._replay_loop(reader, frames, speed))
+
+    async def stop_replay(self):
+        """Return clients to the live simulation"""
+        if self._replay_task:
+            self._replay_task.cancel()
+            try:
+                await self._replay_task
+            except asyncio.CancelledError:
+                pass
+            self._replay_task = None
+        if self._replay_frame is not None:
+            self._replay_frame = None
+            self._replay_metadata = None
+            self.metadata_version += 1  # Clients must swap back to the live species table
+            if self._resume_after_replay:
+                await self.start()
+
+    def _show_replayed(self, metadata: Dict, frame: Dict):
+        if metadata != self._replay_metadata:
+            self._replay_metadata = metadata
+            self.metadata_version += 1
+        self._replay_frame = frame
+
+    async def _replay_loop(self, reader: TickLogReader, frames, speed: float):
+        """Advance the replay by `speed` recorded ticks per simulation tick"""
+        budget = 0.0
+        try:
+            while True:
+                await asyncio.sleep(self.tick_rate)
+                budget += speed
+                while budget >= 1:
+                    budget -= 1
+                    replayed = next(frames, None)
+                    if replayed is None:
+                        return  # Hold the last frame until stop_replay
+                    self._show_replayed(*replayed)
+        finally:
+            reader.close()
+
+    def get_history_window(self) -> Dict:
+        """Range of ticks clients can scrub to"""
+        first, last = self.history.window() if self.history else (None, None)
+        return {"type": "history", "firstTick": first, "lastTick": last}
+
+    def get_history_frame(self, tick: int) -> Optional[Dict]:
+        """Rebuild a past frame from the history window"""
+        if not self.history:
+            return None
+        frame = self.history.frame_at(tick)
+        if frame is None:
+            return None
+        # Species are only ever appended, so old indices still match the current table
+        return {**frame, "metadataVersion": self.metadata_version, "scrubbed": True}
+
+    def get_stats(self, resolution: str = "second", since: Optional[float] = None) -> Dict:
+        """Sampled population statistics, species in metadata order"""
+        return {
+            "type": "stats",
+            "resolution": resolution,
+            "metadataVersion": self.metadata_version,
+            "fields": STATS_FIELDS,
+            "samples": [
+                {"tick": tick, "time": timestamp, "groups": groups, "species": species}
+                for tick, timestamp, groups, species in self.stats_history.samples(resolution, since)
+            ]
+        }
+
+    def _species_changed(self):
+        """Re-index the species table and publish a new metadata version"""
+        self._species_index = {
+            species_id: index for index, species_id in enumerate(self.state.species)
+        }
+        self.metadata_version += 1
+
     def add_plant_species(self):
         """Add plant species to simulation"""
-        return self.particle_manager.add_plant_species()
+        species_id = self.particle_manager.add_plant_species()
+        self._species_changed()
+        return species_id
 
     def add_species(self, name: str, color: str, rules: ParticleRules, 
                    diet: Diet, reproductionStyle: ReproductionStyle,
                    initial_count: int = 10) -> str:
         """Add a new species to the simulation"""
-        return self.particle_manager.add_species(
+        species_id = self.particle_manager.add_species(
             name, color, rules, diet, reproductionStyle, initial_count
         )
+        self._species_changed()
+        return species_id
+
+    def spawn(self, species_id: str, count: int, shape: SpawnShape = SpawnShape.UNIFORM,
+              center: Optional[tuple] = None, radius: Optional[float] = None) -> List[str]:
+        """Add many particles of an existing species in one batch"""
+        return self.particle_manager.spawn_particles(species_id, count, shape, center, radius)
+
+    def _tick(self):
+        """Advance the world by one tick and feed the optional per-tick outputs"""
+        # Spawn plants randomly, at the reference rate's chance per reference tick
+        if random.random() < 1 - (1 - self.plant_spawn_rate) ** self.time_scale:
+            plant_species_id = next(
+                (s.id for s in self.state.species.values() 
+                 if s.baseRules.particleType == ParticleType.PLANT),
+                None
+            )
+            if plant_species_id and self.particle_manager.has_room():
+                self.particle_manager.add_particle(plant_species_id)
+
+        # Update simulation state
+        if self.pack_lod_interval:
+            self.pack_lod.update(self.viewports, self.state.tickCount % self.pack_lod_interval == 0)
+        elif self.pack_lod.packs:
+            self.pack_lod.expand_all()
+        self.particle_manager.update_particles()
+        self.group_manager.update_groups()
+        if self.pack_merge_interval and self.state.tickCount % self.pack_merge_interval == 0:
+            self.group_manager.merge_packs()
+        self.state.tickCount += 1
+        self.tick_time = time.time()
+        self.stats_history.record(
+            self.state.tickCount, self.stats.groups, self.stats.sample(list(self.state.species))
+        )
+
+        if self.recorder or self.history:
+            frame = self.get_frame()
+            if self.recorder:
+                self.recorder.record(frame, self.metadata_version, self.get_metadata)
+            if self.history:
+                self.history.record(frame)
+        if self.checkpointer:
+            self.checkpointer.maybe_checkpoint(self)
+
+    async def fast_forward(self, ticks: int, batch: int = 20):
+        """Run ticks back to back, yielding to the event loop between batches"""
+        for tick in range(ticks):
+            self._tick()
+            if tick % batch == batch - 1:
+                await asyncio.sleep(0)
 
     async def _simulation_loop(self):
         """Main simulation loop"""
-        while self.is_running:
+        while self.is_running and self._simulation_task is asyncio.current_task():
             start_time = asyncio.get_event_loop().time()
 
             try:
-                # Spawn plants randomly
-                if random.random() < self.plant_spawn_rate:
-                    plant_species_id = next(
-                        (s.id for s in self.state.species.values() 
-                         if s.baseRules.particleType == ParticleType.PLANT),
-                        None
-                    )
-                    if plant_species_id:
-                        self.particle_manager.add_particle(plant_species_id)
-
-                # Update simulation state
-                self.particle_manager.update_particles()
-                self.group_manager.update_groups()
-                self.state.tickCount += 1
+                if self._pending_commands:
+                    await self._apply_pending_commands()
+                    if not self.is_running or self._simulation_task is not asyncio.current_task():
+                        break  # A command paused or restarted the simulation
+                self._tick()
 
                 # Control loop timing
                 elapsed = asyncio.get_event_loop().time() - start_time
+                self.last_tick_duration = elapsed
+                self.tick_cost += (elapsed - self.tick_cost) * 0.1
                 if elapsed < self.tick_rate:
                     await asyncio.sleep(self.tick_rate - elapsed)
             except Exception as e:
                 print(f"Error in simulation loop: {e}")
                 self.is_running = False
-                break
\ No newline at end of file
+                break
+
+        if self._simulation_task is asyncio.current_task():
+            await self._apply_pending_commands()  # Nobody else will drain them once the loop is gone
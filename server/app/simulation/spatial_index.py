@@ -0,0 +1,52 @@
+# server/app/simulation/spatial_index.py
+from typing import Tuple
+
+import numpy as np
+
+# Cells visited from each cell; the other half of the neighbourhood is covered from the far side
+_HALF_NEIGHBOURHOOD = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+def neighbor_pairs(xs: np.ndarray, ys: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Index pairs of points no further apart than radius, each pair once"""
+    count = len(xs)
+    if count < 2 or radius <= 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    # Hash points into a grid of cells one radius wide, so only neighbouring cells are compared
+    cells_x = np.floor(xs / radius).astype(np.int64)
+    cells_y = np.floor(ys / radius).astype(np.int64)
+    cells_x -= cells_x.min() - 1
+    cells_y -= cells_y.min() - 1
+    # A one-cell margin keeps neighbours of edge cells from aliasing into the next column
+    stride = int(cells_y.max()) + 2
+    keys = cells_x * stride + cells_y
+
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    firsts, seconds = [], []
+    for dx, dy in _HALF_NEIGHBOURHOOD:
+        neighbour_keys = keys + dx * stride + dy
+        starts = np.searchsorted(sorted_keys, neighbour_keys, side="left")
+        counts = np.searchsorted(sorted_keys, neighbour_keys, side="right") - starts
+        total = int(counts.sum())
+        if total == 0:
+            continue
+        first = np.repeat(np.arange(count), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        second = order[np.repeat(starts, counts) + offsets]
+        if dx == 0 and dy == 0:
+            same = first < second
+            first, second = first[same], second[same]
+        firsts.append(first)
+        seconds.append(second)
+
+    if not firsts:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    first = np.concatenate(firsts)
+    second = np.concatenate(seconds)
+    distance_sq = (xs[first] - xs[second]) ** 2 + (ys[first] - ys[second]) ** 2
+    close = distance_sq <= radius * radius
+    return first[close], second[close]
@@ -0,0 +1,202 @@
+# server/app/simulation/stats.py
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from app.models.simulation import ParticleType
+from .entities import SimulationState, Particle
+
+# Per-species values in every sample, in this order
+STATS_FIELDS = ("population", "energy", "hunger", "packMentality", "groups")
+
+# (tick, unix time, total groups, one STATS_FIELDS tuple per species in metadata order)
+Sample = Tuple[int, float, float, List[Optional[Tuple[float, ...]]]]
+
+class _SpeciesTotals:
+    __slots__ = ("population", "energy", "hunger", "packMentality", "groups")
+
+    def __init__(self):
+        self.population = 0
+        self.energy = 0.0
+        self.hunger = 0.0
+        self.packMentality = 0.0
+        self.groups = 0
+
+class PopulationStats:
+    """Running per-species sums, kept in step with every birth, death and change"""
+    def __init__(self):
+        self._species: Dict[str, _SpeciesTotals] = {}
+        self.groups: int = 0
+        self.particle_types: Dict[str, int] = {particle_type.value: 0 for particle_type in ParticleType}
+
+    def _totals(self, species_id: str) -> _SpeciesTotals:
+        totals = self._species.get(species_id)
+        if totals is None:
+            totals = self._species[species_id] = _SpeciesTotals()
+        return totals
+
+    def added(self, particle: Particle):
+        attributes = particle.attributes
+        self.added_many(particle.speciesId, particle.rules.particleType, 1,
+                        attributes.energy, attributes.hunger, attributes.packMentality)
+
+    def added_many(self, species_id: str, particle_type: ParticleType, count: int,
+                   energy: float, hunger: float, pack_mentality: float):
+        """Account for a batch of new particles from the sums of their attributes"""
+        self.particle_types[particle_type.value] += count
+        totals = self._totals(species_id)
+        totals.population += count
+        totals.energy += energy
+        totals.hunger += hunger
+        totals.packMentality += pack_mentality
+
+    def removed(self, particle: Particle):
+        self.particle_types[particle.rules.particleType.value] -= 1
+        totals = self._totals(particle.speciesId)
+        attributes = particle.attributes
+        totals.population -= 1
+        totals.energy -= attributes.energy
+        totals.hunger -= attributes.hunger
+        totals.packMentality -= attributes.packMentality
+        if totals.population <= 0:
+            # Start the next generation from exact zeros rather than float residue
+            totals.energy = totals.hunger = totals.packMentality = 0.0
+
+    def changed(self, species_id: str, energy: float = 0.0, hunger: float = 0.0):
+        """Apply the change in one particle's energy and hunger"""
+        totals = self._totals(species_id)
+        totals.energy += energy
+        totals.hunger += hunger
+
+    def group_added(self, species_id: str):
+        self._totals(species_id).groups += 1
+        self.groups += 1
+
+    def group_removed(self, species_id: str):
+        self._totals(species_id).groups -= 1
+        self.groups -= 1
+
+    def rebuild(self, state: SimulationState):
+        """Recount from scratch, for when the whole world is replaced"""
+        self._species.clear()
+        self.groups = 0
+        for particle_type in self.particle_types:
+            self.particle_types[particle_type] = 0
+        for particle in state.particles.values():
+            self.added(particle)
+        for group in state.groups.values():
+            self.group_added(group.speciesId)
+
+    def population(self, species_id: str) -> int:
+        totals = self._species.get(species_id)
+        return totals.population if totals is not None else 0
+
+    def sample(self, species_ids: List[str]) -> List[Optional[Tuple[float, ...]]]:
+        """Current per-species population, averages and group count, in the given order"""
+        values = []
+        for species_id in species_ids:
+            totals = self._species.get(species_id)
+            if totals is None:
+                values.append(None)
+                continue
+            population = totals.population
+            if population > 0:
+                values.append((
+                    population, totals.energy / population, totals.hunger / population,
+                    totals.packMentality / population, totals.groups
+                ))
+            else:
+                values.append((0, 0.0, 0.0, 0.0, totals.groups))
+        return values
+
+class _Bucket:
+    """Sums of the samples falling into one period of a coarser resolution"""
+    __slots__ = ("period", "tick", "count", "groups", "species", "species_counts")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.tick = 0
+        self.count = 0
+        self.groups = 0.0
+        self.species: List[List[float]] = []
+        self.species_counts: List[int] = []
+
+    def add(self, sample: Sample):
+        tick, _, groups, species = sample
+        self.tick = tick
+        self.count += 1
+        self.groups += groups
+        for index, values in enumerate(species):
+            if index == len(self.species):
+                self.species.append([0.0] * len(STATS_FIELDS))
+                self.species_counts.append(0)
+            if values is None:
+                continue
+            sums = self.species[index]
+            for field, value in enumerate(values):
+                sums[field] += value
+            self.species_counts[index] += 1
+
+    def average(self, seconds: float) -> Sample:
+        return (
+            self.tick,
+            self.period * seconds,
+            self.groups / self.count,
+            [
+                tuple(total / count for total in sums) if count else None
+                for sums, count in zip(self.species, self.species_counts)
+            ]
+        )
+
+class StatsHistory:
+    """Fixed-size rings of per-tick, per-second and per-minute samples, each averaged from the last"""
+    RESOLUTIONS = ("tick", "second", "minute")
+
+    def __init__(self, tick_samples: int = 300, second_samples: int = 900, minute_samples: int = 1440):
+        self._rings: Dict[str, Deque[Sample]] = {
+            "tick": deque(maxlen=tick_samples),
+            "second": deque(maxlen=second_samples),  # 15 minutes
+            "minute": deque(maxlen=minute_samples),  # 24 hours
+        }
+        self._second: Optional[_Bucket] = None
+        self._minute: Optional[_Bucket] = None
+        self._lock = threading.Lock()  # Queries read from a worker thread
+
+    def record(self, tick: int, groups: int, species: List[Optional[Tuple[float, ...]]],
+               now: Optional[float] = None):
+        now = time.time() if now is None else now
+        sample = (tick, now, groups, species)
+        with self._lock:
+            self._rings["tick"].append(sample)
+            self._second = self._roll(self._second, int(now), sample, "second", 1.0)
+
+    def clear(self):
+        with self._lock:
+            for ring in self._rings.values():
+                ring.clear()
+            self._second = self._minute = None
+
+    def _roll(self, bucket: Optional[_Bucket], period: int, sample: Sample,
+              resolution: str, seconds: float) -> _Bucket:
+        """Add a sample to the open bucket, closing it into its ring once its period is over"""
+        if bucket is not None and bucket.period != period:
+            closed = bucket.average(seconds)
+            self._rings[resolution].append(closed)
+            if resolution == "second":
+                self._minute = self._roll(self._minute, int(closed[1] // 60), closed, "minute", 60.0)
+            bucket = None
+        if bucket is None:
+            bucket = _Bucket(period)
+        bucket.add(sample)
+        return bucket
+
+    def samples(self, resolution: str, since: Optional[float] = None) -> List[Sample]:
+        """Samples of a resolution, oldest first, optionally only those after a unix time"""
+        if resolution not in self._rings:
+            raise ValueError(f"Unknown stats resolution {resolution}")
+        with self._lock:
+            samples = list(self._rings[resolution])
+        if since is not None:
+            samples = [sample for sample in samples if sample[1] > since]
+        return samples
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the app package the same way the server does, from the server directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
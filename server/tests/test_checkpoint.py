@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from app.models.simulation import Diet, ReproductionStyle
+from app.simulation.checkpoint import Checkpointer, decode_checkpoint, encode_checkpoint
+from app.simulation.entities import ParticleRules
+from app.simulation.simulation_manager import SimulationManager
+
+
+def make_simulation() -> SimulationManager:
+    simulation = SimulationManager(world_width=800, world_height=600)
+    simulation.add_plant_species()
+    rules = ParticleRules(reproductionRate=0.001, energyConsumption=0.1, maxSpeed=2.0,
+                          visionRange=50.0, socialDistance=20.0)
+    simulation.add_species("Wolves", "#ff0000", rules, Diet.CARNIVORE,
+                           ReproductionStyle.TWO_PARENTS, initial_count=20)
+    for _ in range(30):
+        simulation._tick()
+    return simulation
+
+
+def test_checkpoint_round_trip():
+    simulation = make_simulation()
+    state, sections = decode_checkpoint(encode_checkpoint(simulation.state, 7))
+
+    assert sections["metadataVersion"] == 7
+    assert state.tickCount == simulation.state.tickCount
+    assert set(state.particles) == set(simulation.state.particles)
+    assert set(state.groups) == set(simulation.state.groups)
+    for particle_id, particle in simulation.state.particles.items():
+        restored = state.particles[particle_id]
+        assert (restored.position.x, restored.position.y) == (particle.position.x, particle.position.y)
+        assert restored.attributes.energy == particle.attributes.energy
+        assert restored.attributes.groupId == particle.attributes.groupId
+
+
+def test_corrupt_checkpoint_is_rejected():
+    data = bytearray(encode_checkpoint(make_simulation().state))
+    data[-1] ^= 0xFF
+    with pytest.raises(ValueError):
+        decode_checkpoint(bytes(data))
+
+
+def test_checkpointer_keeps_the_newest_and_restores_them(tmp_path):
+    simulation = make_simulation()
+    checkpointer = Checkpointer(str(tmp_path), keep=2)
+    for _ in range(4):
+        simulation._tick()
+        checkpointer.checkpoint(simulation)
+        # The snapshot is taken up front, so ticking on doesn't change what is written
+        simulation._tick()
+        checkpointer.wait()
+
+    names = sorted(os.listdir(tmp_path))
+    assert len(names) == 2
+    assert names[-1] == f"checkpoint-{simulation.state.tickCount - 1:012d}.bin"
+
+    restored = SimulationManager()
+    assert Checkpointer(str(tmp_path)).restore_latest(restored)
+    assert restored.state.tickCount == simulation.state.tickCount - 1
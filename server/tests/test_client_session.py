@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from app.network.client_session import ClientSession, negotiate_frame_rate
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text: str):
+        self.sent.append(text)
+
+
+def test_frame_rate_snaps_to_supported_rates():
+    assert negotiate_frame_rate(55) == 60
+    assert negotiate_frame_rate("2") == 1
+    assert negotiate_frame_rate(None) == 60
+
+
+def test_same_frame_is_not_sent_twice():
+    websocket = FakeWebSocket()
+    session = ClientSession(websocket)
+    frame = '{"type": "frame", "tickCount": 1}'
+
+    assert not session.has_sent(frame)
+    asyncio.run(session.send(frame, 1, '{"type": "metadata"}'))
+    assert session.has_sent(frame)
+    # A new tick encodes a new frame object even when the content matches
+    assert not session.has_sent("".join(frame))
+    assert websocket.sent == ['{"type": "metadata"}', frame]
+
+    session.join("other", link=None)
+    assert not session.has_sent(frame)
+
+
+def test_frames_follow_the_negotiated_schedule():
+    session = ClientSession(FakeWebSocket(), frame_rate=10)
+    assert session.is_due(0.0)
+    session.mark_sent(0.0)
+    assert not session.is_due(0.05) and session.is_due(0.1)
+    # A client that fell far behind restarts its grid instead of bursting to catch up
+    session.mark_sent(5.0)
+    assert session.next_frame_at == pytest.approx(5.1)
+
+
+def test_metadata_is_sent_once_per_version():
+    websocket = FakeWebSocket()
+    session = ClientSession(websocket)
+    asyncio.run(session.send("frame-1", 1, "metadata-1"))
+    asyncio.run(session.send("frame-2", 1, "metadata-1"))
+    asyncio.run(session.send("frame-3", 2, "metadata-2"))
+    assert websocket.sent == ["metadata-1", "frame-1", "frame-2", "metadata-2", "frame-3"]
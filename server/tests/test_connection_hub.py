@@ -0,0 +1,59 @@
+import asyncio
+
+from app.network.client_session import ClientSession
+from app.network.connection_hub import ConnectionHub, RateLimit
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+def test_rate_limit_allows_bursts_then_the_steady_rate():
+    limit = RateLimit(rate=2.0, burst=3.0)
+    assert [limit.allow(1.0) for _ in range(4)] == [True, True, True, False]
+    assert limit.allow(1.5)  # Half a second refills one token
+    assert not limit.allow(1.5)
+
+
+def test_pongs_never_count_against_the_limit():
+    async def scenario():
+        hub = ConnectionHub(message_rate=0.0, message_burst=1.0)
+        session = ClientSession(FakeWebSocket())
+        hub.add(session)
+        assert hub.connected.is_set()
+        assert hub.admit(session, {"type": "pause"})
+        assert not hub.admit(session, {"type": "pause"})
+        assert hub.admit(session, {"type": "pong"})
+        # Payloads that aren't objects are rate limited rather than crashing the handler
+        assert not hub.admit(session, [])
+        assert not hub.admit(session, None)
+        hub.remove(session.websocket)
+        assert not hub.connected.is_set() and len(hub) == 0
+
+    asyncio.run(scenario())
+
+
+def test_heartbeat_pings_quiet_clients_and_drops_silent_ones():
+    async def scenario():
+        hub = ConnectionHub(heartbeat_interval=0.03, heartbeat_timeout=0.2)
+        quiet, silent = ClientSession(FakeWebSocket()), ClientSession(FakeWebSocket())
+        hub.add(quiet)
+        hub.add(silent)
+        silent.last_seen -= 1.0
+        heartbeat = asyncio.create_task(hub.run_heartbeat())
+        await asyncio.sleep(0.1)
+        heartbeat.cancel()
+
+        assert {"type": "ping"} in quiet.websocket.sent
+        assert silent.websocket.closed_with == 1001
+        assert list(hub) == [quiet]
+
+    asyncio.run(scenario())
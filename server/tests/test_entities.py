@@ -0,0 +1,42 @@
+import pytest
+
+from app.models import simulation as schema
+from app.models.simulation import Diet, ParticleType, ReproductionStyle
+from app.simulation.entities import ParticleRules, Position
+from app.simulation.simulation_manager import SimulationManager
+
+
+def make_simulation() -> SimulationManager:
+    simulation = SimulationManager(world_width=400, world_height=300)
+    simulation.add_plant_species()
+    rules = ParticleRules.from_schema(schema.ParticleRules(
+        reproductionRate=0.01, energyConsumption=0.1, maxSpeed=2.0, visionRange=50.0, socialDistance=20.0
+    ))
+    simulation.add_species("Deer", "#00ff00", rules, Diet.HERBIVORE, ReproductionStyle.TWO_PARENTS, 30)
+    for _ in range(50):
+        simulation._tick()
+    return simulation
+
+
+def test_rules_convert_from_the_api_schema():
+    rules = ParticleRules.from_schema(schema.ParticleRules(
+        reproductionRate=0.1, energyConsumption=0.2, maxSpeed=3.0, visionRange=40.0,
+        socialDistance=10.0, particleType="plant"
+    ))
+    assert rules.particleType is ParticleType.PLANT and rules.maxSpeed == 3.0
+
+
+def test_entities_are_slotted():
+    with pytest.raises(AttributeError):
+        Position(1.0, 2.0).z = 3.0
+
+
+def test_state_still_validates_against_the_api_schema():
+    simulation = make_simulation()
+    state = schema.SimulationState.model_validate(simulation.get_state())
+    assert state.tickCount == 50
+    assert set(state.particles) == set(simulation.state.particles)
+    for group_id, group in state.groups.items():
+        assert group.memberIds == {
+            p.id for p in simulation.state.particles.values() if p.attributes.groupId == group_id
+        }
@@ -0,0 +1,54 @@
+import struct
+
+import pytest
+
+from app.host.frame_ring import FrameRingReader, FrameRingWriter, RING_HEADER, SLOT_HEADER
+
+
+def test_readers_see_the_latest_committed_frame(tmp_path):
+    path = str(tmp_path / "frames.ring")
+    writer = FrameRingWriter(path, slot_count=2, slot_size=64)
+    reader = FrameRingReader(path)
+    try:
+        assert reader.read(0) is None
+        assert writer.write('{"tick":1}', 3)
+        assert writer.write('{"tick":2,"name":"café"}', 3)
+        assert reader.read(0) == (2, 3, '{"tick":2,"name":"café"}')
+        assert reader.read(2) is None  # Nothing newer
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_frames_too_big_for_a_slot_are_marked_as_sent_elsewhere(tmp_path):
+    path = str(tmp_path / "frames.ring")
+    writer = FrameRingWriter(path, slot_count=2, slot_size=8)
+    reader = FrameRingReader(path)
+    try:
+        assert not writer.write('{"tick":"too big"}', 1)
+        assert reader.read(0) == (1, 1, None)
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_a_slot_being_rewritten_is_not_read(tmp_path):
+    path = str(tmp_path / "frames.ring")
+    writer = FrameRingWriter(path, slot_count=2, slot_size=64)
+    reader = FrameRingReader(path)
+    try:
+        writer.write('{"tick":1}', 1)
+        # As if the writer were halfway through the slot: odd sequence
+        offset = RING_HEADER.size + (1 % 2) * (SLOT_HEADER.size + 64)
+        struct.pack_into("<Q", writer._map, offset, 1)
+        assert reader.read(0) is None
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "other"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        FrameRingReader(str(path))
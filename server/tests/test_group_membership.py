@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.simulation.group_membership import GroupMembership
+
+
+def particles(*ids):
+    return [SimpleNamespace(id=particle_id) for particle_id in ids]
+
+
+def test_leave_moves_the_last_slot_into_the_gap():
+    membership = GroupMembership(capacity=2)
+    membership.add_group("g1")
+    membership.add_group("g2")
+    a, b, c = particles("a", "b", "c")
+    membership.join(a, "g1")
+    membership.join(b, "g1")
+    membership.join(c, "g2")  # Grows past the initial capacity
+
+    assert membership.leave(a) == "g1"
+    assert membership.slot("c") == 0
+    assert membership.members("g2") == [c]
+    assert membership.size("g1") == 1
+    assert membership.leave(a) is None
+
+
+def test_relabel_moves_whole_groups_at_once():
+    membership = GroupMembership()
+    for group_id in ("g1", "g2", "g3"):
+        membership.add_group(group_id)
+    a, b, c, d = particles("a", "b", "c", "d")
+    membership.join(a, "g1")
+    membership.join(b, "g2")
+    membership.join(c, "g2")
+    membership.join(d, "g3")
+
+    moved = membership.relabel({membership.number("g2"): membership.number("g1")})
+    assert sorted(particle.id for particle in moved) == ["b", "c"]
+    assert membership.size("g1") == 3 and membership.size("g2") == 0
+    assert sorted(membership.member_ids()["g1"]) == ["a", "b", "c"]
+    assert membership.member_ids()["g3"] == ["d"]
+
+
+def test_keep_compacts_and_numbers_are_reused():
+    membership = GroupMembership()
+    membership.add_group("g1")
+    a, b, c = particles("a", "b", "c")
+    for particle in (a, b, c):
+        membership.join(particle, "g1")
+
+    membership.keep(np.array([True, False, True]))
+    assert [particle.id for particle in membership.particles] == ["a", "c"]
+    assert membership.slot("c") == 1 and membership.size("g1") == 2
+
+    number = membership.number("g1")
+    membership.keep(np.zeros(2, dtype=bool))
+    membership.remove_group("g1")
+    assert membership.add_group("g4") == number
+    assert membership.member_ids() == {}
@@ -0,0 +1,62 @@
+import pytest
+
+from app.simulation.commands import answer_query, tick_number
+from app.simulation.frame_delta import diff_frames, apply_delta
+from app.simulation.history import TickHistory
+from app.simulation.simulation_manager import SimulationManager
+
+
+def make_frame(tick: int, particles: dict) -> dict:
+    return {
+        "type": "frame",
+        "metadataVersion": 1,
+        "tickCount": tick,
+        "populations": [len(particles)],
+        "particles": particles,
+        "groups": {},
+    }
+
+
+def particle(x: float) -> dict:
+    return {"position": {"x": x, "y": 0.0}, "speciesIndex": 0}
+
+
+def test_delta_round_trip():
+    before = make_frame(1, {"a": particle(1.0), "b": particle(2.0), "c": particle(3.0)})
+    after = make_frame(2, {"a": particle(1.0), "b": particle(2.5), "d": particle(4.0)})
+
+    delta = diff_frames(before, after)
+
+    assert set(delta["particles"]) == {"b", "d"}
+    assert delta["removed"] == ["c"]
+    assert apply_delta(before, delta) == after
+    assert before["particles"]["b"] == particle(2.0)  # The base frame is left untouched
+
+
+def test_history_rebuilds_past_frames():
+    history = TickHistory(keyframe_interval=3)
+    frames = [make_frame(tick, {"a": particle(float(tick))}) for tick in range(1, 8)]
+    for frame in frames:
+        history.record(frame)
+    history.close()  # Waits for the compressor to take everything queued
+
+    assert history.window() == (1, 7)
+    for frame in frames:
+        assert history.frame_at(frame["tickCount"]) == frame
+    assert history.frame_at(0) is None
+
+
+@pytest.mark.parametrize("tick", [None, [1], {"a": 1}, "soon", True])
+def test_scrub_rejects_malformed_ticks(tick):
+    with pytest.raises(ValueError):
+        answer_query(SimulationManager(), {"type": "scrub", "tick": tick})
+
+
+def test_scrub_accepts_numeric_ticks():
+    assert tick_number("12") == 12
+    assert answer_query(SimulationManager(), {"type": "scrub", "tick": 5}) is None  # History is off
+
+
+def test_stats_rejects_malformed_since():
+    with pytest.raises(ValueError):
+        answer_query(SimulationManager(), {"type": "stats", "since": [1]})
@@ -0,0 +1,62 @@
+from app.models.simulation import Diet, ReproductionStyle, SpawnShape
+from app.network.client_session import ClientSession, DEFAULT_VIEWPORT
+from app.simulation.entities import ParticleRules
+from app.simulation.simulation_manager import SimulationManager
+
+
+def make_pack(center=(700.0, 500.0), size=8, world=(800, 600)):
+    simulation = SimulationManager(world_width=world[0], world_height=world[1])
+    rules = ParticleRules(reproductionRate=0.0, energyConsumption=0.1, maxSpeed=2.0,
+                          visionRange=50.0, socialDistance=20.0)
+    species_id = simulation.add_species("Grazers", "#00ff00", rules, Diet.HERBIVORE,
+                                        ReproductionStyle.SELF_REPLICATING, initial_count=0)
+    ids = simulation.spawn(species_id, size, SpawnShape.CLUSTER, center=center, radius=5.0)
+    members = [simulation.state.particles[particle_id] for particle_id in ids]
+    group_id = simulation.group_manager.create_group(members)
+    for member in members:
+        member.attributes.energy = 50.0
+        member.attributes.hunger = 0.0
+        member.attributes.timeInGroup = 100
+    return simulation, group_id, members
+
+
+def test_pack_away_from_every_viewport_is_aggregated_and_expands_when_seen():
+    simulation, group_id, members = make_pack()
+    lod = simulation.pack_lod
+
+    lod.update([[0.0, 0.0, 200.0, 200.0]], collapse=True)
+    assert group_id in lod.packs
+
+    for _ in range(5):
+        lod.update([[0.0, 0.0, 200.0, 200.0]])
+    assert lod.packs[group_id].ticks == 5
+
+    lod.update([[600.0, 400.0, 200.0, 200.0]])
+    assert group_id not in lod.packs
+    # The ticks spent aggregated were written back to every member
+    assert all(member.attributes.age == 5 and member.attributes.timeInGroup == 105 for member in members)
+
+
+def test_visible_pack_and_unknown_viewports_stay_in_full():
+    simulation, group_id, _ = make_pack()
+    lod = simulation.pack_lod
+
+    lod.update([[600.0, 400.0, 200.0, 200.0]], collapse=True)
+    assert group_id not in lod.packs
+    lod.update(None, collapse=True)
+    assert group_id not in lod.packs
+
+
+def test_sessions_without_a_viewport_count_as_the_default_camera():
+    session = ClientSession(websocket=None)
+    assert session.viewport == list(DEFAULT_VIEWPORT)
+
+    # The default camera covers the origin, so a pack far from it can be aggregated
+    simulation, group_id, _ = make_pack(center=(1500.0, 1100.0), world=(2000, 1500))
+    simulation.pack_lod.update([session.viewport], collapse=True)
+    assert group_id in simulation.pack_lod.packs
+
+    assert session.set_viewport(None)
+    assert session.viewport is None
+    session.join("other", link=None)
+    assert session.viewport == list(DEFAULT_VIEWPORT)
@@ -0,0 +1,57 @@
+from app.models.simulation import Diet, ReproductionStyle
+from app.simulation.entities import ParticleRules
+from app.simulation.simulation_manager import SimulationManager
+
+
+def place(count_positions):
+    simulation = SimulationManager(world_width=800, world_height=600)
+    rules = ParticleRules(reproductionRate=0.0, energyConsumption=0.1, maxSpeed=2.0,
+                          visionRange=50.0, socialDistance=20.0)
+    species_id = simulation.add_species("Deer", "#00ff00", rules, Diet.HERBIVORE,
+                                        ReproductionStyle.SELF_REPLICATING, initial_count=0)
+    ids = simulation.spawn(species_id, len(count_positions))
+    members = [simulation.state.particles[particle_id] for particle_id in ids]
+    for particle, (x, y) in zip(members, count_positions):
+        particle.position.x, particle.position.y = x, y
+    return simulation, members
+
+
+def test_groups_chained_through_a_loner_merge_into_one():
+    # Two pairs 30 apart, bridged by a loner 15 from each, and a pair far away
+    simulation, (a, b, c, d, loner, e, f) = place([
+        (100, 100), (105, 100), (130, 100), (135, 100), (117, 100), (500, 400), (505, 400)
+    ])
+    groups = simulation.group_manager
+    first = groups.create_group([a, b])
+    second = groups.create_group([c, d])
+    far = groups.create_group([e, f])
+
+    groups.merge_packs()
+
+    merged = {p.attributes.groupId for p in (a, b, c, d, loner)}
+    assert len(merged) == 1 and merged <= {first, second}
+    assert set(simulation.state.groups) == merged | {far}
+    assert sorted(groups.member_ids()[merged.pop()]) == sorted(p.id for p in (a, b, c, d, loner))
+    assert simulation.stats.groups == 2
+
+
+def test_merges_stop_at_the_pack_size_limit():
+    simulation, (a, b, c, d) = place([(100, 100), (105, 100), (115, 100), (120, 100)])
+    groups = simulation.group_manager
+    groups.max_pack_size = 3
+    groups.create_group([a, b])
+    groups.create_group([c, d])
+
+    groups.merge_packs()
+
+    assert len(simulation.state.groups) == 2
+
+
+def test_loners_alone_never_make_a_pack():
+    simulation, _ = place([(100, 100), (105, 100), (300, 300), (305, 300)])
+    simulation.group_manager.create_group(list(simulation.state.particles.values())[2:])
+
+    simulation.group_manager.merge_packs()
+
+    assert len(simulation.state.groups) == 1
+    assert sum(1 for p in simulation.state.particles.values() if p.attributes.groupId) == 2
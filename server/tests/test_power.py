@@ -0,0 +1,66 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.simulation.power import PowerGovernor, ACTIVE, IDLE, HIBERNATING
+
+
+class FakeSimulation:
+    def __init__(self):
+        self.tick_rate = 1 / 60
+        self.is_running = True
+        self.checkpointer = None
+        self.state = SimpleNamespace(tickCount=0)
+        self.fast_forwarded = 0
+
+    async def start(self):
+        self.is_running = True
+
+    async def pause(self):
+        self.is_running = False
+
+    async def fast_forward(self, ticks: int):
+        self.fast_forwarded += ticks
+
+
+def test_idle_slows_down_and_viewers_restore_full_speed():
+    async def scenario():
+        simulation = FakeSimulation()
+        power = PowerGovernor(simulation, idle_tick_rate=5.0, hibernate_after=0)
+        await power.set_viewers(0)
+        assert power.state == IDLE and simulation.tick_rate == 1 / 5
+        await power.set_viewers(2)
+        assert power.state == ACTIVE and simulation.tick_rate == 1 / 60
+
+    asyncio.run(scenario())
+
+
+def test_hibernation_pauses_and_wakes_with_catch_up():
+    async def scenario():
+        simulation = FakeSimulation()
+        power = PowerGovernor(simulation, idle_tick_rate=100.0, hibernate_after=0.01,
+                              fast_forward_limit=1000)
+        await power.set_viewers(0)
+        await asyncio.sleep(0.05)
+        assert power.state == HIBERNATING and power.suspended
+        assert not simulation.is_running
+
+        await asyncio.sleep(0.05)
+        await power.set_viewers(1)
+        assert power.state == ACTIVE and simulation.is_running
+        assert 0 < simulation.fast_forwarded <= 1000
+
+    asyncio.run(scenario())
+
+
+def test_paused_world_stays_paused_after_waking():
+    async def scenario():
+        simulation = FakeSimulation()
+        simulation.is_running = False
+        power = PowerGovernor(simulation, hibernate_after=0.01)
+        await power.set_viewers(0)
+        await asyncio.sleep(0.05)
+        assert power.state == HIBERNATING and not power.suspended
+        await power.set_viewers(1)
+        assert not simulation.is_running
+
+    asyncio.run(scenario())
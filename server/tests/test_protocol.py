@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from app.host.protocol import (
+    HEADER, KIND_ANSWER, KIND_FRAME, encode_message, pack_message, read_message
+)
+
+
+def read_all(data: bytes, count: int):
+    async def scenario():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return [await read_message(reader) for _ in range(count)]
+
+    return asyncio.run(scenario())
+
+
+def test_messages_round_trip_back_to_back():
+    frame = encode_message({"type": "frame", "tickCount": 3, "name": "Fléur"})
+    data = pack_message(KIND_FRAME, 3, frame) + pack_message(KIND_ANSWER, 2 ** 32 + 5, "{}")
+
+    assert read_all(data, 2) == [(KIND_FRAME, 3, frame), (KIND_ANSWER, 5, "{}")]
+
+
+def test_length_counts_encoded_bytes():
+    payload = encode_message({"name": "ñ"})
+    _, _, length = HEADER.unpack_from(pack_message(KIND_FRAME, 0, payload))
+    assert length == len(payload.encode("utf-8")) > len(payload)
+
+
+def test_truncated_message_raises_incomplete_read():
+    data = pack_message(KIND_FRAME, 1, encode_message({"tickCount": 1}))
+    with pytest.raises(asyncio.IncompleteReadError):
+        read_all(data[:-1], 1)
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from app.simulation.commands import MAX_REPLAY_SPEED, replay_speed
+from app.simulation.recorder import TickLogReader, TickRecorder
+
+
+def make_frame(tick: int):
+    return {
+        "type": "frame",
+        "metadataVersion": 1 if tick < 6 else 2,
+        "tickCount": tick,
+        "populations": [tick],
+        "particles": {"a": {"position": {"x": float(tick), "y": 0.0}}, f"p{tick}": {"position": {"x": 1.0, "y": 1.0}}},
+        "groups": {},
+    }
+
+
+def record(path: str, ticks: int, chunk_ticks: int = 4, max_bytes=None):
+    recorder = TickRecorder(path, chunk_ticks=chunk_ticks, max_bytes=max_bytes)
+    for tick in range(1, ticks + 1):
+        version = 1 if tick < 6 else 2
+        recorder.record(make_frame(tick), version, lambda version=version: {"version": version})
+    recorder.close()
+    return recorder
+
+
+def test_replay_reproduces_every_recorded_tick(tmp_path):
+    path = str(tmp_path / "ticks.log")
+    record(path, 10)
+
+    reader = TickLogReader(path)
+    try:
+        assert (reader.first_tick, reader.last_tick) == (1, 10)
+        replayed = list(reader.frames())
+        assert [frame for _, frame in replayed] == [make_frame(tick) for tick in range(1, 11)]
+        # Metadata changes mid-chunk are carried to the frames after them
+        assert [metadata["version"] for metadata, _ in replayed] == [1] * 5 + [2] * 5
+    finally:
+        reader.close()
+
+
+def test_seek_starts_at_the_requested_tick(tmp_path):
+    path = str(tmp_path / "ticks.log")
+    record(path, 10)
+
+    reader = TickLogReader(path)
+    try:
+        assert [frame["tickCount"] for _, frame in reader.frames(start_tick=7)] == [7, 8, 9, 10]
+    finally:
+        reader.close()
+
+
+def test_index_is_rebuilt_from_the_log(tmp_path):
+    path = str(tmp_path / "ticks.log")
+    record(path, 10)
+    os.remove(path + ".idx")
+    # A torn final chunk is ignored rather than failing the whole log
+    with open(path, "ab") as log:
+        log.write(b"\xff\x00\x00\x00partial")
+
+    reader = TickLogReader(path)
+    try:
+        assert [frame["tickCount"] for _, frame in reader.frames()] == list(range(1, 11))
+    finally:
+        reader.close()
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "other.log"
+    path.write_bytes(b"not a tick log")
+    with pytest.raises(ValueError):
+        TickLogReader(str(path))
+
+
+def test_recording_stops_at_its_size_limit(tmp_path):
+    path = str(tmp_path / "ticks.log")
+    recorder = record(path, 100, max_bytes=600)
+
+    assert recorder.full
+    assert os.path.getsize(path) <= 600
+    reader = TickLogReader(path)
+    try:
+        # Everything written before the limit still replays
+        ticks = [frame["tickCount"] for _, frame in reader.frames()]
+        assert ticks and ticks == list(range(1, len(ticks) + 1)) and len(ticks) < 100
+    finally:
+        reader.close()
+
+
+@pytest.mark.parametrize("speed", [0, -1, "nan", "inf", "fast", None, [2]])
+def test_replay_rejects_bad_speeds(speed):
+    with pytest.raises(ValueError):
+        replay_speed(speed)
+
+
+def test_replay_speed_is_capped():
+    assert replay_speed("0.5") == 0.5
+    assert replay_speed(1e9) == MAX_REPLAY_SPEED
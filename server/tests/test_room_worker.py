@@ -0,0 +1,44 @@
+import threading
+
+from app.host.room_worker import Outbox
+
+
+class SlowConnection:
+    """Blocks every send until released, like a scheduler that stopped reading"""
+    def __init__(self):
+        self.sent = []
+        self.release = threading.Event()
+
+    def send(self, message):
+        self.release.wait()
+        self.sent.append(message)
+
+
+def test_outbox_keeps_only_the_latest_frame_per_room():
+    connection = SlowConnection()
+    outbox = Outbox(connection)
+    outbox.send(("report", {}))  # Taken by the writer, which then blocks on it
+    for tick in range(10):
+        outbox.send_frame("a", f"a{tick}")
+        outbox.send_frame("b", f"b{tick}")
+    connection.release.set()
+    outbox.close()
+
+    frames = [message for message in connection.sent if message[0] == "frame"]
+    assert frames[-2:] == [("frame", "a", "a9"), ("frame", "b", "b9")]
+    assert len(frames) <= 4  # Anything queued while blocked collapsed to the latest
+    assert outbox.superseded >= 16
+
+
+def test_metadata_goes_out_before_the_frames_that_follow_it():
+    connection = SlowConnection()
+    outbox = Outbox(connection)
+    outbox.send(("report", {}))
+    outbox.send_frame("a", "old")
+    outbox.send_metadata("a", 2, "species")
+    outbox.send_frame("a", "new")
+    connection.release.set()
+    outbox.close()
+
+    assert ("frame", "a", "old") not in connection.sent
+    assert connection.sent.index(("metadata", "a", 2, "species")) < connection.sent.index(("frame", "a", "new"))
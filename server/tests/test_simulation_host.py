@@ -0,0 +1,175 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from app.host.simulation_host import SimulationHost
+from app.host.protocol import pack_message, KIND_METADATA, KIND_FRAME
+
+
+class FakeTransport:
+    def __init__(self, backlog: int):
+        self.backlog = backlog
+
+    def get_write_buffer_size(self) -> int:
+        return self.backlog
+
+
+class FakeWriter:
+    def __init__(self, backlog: int = 0):
+        self.transport = FakeTransport(backlog)
+        self.written = []
+
+    def write(self, data: bytes):
+        self.written.append(data)
+
+
+def make_host() -> SimulationHost:
+    return SimulationHost(link=None, socket_path="/tmp/unused.sock", max_backlog=100)
+
+
+def test_stalled_worker_skips_frames_but_not_metadata():
+    host = make_host()
+    healthy, stalled = FakeWriter(), FakeWriter(backlog=1000)
+    frame = pack_message(KIND_FRAME, 0, "{}")
+    metadata = pack_message(KIND_METADATA, 2, "{}")
+
+    host._broadcast({healthy, stalled}, frame)
+    host._broadcast({healthy, stalled}, metadata, droppable=False)
+
+    assert healthy.written == [frame, metadata]
+    assert stalled.written == [metadata]
+
+
+def test_worker_link_stops_for_a_missing_room(tmp_path):
+    async def scenario():
+        from app.host.links import LocalSimulationLink, HostSimulationLink
+        from app.simulation.simulation_manager import SimulationManager
+
+        socket_path = str(tmp_path / "host.sock")
+        host = SimulationHost(LocalSimulationLink(SimulationManager()), socket_path)
+        serving = asyncio.create_task(host.serve())
+        try:
+            for _ in range(100):
+                if os.path.exists(socket_path):
+                    break
+                await asyncio.sleep(0.01)
+            link = HostSimulationLink(socket_path, room="missing", reconnect_delay=0.01)
+            await link.start()
+            await asyncio.wait_for(link._task, 2.0)  # Returns instead of reconnecting forever
+            assert link.closed
+        finally:
+            serving.cancel()
+            try:
+                await serving
+            except asyncio.CancelledError:
+                pass
+            await host.link.stop()
+
+    asyncio.run(scenario())
+
+
+def test_worker_link_reports_whether_the_host_is_connected(tmp_path):
+    async def scenario():
+        from app.host.links import LocalSimulationLink, HostSimulationLink
+        from app.simulation.simulation_manager import SimulationManager
+
+        socket_path = str(tmp_path / "host.sock")
+        link = HostSimulationLink(socket_path, reconnect_delay=0.01)
+        await link.start()
+        await asyncio.sleep(0.05)
+        assert not link.connected  # No host yet; /health answers 503
+
+        host = SimulationHost(LocalSimulationLink(SimulationManager()), socket_path)
+        serving = asyncio.create_task(host.serve())
+        try:
+            for _ in range(200):
+                if link.connected:
+                    break
+                await asyncio.sleep(0.01)
+            assert link.connected
+        finally:
+            await link.stop()
+            serving.cancel()
+            try:
+                await serving
+            except asyncio.CancelledError:
+                pass
+            await host.link.stop()
+
+    asyncio.run(scenario())
+
+
+def test_rejected_commands_come_back_to_the_worker(tmp_path):
+    async def scenario():
+        from app.host.links import LocalSimulationLink, HostSimulationLink
+        from app.simulation.simulation_manager import SimulationManager
+
+        socket_path = str(tmp_path / "host.sock")
+        host = SimulationHost(LocalSimulationLink(SimulationManager()), socket_path)
+        serving = asyncio.create_task(host.serve())
+        link = HostSimulationLink(socket_path, reconnect_delay=0.01)
+        try:
+            for _ in range(200):
+                if os.path.exists(socket_path):
+                    break
+                await asyncio.sleep(0.01)
+            await link.start()
+            for _ in range(200):
+                if link.connected:
+                    break
+                await asyncio.sleep(0.01)
+
+            await link.submit({"type": "pause"})
+            with pytest.raises(ValueError, match="Species not found"):
+                await link.submit({"type": "spawn", "speciesId": "missing", "count": 5})
+        finally:
+            await link.stop()
+            serving.cancel()
+            try:
+                await serving
+            except asyncio.CancelledError:
+                pass
+            await host.link.stop()
+
+    asyncio.run(scenario())
+
+
+def test_worker_reads_default_frames_from_the_ring(tmp_path):
+    async def scenario():
+        from app.host.frame_ring import FrameRingWriter
+        from app.host.links import LocalSimulationLink, HostSimulationLink
+        from app.simulation.simulation_manager import SimulationManager
+
+        socket_path = str(tmp_path / "host.sock")
+        ring_path = str(tmp_path / "frames.ring")
+        ring = FrameRingWriter(ring_path, slot_size=1024 * 1024)
+        host = SimulationHost(LocalSimulationLink(SimulationManager()), socket_path, frame_ring=ring)
+        serving = asyncio.create_task(host.serve())
+        link = HostSimulationLink(socket_path, reconnect_delay=0.01, frame_ring=ring_path)
+        try:
+            for _ in range(200):
+                if os.path.exists(socket_path):
+                    break
+                await asyncio.sleep(0.01)
+            await link.start()
+            for _ in range(200):
+                if host._ring_readers and link.frame() is not None and link._ring_sequence:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert host._ring_readers  # No longer sent frames over its socket
+            assert link._ring_sequence > 0
+            assert json.loads(link.frame())["type"] == "frame"
+        finally:
+            await link.stop()
+            serving.cancel()
+            try:
+                await serving
+            except asyncio.CancelledError:
+                pass
+            await host.link.stop()
+            ring.close()
+
+    asyncio.run(scenario())
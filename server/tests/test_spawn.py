@@ -0,0 +1,92 @@
+import asyncio
+import gc
+import math
+
+import pytest
+
+from app.models.simulation import Diet, ReproductionStyle, SpawnShape
+from app.simulation.commands import MAX_SPAWN, apply_command
+from app.simulation.entities import ParticleRules
+from app.simulation.simulation_manager import SimulationManager
+
+
+def make_simulation(**kwargs):
+    simulation = SimulationManager(world_width=800, world_height=600, **kwargs)
+    rules = ParticleRules(reproductionRate=0.0, energyConsumption=0.1, maxSpeed=2.0,
+                          visionRange=50.0, socialDistance=20.0)
+    species_id = simulation.add_species("Deer", "#00ff00", rules, Diet.HERBIVORE,
+                                        ReproductionStyle.SELF_REPLICATING, initial_count=0)
+    return simulation, species_id
+
+
+@pytest.mark.parametrize("shape", list(SpawnShape))
+def test_bulk_spawn_fills_the_world_in_shape(shape):
+    simulation, species_id = make_simulation()
+    ids = simulation.spawn(species_id, 500, shape, center=(790.0, 300.0), radius=40.0)
+
+    assert len(set(ids)) == 500
+    particles = [simulation.state.particles[particle_id] for particle_id in ids]
+    assert all(0 <= p.position.x < 800 and 0 <= p.position.y < 600 for p in particles)
+    assert all(math.hypot(p.velocity.x, p.velocity.y) <= 2.0 for p in particles)
+    assert simulation.state.species[species_id].population == 500
+    assert simulation.stats.population(species_id) == 500
+    if shape == SpawnShape.RING:
+        # Wrapped across the right edge, but still about one radius from the center
+        distances = [math.hypot(min(abs(p.position.x - 790), 800 - abs(p.position.x - 790)),
+                                p.position.y - 300) for p in particles]
+        assert 30 < min(distances) and max(distances) < 50
+
+
+def test_spawn_respects_the_particle_cap():
+    simulation, species_id = make_simulation(max_particles=50)
+    assert len(simulation.spawn(species_id, 40)) == 40
+    assert len(simulation.spawn(species_id, 40)) == 10
+    assert simulation.spawn(species_id, 40) == []
+
+
+def test_spawn_needs_a_known_species():
+    simulation, _ = make_simulation()
+    with pytest.raises(ValueError):
+        simulation.spawn("missing", 10)
+
+
+def species_command(**overrides):
+    command = {
+        "type": "add_species", "name": "Wolf", "color": "#aa3300",
+        "rules": {"reproductionRate": 0.0, "energyConsumption": 0.1, "maxSpeed": 2.0,
+                  "visionRange": 50.0, "socialDistance": 20.0},
+        "diet": Diet.CARNIVORE.value, "reproductionStyle": ReproductionStyle.SELF_REPLICATING.value,
+    }
+    command.update(overrides)
+    return command
+
+
+def test_add_species_command_is_clamped_like_spawn():
+    simulation, _ = make_simulation(max_particles=MAX_SPAWN * 2)
+    asyncio.run(apply_command(simulation, species_command(initialCount=10 ** 7)))
+    assert len(simulation.state.particles) == MAX_SPAWN
+
+    simulation, _ = make_simulation(max_particles=50)
+    asyncio.run(apply_command(simulation, species_command(initialCount="40")))
+    asyncio.run(apply_command(simulation, species_command(initialCount=40)))
+    assert len(simulation.state.particles) == 50
+
+
+@pytest.mark.parametrize("overrides", [
+    {"name": ""}, {"color": "red"}, {"color": "#aa3300ff"}, {"initialCount": -1}, {"initialCount": "many"},
+])
+def test_add_species_command_is_validated(overrides):
+    simulation, _ = make_simulation()
+    with pytest.raises(ValueError):
+        asyncio.run(apply_command(simulation, species_command(**overrides)))
+    assert len(simulation.state.species) == 1
+
+
+def test_spawn_leaves_a_disabled_collector_disabled():
+    simulation, species_id = make_simulation()
+    gc.disable()
+    try:
+        simulation.spawn(species_id, 100)
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
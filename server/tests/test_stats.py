@@ -0,0 +1,54 @@
+import pytest
+
+from app.models.simulation import Diet, ReproductionStyle
+from app.simulation.entities import ParticleRules
+from app.simulation.simulation_manager import SimulationManager
+from app.simulation.stats import StatsHistory
+
+
+def full_scan(state, species_id):
+    members = [p for p in state.particles.values() if p.speciesId == species_id]
+    groups = sum(1 for group in state.groups.values() if group.speciesId == species_id)
+    if not members:
+        return (0, 0.0, 0.0, 0.0, groups)
+    count = len(members)
+    return (
+        count,
+        sum(p.attributes.energy for p in members) / count,
+        sum(p.attributes.hunger for p in members) / count,
+        sum(p.attributes.packMentality for p in members) / count,
+        groups,
+    )
+
+
+def test_running_totals_match_a_full_scan():
+    simulation = SimulationManager(world_width=400, world_height=300)
+    simulation.add_plant_species()
+    rules = ParticleRules(reproductionRate=0.01, energyConsumption=0.1, maxSpeed=2.0,
+                          visionRange=50.0, socialDistance=20.0)
+    for name, diet in (("Deer", Diet.HERBIVORE), ("Wolves", Diet.CARNIVORE)):
+        simulation.add_species(name, "#ffffff", rules, diet, ReproductionStyle.SELF_REPLICATING, 40)
+
+    for _ in range(200):
+        simulation._tick()
+
+    species_ids = list(simulation.state.species)
+    for species_id, sampled in zip(species_ids, simulation.stats.sample(species_ids)):
+        assert sampled == pytest.approx(full_scan(simulation.state, species_id))
+    assert simulation.stats.groups == len(simulation.state.groups)
+
+
+def test_history_averages_ticks_into_seconds():
+    history = StatsHistory()
+    for tick, now in enumerate((10.0, 10.5, 11.0, 11.5, 12.0), start=1):
+        history.record(tick, groups=tick, species=[(float(tick), 1.0, 2.0, 0.5, 0)], now=now)
+
+    assert len(history.samples("tick")) == 5
+    # Seconds 10 and 11 are closed; 12 is still open
+    seconds = history.samples("second")
+    assert [sample[0] for sample in seconds] == [2, 4]
+    assert seconds[0][2] == 1.5
+    assert seconds[1][3][0][0] == 3.5
+    assert history.samples("second", since=10.0) == seconds[1:]
+    with pytest.raises(ValueError):
+        history.samples("hour")
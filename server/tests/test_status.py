@@ -0,0 +1,29 @@
+from collections import Counter
+
+from app.models.simulation import Diet, ParticleType, ReproductionStyle
+from app.simulation.entities import ParticleRules
+from app.simulation.simulation_manager import SimulationManager
+
+
+def test_status_counters_match_the_world():
+    simulation = SimulationManager(world_width=400, world_height=300)
+    simulation.add_plant_species()
+    rules = ParticleRules(reproductionRate=0.01, energyConsumption=0.1, maxSpeed=2.0,
+                          visionRange=50.0, socialDistance=20.0)
+    simulation.add_species("Wolves", "#ff0000", rules, Diet.CARNIVORE, ReproductionStyle.SELF_REPLICATING, 30)
+    simulation.add_species("Deer", "#00ff00", rules, Diet.HERBIVORE, ReproductionStyle.SELF_REPLICATING, 30)
+    for _ in range(100):
+        simulation._tick()
+
+    status = simulation.get_status()
+    particles = simulation.state.particles.values()
+    assert status["total_particles"] == len(simulation.state.particles)
+    by_type = {particle_type.value: 0 for particle_type in ParticleType}
+    by_type.update(Counter(p.rules.particleType.value for p in particles))
+    assert status["particles_by_type"] == by_type
+    assert status["particles_by_species"] == {
+        species_id: sum(1 for p in particles if p.speciesId == species_id)
+        for species_id in simulation.state.species
+    }
+    assert status["group_count"] == len(simulation.state.groups)
+    assert status["tick_count"] == 100
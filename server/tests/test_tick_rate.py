@@ -0,0 +1,32 @@
+import pytest
+
+from app.models.simulation import Diet, ReproductionStyle
+from app.simulation.entities import ParticleRules
+from app.simulation.simulation_manager import SimulationManager
+
+
+def run_for_one_second(ticks_per_second: int):
+    simulation = SimulationManager(world_width=800, world_height=600)
+    simulation.set_tick_rate(ticks_per_second)
+    simulation.plant_spawn_rate = 0.0
+    rules = ParticleRules(reproductionRate=0.0, energyConsumption=0.1, maxSpeed=2.0,
+                          visionRange=50.0, socialDistance=20.0)
+    species_id = simulation.add_species("Deer", "#00ff00", rules, Diet.HERBIVORE,
+                                        ReproductionStyle.SELF_REPLICATING, initial_count=0)
+    particle_id = simulation.particle_manager.add_particle(species_id)
+    particle = simulation.state.particles[particle_id]
+    particle.position.x, particle.position.y = 100.0, 100.0
+    particle.velocity.x, particle.velocity.y = 1.5, -0.5
+    for _ in range(ticks_per_second):
+        simulation._tick()
+    return particle
+
+
+def test_world_speed_does_not_depend_on_the_tick_rate():
+    reference = run_for_one_second(60)
+    coarse = run_for_one_second(20)
+
+    assert (coarse.position.x, coarse.position.y) == pytest.approx((reference.position.x, reference.position.y))
+    assert coarse.attributes.energy == pytest.approx(reference.attributes.energy)
+    assert coarse.attributes.hunger == pytest.approx(reference.attributes.hunger)
+    assert (reference.position.x, reference.position.y) == pytest.approx((190.0, 70.0))
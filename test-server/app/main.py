@@ -17,7 +17,11 @@ from app.simulation.core.types import EntityType, Trait
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    app.state.simulation = SimulationManager(world_width=800, world_height=600)
+    app.state.simulation = SimulationManager(
+        world_width=800,
+        world_height=600,
+        tick_rate=float(os.getenv("SIMULATION_TICK_RATE", "20"))
+    )
     app.state.active_connections = set()
     app.state.broadcast_task = None
     
@@ -83,10 +87,14 @@ async def setup_initial_species(simulation: SimulationManager) -> None:
 
 async def broadcast_state(simulation: SimulationManager, 
                          active_connections: Set[WebSocket]) -> None:
-    """Broadcast simulation state to all connected clients."""
+    """Broadcast each new simulation tick to all connected clients."""
+    last_tick = None
     while True:
         try:
-            if active_connections:
+            # Clients render faster than the simulation ticks and interpolate in between, so only new ticks are sent
+            tick = (simulation.world.tick_count, simulation.is_running)
+            if active_connections and tick != last_tick:
+                last_tick = tick
                 state = simulation.get_state()
                 await asyncio.gather(
                     *[connection.send_json(state) for connection in active_connections],
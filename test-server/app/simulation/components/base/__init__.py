@@ -2,11 +2,13 @@ from .physics import PhysicsComponent
 from .vitality import VitalityComponent
 from .social import SocialComponent
 from .reproduction import ReproductionComponent
+from .sleeping import SleepingComponent
 
 __all__ = [
     "PhysicsComponent",
     "VitalityComponent",
     "SocialComponent",
     "ReproductionComponent",
+    "SleepingComponent",
 ]
     
\ No newline at end of file
@@ -20,26 +20,29 @@ class PhysicsComponent(Component):
         self.mass = mass
 
     def update(self, owner: 'Entity', context: 'SimulationContext', dt: float) -> None:
+        """Step a single entity; the PhysicsSystem does the same for all of them at once"""
+        # Vectors are updated in place: the entity shares them
         # Update velocity with acceleration
-        self.velocity = self.velocity + (self.acceleration * dt)
+        self.velocity.x += self.acceleration.x * dt
+        self.velocity.y += self.acceleration.y * dt
         
         # Apply max speed limit
         speed = self.velocity.magnitude()
         if speed > self.max_speed:
-            self.velocity = self.velocity.normalize() * self.max_speed
+            self.velocity.x *= self.max_speed / speed
+            self.velocity.y *= self.max_speed / speed
         
-        # Update position
-        self.position = self.position + (self.velocity * dt)
-        
-        # Wrap around world boundaries
-        self.position.x = self.position.x % context.width
-        self.position.y = self.position.y % context.height
+        # Update position and wrap around world boundaries
+        self.position.x = (self.position.x + self.velocity.x * dt) % context.width
+        self.position.y = (self.position.y + self.velocity.y * dt) % context.height
 
         owner.velocity = self.velocity
         
         # Reset acceleration
-        self.acceleration = Vector2D(0, 0)
+        self.acceleration.x = 0.0
+        self.acceleration.y = 0.0
 
     def apply_force(self, force: Vector2D) -> None:
-        """Apply a force to the entity"""
-        self.acceleration = self.acceleration + (force * (1.0 / self.mass))
+        """Accumulate a force until the next physics step"""
+        self.acceleration.x += force.x / self.mass
+        self.acceleration.y += force.y / self.mass
@@ -26,7 +26,7 @@ class ReproductionComponent(Component):
         if self.is_pregnant:
             self.gestation_time += 1
             if self.gestation_time >= self.max_gestation:
-                self._give_birth(owner, context.world)
+                self._give_birth(owner, context)
 
     def can_reproduce(self, entity: 'Entity') -> bool:
         return (
@@ -0,0 +1,7 @@
+from app.simulation.core import Component
+
+class SleepingComponent(Component):
+    """Tags a settled entity the SleepSystem has put to sleep; systems' queries skip it until it wakes"""
+    def __init__(self, since: float, wake_at: float):
+        self.since = since
+        self.wake_at = wake_at
@@ -1,27 +1,40 @@
-from typing import Dict, Optional
+from typing import Optional
+from uuid import UUID
 from app.simulation.core.interfaces import Component
 from app.simulation.models import Entity
+from app.simulation.models.relationships import BondMemory
 from app.simulation.core.context import SimulationContext
 
 class SocialComponent(Component):
-    def __init__(self, pack_mentality: float = 0.5):
+    def __init__(self, pack_mentality: float = 0.5, memory_capacity: int = 32):
         self.pack_mentality = pack_mentality
-        self.group_id: Optional[str] = None
-        self.meeting_history: Dict[str, int] = {}
+        self.group_id: Optional[UUID] = None
+        # Bounded and fading; bonds with current pack members live in the pack instead
+        self.meeting_history = BondMemory(memory_capacity)
         self.time_in_group = 0
         self.leadership_score = 0.0
-        self.relationships: Dict[str, float] = {}
+        self.relationships = BondMemory(memory_capacity)
 
     def update(self, owner: 'Entity', context: 'SimulationContext', dt: float) -> None:
         if self.group_id:
+            # Bonds with the other members grow in the pack's matrix, worked out when read
             self.time_in_group += 1
-            
-            # Update relationships with group members
-            group = context.world.get_group(self.group_id)
+
+    def relationship(self, owner: 'Entity', other_id: UUID, context: 'SimulationContext') -> float:
+        """Current bond strength with another entity"""
+        if self.group_id:
+            group = context.get_object(self.group_id)
+            if group and other_id in group.relationships:
+                return group.relationships.strength(owner.id, other_id, context.time)
+        return self.relationships.get(other_id, context.time)
+
+    def meet(self, other_id: UUID, context: 'SimulationContext') -> float:
+        """Count a meeting with another entity, returning the fading meeting count"""
+        return self.meeting_history.add(other_id, 1.0, context.time)
+
+    def detach(self, owner: 'Entity', context: 'SimulationContext') -> None:
+        """Leave the pack when the owner is removed from the simulation"""
+        if self.group_id:
+            group = context.get_object(self.group_id)
             if group:
-                for member_id in group.members:
-                    if member_id != owner.id:
-                        self.relationships[member_id] = min(
-                            1.0, 
-                            self.relationships.get(member_id, 0) + 0.01 * dt
-                        )
+                group.remove_member(owner, context.time)
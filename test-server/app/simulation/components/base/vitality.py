@@ -20,6 +20,7 @@ class VitalityComponent(Component):
         self.health = 100.0
 
     def update(self, owner: 'Entity', context: 'SimulationContext', dt: float) -> None:
+        """Step a single entity; the VitalitySystem does the same for all of them at once"""
         self.age += 1
         self.last_ate += 1
         
@@ -2,6 +2,8 @@ from .types import *
 from .interfaces import *
 from .config import *
 from .vector import *
+from .archetype import Archetype, ArchetypeStorage, component_name
+from .registry import ObjectRegistry
 
 __all__ = [
     "EntityId",
@@ -15,5 +17,9 @@ __all__ = [
     "VITALITY_CONFIG",
     "PHYSICS_CONFIG",
     "SimulationContext",
+    "Archetype",
+    "ArchetypeStorage",
+    "component_name",
+    "ObjectRegistry",
 ]
     
\ No newline at end of file
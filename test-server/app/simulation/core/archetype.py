@@ -0,0 +1,149 @@
+from typing import Dict, FrozenSet, Iterable, List, Tuple, Type, Union
+from uuid import UUID
+from app.simulation.core.interfaces import GameObject, Component
+
+ComponentKey = Union[str, Type[Component], Component]
+
+def component_name(component: ComponentKey) -> str:
+    """Name a component is stored under, the same key as Entity.components"""
+    if isinstance(component, str):
+        return component
+    if isinstance(component, type):
+        return component.__name__
+    return component.__class__.__name__
+
+class Archetype:
+    """
+    Table of every entity that has exactly one set of component types.
+    Each component type has a dense column, and an entity's row index is the
+    same in all of them, so systems walk columns instead of per-entity dicts.
+    """
+    def __init__(self, key: FrozenSet[str]):
+        self.key = key
+        self.entities: List[GameObject] = []
+        self.columns: Dict[str, List[Component]] = {name: [] for name in sorted(key)}
+        self.rows: Dict[UUID, int] = {}
+        # Neighbouring archetypes one component away, cached as entities move
+        self.add_edges: Dict[str, 'Archetype'] = {}
+        self.remove_edges: Dict[str, 'Archetype'] = {}
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def append(self, entity: GameObject) -> None:
+        """Add an entity as the last row"""
+        self.rows[entity.id] = len(self.entities)
+        self.entities.append(entity)
+        for name, column in self.columns.items():
+            column.append(entity.components[name])
+
+    def extend(self, entities: List[GameObject]) -> None:
+        """Add entities as rows in one bulk append per column"""
+        start = len(self.entities)
+        self.rows.update((entity.id, start + offset) for offset, entity in enumerate(entities))
+        self.entities.extend(entities)
+        for name, column in self.columns.items():
+            column.extend(entity.components[name] for entity in entities)
+
+    def remove(self, entity: GameObject) -> None:
+        """Remove an entity's row by moving the last row into its place"""
+        row = self.rows.pop(entity.id)
+        last = self.entities.pop()
+        if row < len(self.entities):
+            self.entities[row] = last
+            self.rows[last.id] = row
+        for column in self.columns.values():
+            moved = column.pop()
+            if row < len(column):
+                column[row] = moved
+
+    def replace(self, entity: GameObject, name: str, component: Component) -> None:
+        """Swap in a new instance of a component type the entity already has"""
+        self.columns[name][self.rows[entity.id]] = component
+
+class ArchetypeStorage:
+    """Archetype tables of all entities, with cached component queries"""
+    def __init__(self):
+        self._archetypes: Dict[FrozenSet[str], Archetype] = {}
+        self._locations: Dict[UUID, Archetype] = {}
+        # (required, excluded) component names -> matching archetypes
+        self._queries: Dict[Tuple[FrozenSet[str], FrozenSet[str]], List[Archetype]] = {}
+
+    def __contains__(self, entity_id: UUID) -> bool:
+        return entity_id in self._locations
+
+    @property
+    def archetypes(self) -> Iterable[Archetype]:
+        return self._archetypes.values()
+
+    def archetype_of(self, entity_id: UUID) -> Archetype:
+        return self._locations[entity_id]
+
+    def insert(self, entity: GameObject) -> None:
+        """Store an entity in the table matching its current components"""
+        archetype = self._archetype(frozenset(entity.components))
+        archetype.append(entity)
+        self._locations[entity.id] = archetype
+
+    def insert_many(self, entities: List[GameObject]) -> None:
+        """Store a batch of entities, appending to each table once"""
+        batches: Dict[FrozenSet[str], List[GameObject]] = {}
+        for entity in entities:
+            batches.setdefault(frozenset(entity.components), []).append(entity)
+        for key, batch in batches.items():
+            archetype = self._archetype(key)
+            archetype.extend(batch)
+            self._locations.update((entity.id, archetype) for entity in batch)
+
+    def remove(self, entity: GameObject) -> None:
+        archetype = self._locations.pop(entity.id, None)
+        if archetype is not None:
+            archetype.remove(entity)
+
+    def component_added(self, entity: GameObject, name: str) -> None:
+        """Move an entity after a component was added to entity.components"""
+        source = self._locations[entity.id]
+        if name in source.key:
+            source.replace(entity, name, entity.components[name])
+            return
+        target = source.add_edges.get(name)
+        if target is None:
+            target = source.add_edges[name] = self._archetype(source.key | {name})
+            target.remove_edges[name] = source
+        self._move(entity, source, target)
+
+    def component_removed(self, entity: GameObject, name: str) -> None:
+        """Move an entity after a component was removed from entity.components"""
+        source = self._locations[entity.id]
+        if name not in source.key:
+            return
+        target = source.remove_edges.get(name)
+        if target is None:
+            target = source.remove_edges[name] = self._archetype(source.key - {name})
+            target.add_edges[name] = source
+        self._move(entity, source, target)
+
+    def query(self, names: FrozenSet[str], excluded: FrozenSet[str] = frozenset()) -> List[Archetype]:
+        """Archetypes having all the named components and none of the excluded ones;
+        the list is kept up to date as tables appear"""
+        matches = self._queries.get((names, excluded))
+        if matches is None:
+            matches = self._queries[(names, excluded)] = [
+                archetype for archetype in self._archetypes.values()
+                if names <= archetype.key and excluded.isdisjoint(archetype.key)
+            ]
+        return matches
+
+    def _archetype(self, key: FrozenSet[str]) -> Archetype:
+        archetype = self._archetypes.get(key)
+        if archetype is None:
+            archetype = self._archetypes[key] = Archetype(key)
+            for (names, excluded), matches in self._queries.items():
+                if names <= key and excluded.isdisjoint(key):
+                    matches.append(archetype)
+        return archetype
+
+    def _move(self, entity: GameObject, source: Archetype, target: Archetype) -> None:
+        source.remove(entity)
+        target.append(entity)
+        self._locations[entity.id] = target
@@ -1,6 +1,9 @@
-from typing import Dict, List, Optional, TypeVar, Type
+from typing import Iterator, List, Optional, Sequence, Tuple, TypeVar, Type
 from uuid import UUID
 from app.simulation.core.interfaces import GameObject
+from app.simulation.core.archetype import ArchetypeStorage, ComponentKey, component_name
+from app.simulation.core.registry import ObjectRegistry
+from app.simulation.core.scheduler import SystemScheduler
 
 T = TypeVar('T', bound=GameObject)
 
@@ -13,40 +16,98 @@ class SimulationContext:
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
-        self._objects: Dict[UUID, GameObject] = {}
-        self._object_types: Dict[Type[GameObject], List[UUID]] = {}
+        self._objects = ObjectRegistry()
+        # Objects updated every step; sleeping entities are left out until something wakes them
+        self._awake = ObjectRegistry()
+        # Entities, i.e. objects with components, are also stored by component set
+        self.archetypes = ArchetypeStorage()
+        # Systems step components in bulk, each once per update, before objects update themselves
+        self.scheduler = SystemScheduler()
         self.time: float = 0.0
         self.tick_rate: int = 0
+        # Updates run so far; frames carry it so clients can order and interpolate them
+        self.tick_count: int = 0
 
     def register(self, obj: GameObject) -> None:
         """Register a game object with the simulation"""
-        self._objects[obj.id] = obj
-        obj_type = type(obj)
-        if obj_type not in self._object_types:
-            self._object_types[obj_type] = []
-        self._object_types[obj_type].append(obj.id)
+        if obj.id in self._objects:
+            return
+        self._objects.add(obj)
+        self._awake.add(obj)
+        if hasattr(obj, "components"):
+            self.archetypes.insert(obj)
+            obj.world = self
+
+    def register_many(self, objects: List[GameObject]) -> None:
+        """Register a batch of new game objects, e.g. a freshly spawned population"""
+        objects = [obj for obj in objects if obj.id not in self._objects]
+        for obj in objects:
+            self._objects.add(obj)
+            self._awake.add(obj)
+        entities = [obj for obj in objects if hasattr(obj, "components")]
+        self.archetypes.insert_many(entities)
+        for entity in entities:
+            entity.world = self
 
     def unregister(self, obj: GameObject) -> None:
         """Remove a game object from the simulation"""
-        if obj.id in self._objects:
-            del self._objects[obj.id]
-            obj_type = type(obj)
-            if obj_type in self._object_types:
-                self._object_types[obj_type].remove(obj.id)
+        if self._objects.remove(obj):
+            self._awake.remove(obj)
+            if obj.id in self.archetypes:
+                self.archetypes.remove(obj)
+                obj.world = None
+            on_unregister = getattr(obj, "on_unregister", None)
+            if on_unregister is not None:
+                on_unregister(self)
 
     def get_object(self, obj_id: UUID) -> Optional[GameObject]:
         """Get an object by its ID"""
         return self._objects.get(obj_id)
 
-    def get_objects_by_type(self, obj_type: Type[T]) -> List[T]:
-        """Get all objects of a specific type"""
-        if obj_type not in self._object_types:
-            return []
-        return [self._objects[obj_id] for obj_id in self._object_types[obj_type]]
+    def get_objects_by_type(self, obj_type: Type[T]) -> Tuple[T, ...]:
+        """Get all objects of a specific type; the tuple is cached until that type changes"""
+        return self._objects.of_type(obj_type)
+
+    def sleep(self, obj: GameObject) -> None:
+        """Stop updating an object each step until it is woken"""
+        self._awake.remove(obj)
+
+    def wake(self, obj: GameObject) -> None:
+        """Resume updating a sleeping object"""
+        if obj.id in self._objects:
+            self._awake.add(obj)
+
+    def is_awake(self, obj: GameObject) -> bool:
+        return obj.id in self._awake
+
+    @property
+    def awake_count(self) -> int:
+        return len(self._awake)
+
+    def add_system(self, system: object) -> None:
+        """Run a system every update, after any already added that it conflicts with"""
+        self.scheduler.add(system)
+
+    def query(self, *components: ComponentKey,
+              exclude: Sequence[ComponentKey] = ()) -> Iterator[Tuple[List, ...]]:
+        """
+        Dense columns of every entity having all the given components and none of
+        the excluded ones, one (entities, column, ...) tuple per archetype with
+        columns in argument order. The matching archetypes are cached per component
+        set. Yielded lists are the storage itself: read and update components in
+        place, but add or remove components only after iterating.
+        """
+        names = [component_name(component) for component in components]
+        excluded = frozenset(component_name(component) for component in exclude)
+        for archetype in self.archetypes.query(frozenset(names), excluded):
+            if archetype.entities:
+                yield (archetype.entities, *(archetype.columns[name] for name in names))
 
     def update(self, dt: float) -> None:
-        """Update all objects in the simulation"""
+        """Update all awake objects in the simulation"""
         self.time += dt
-        # Create a copy of values to allow for object removal during iteration
-        for obj in list(self._objects.values()):
+        self.tick_count += 1
+        self.scheduler.run(self, dt)
+        # values() is a copy, so objects can be removed during iteration
+        for obj in self._awake.values():
             obj.update(self, dt)
\ No newline at end of file
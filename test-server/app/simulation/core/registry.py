@@ -0,0 +1,65 @@
+from typing import Dict, List, Optional, Tuple, Type, TypeVar
+from uuid import UUID
+from app.simulation.core.interfaces import GameObject
+
+T = TypeVar('T', bound=GameObject)
+
+class ObjectRegistry:
+    """
+    Game objects by id and by exact type. Each type has a dense array that
+    removals compact by moving its last object into the freed index, so
+    registering and unregistering are O(1).
+    """
+    def __init__(self):
+        self._objects: Dict[UUID, GameObject] = {}
+        self._dense: Dict[Type[GameObject], List[GameObject]] = {}
+        self._indices: Dict[UUID, int] = {}
+        # Immutable snapshots of the dense arrays, dropped when their type changes
+        self._views: Dict[Type[GameObject], Tuple[GameObject, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __contains__(self, obj_id: UUID) -> bool:
+        return obj_id in self._objects
+
+    def add(self, obj: GameObject) -> None:
+        if obj.id in self._objects:
+            return
+        dense = self._dense.setdefault(type(obj), [])
+        self._objects[obj.id] = obj
+        self._indices[obj.id] = len(dense)
+        dense.append(obj)
+        self._views.pop(type(obj), None)
+
+    def remove(self, obj: GameObject) -> bool:
+        """Forget an object, returning whether it was registered"""
+        if self._objects.pop(obj.id, None) is None:
+            return False
+        obj_type = type(obj)
+        dense = self._dense[obj_type]
+        index = self._indices.pop(obj.id)
+        last = dense.pop()
+        if index < len(dense):
+            dense[index] = last
+            self._indices[last.id] = index
+        self._views.pop(obj_type, None)
+        return True
+
+    def get(self, obj_id: UUID) -> Optional[GameObject]:
+        return self._objects.get(obj_id)
+
+    def index_of(self, obj: GameObject) -> int:
+        """Position of an object in its type's dense array, valid until that type next changes"""
+        return self._indices[obj.id]
+
+    def of_type(self, obj_type: Type[T]) -> Tuple[T, ...]:
+        """Every object of exactly this type, as a snapshot cached until the type next changes"""
+        view = self._views.get(obj_type)
+        if view is None:
+            view = self._views[obj_type] = tuple(self._dense.get(obj_type, ()))
+        return view
+
+    def values(self) -> List[GameObject]:
+        """Snapshot of every object, safe to iterate while objects come and go"""
+        return list(self._objects.values())
@@ -0,0 +1,90 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Tuple
+from app.simulation.core.archetype import component_name
+
+if TYPE_CHECKING:
+    from app.simulation.core.context import SimulationContext
+
+class SystemScheduler:
+    """
+    Runs every system once per update, ordered by the components they declare.
+    A system runs after each earlier-added system it conflicts with (one writes
+    what the other reads or writes); systems with no conflicts between them share
+    a stage and run concurrently on a thread pool.
+    """
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self.parallel: bool = True
+        # Milliseconds each system took in the last update
+        self.timings: Dict[str, float] = {}
+        self._systems: List[object] = []
+        self._stages: Optional[List[List[object]]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def add(self, system: object) -> None:
+        self._systems.append(system)
+        self._stages = None
+
+    @property
+    def systems(self) -> List[object]:
+        return list(self._systems)
+
+    @property
+    def stages(self) -> List[List[object]]:
+        """Systems grouped into stages that run one after another"""
+        if self._stages is None:
+            self._stages = self._build_stages()
+        return self._stages
+
+    def run(self, context: 'SimulationContext', dt: float) -> None:
+        timings: Dict[str, float] = {}
+        for stage in self.stages:
+            if self.parallel and len(stage) > 1:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="system")
+                futures = [
+                    (system, self._executor.submit(self._timed, system, context, dt)) for system in stage
+                ]
+                for system, future in futures:
+                    timings[type(system).__name__] = future.result()
+            else:
+                for system in stage:
+                    timings[type(system).__name__] = self._timed(system, context, dt)
+        self.timings = timings
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @staticmethod
+    def _timed(system: object, context: 'SimulationContext', dt: float) -> float:
+        start = time.perf_counter()
+        system.update(context, dt)
+        return (time.perf_counter() - start) * 1000
+
+    @staticmethod
+    def _access(system: object) -> Optional[Tuple[FrozenSet[str], FrozenSet[str]]]:
+        """Component names a system reads and writes; None if it doesn't say, so it conflicts with all"""
+        if not hasattr(system, "reads") and not hasattr(system, "writes"):
+            return None
+        reads = frozenset(component_name(component) for component in getattr(system, "reads", ()))
+        writes = frozenset(component_name(component) for component in getattr(system, "writes", ()))
+        return reads, writes
+
+    def _build_stages(self) -> List[List[object]]:
+        accesses = [self._access(system) for system in self._systems]
+        levels: List[int] = []
+        for index, access in enumerate(accesses):
+            level = 0
+            for earlier in range(index):
+                other = accesses[earlier]
+                if (access is None or other is None
+                        or access[1] & (other[0] | other[1]) or access[0] & other[1]):
+                    level = max(level, levels[earlier] + 1)
+            levels.append(level)
+        stages: List[List[object]] = [[] for _ in range(max(levels, default=-1) + 1)]
+        for system, level in zip(self._systems, levels):
+            stages[level].append(system)
+        return stages
@@ -1,7 +1,7 @@
 import math
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class Vector2D:
     x: float
     y: float
@@ -1,12 +1,75 @@
-from typing import Set
+import gc
+from functools import partial
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+from uuid import UUID
+from app.simulation.core.interfaces import Component
 from app.simulation.core.types import EntityType, Trait
+from app.simulation.core.vector import Vector2D
 from app.simulation.models import Entity
-from app.simulation.core import Vector2D
+
+class SpawnTemplate:
+    """Component layout of one entity type and trait set, resolved once and reused for every spawn"""
+    def __init__(self, entity_type: EntityType, traits: FrozenSet[Trait],
+                 layout: List[Tuple[str, Callable[[Entity], Component]]]):
+        self.entity_type = entity_type
+        self.traits = traits
+        # Component name and a builder of its default instance, per component
+        self.layout = layout
+        self.key: FrozenSet[str] = frozenset(name for name, _ in layout)
+
+    def attach(self, entity: Entity) -> None:
+        """Give an entity fresh default components"""
+        if entity.world is None:
+            entity.components.update((name, build(entity)) for name, build in self.layout)
+        else:
+            for _, build in self.layout:
+                entity.add_component(build(entity))
+
+    def spawn(self, count: int, species_id: UUID, color: str,
+              positions: Optional[List[Vector2D]] = None) -> List[Entity]:
+        """Create entities with this layout, ready to be registered together"""
+        layout = self.layout
+        entities = []
+        # Collections triggered by thousands of new objects would cost more than building them
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for index in range(count):
+                entity = Entity(
+                    entity_type=self.entity_type,
+                    position=positions[index] if positions is not None else Vector2D(0, 0),
+                    species_id=species_id,
+                    pack_id=None,
+                    color=color,
+                    traits=set(self.traits)
+                )
+                entity.components = {name: build(entity) for name, build in layout}
+                entities.append(entity)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return entities
 
 class ComponentFactory:
+    _templates: Dict[Tuple[EntityType, FrozenSet[Trait]], SpawnTemplate] = {}
+
+    @classmethod
+    def template(cls, entity_type: EntityType, traits: Set[Trait]) -> SpawnTemplate:
+        """The cached spawn template for an entity type and trait set"""
+        key = (entity_type, frozenset(traits))
+        template = cls._templates.get(key)
+        if template is None:
+            template = cls._templates[key] = cls._compile(*key)
+        return template
+
     @staticmethod
     def initialize_components(entity: 'Entity', traits: Set[Trait]) -> None:
         """Initialize all components for an entity based on its traits"""
+        ComponentFactory.template(entity.type, traits).attach(entity)
+
+    @staticmethod
+    def _compile(entity_type: EntityType, traits: FrozenSet[Trait]) -> SpawnTemplate:
+        """Resolve the trait checks into a component layout"""
         from app.simulation.components.base import (
             PhysicsComponent,
             VitalityComponent,
@@ -19,21 +82,25 @@ class ComponentFactory:
             OmnivoreComponent
         )
 
-        # Add basic components
-        entity.add_component(PhysicsComponent(position=entity.position, velocity=Vector2D(0, 0)))
-        entity.add_component(VitalityComponent())
-        
+        # Add basic components; physics shares the entity's vectors, so physics steps move the entity itself
+        layout: List[Tuple[type, Callable[[Entity], Component]]] = [
+            (PhysicsComponent, lambda entity: PhysicsComponent(position=entity.position, velocity=entity.velocity)),
+            (VitalityComponent, lambda entity: VitalityComponent()),
+        ]
+
         # Add creature-specific components
-        if entity.type == EntityType.CREATURE:
-            entity.add_component(SocialComponent())
-            entity.add_component(ReproductionComponent(
-                style="two_parents" if Trait.TWO_PARENTS in traits else "self_replicating"
-            ))
-        
+        if entity_type == EntityType.CREATURE:
+            style = "two_parents" if Trait.TWO_PARENTS in traits else "self_replicating"
+            build_reproduction = partial(ReproductionComponent, style=style)
+            layout.append((SocialComponent, lambda entity: SocialComponent()))
+            layout.append((ReproductionComponent, lambda entity: build_reproduction()))
+
         # Add diet components
         if Trait.HERBIVORE in traits:
-            entity.add_component(HerbivoreComponent())
+            layout.append((HerbivoreComponent, lambda entity: HerbivoreComponent()))
         elif Trait.CARNIVORE in traits:
-            entity.add_component(CarnivoreComponent())
+            layout.append((CarnivoreComponent, lambda entity: CarnivoreComponent()))
         elif Trait.OMNIVORE in traits:
-            entity.add_component(OmnivoreComponent())
\ No newline at end of file
+            layout.append((OmnivoreComponent, lambda entity: OmnivoreComponent()))
+
+        return SpawnTemplate(entity_type, traits, [(cls.__name__, build) for cls, build in layout])
@@ -1,9 +1,12 @@
 from .entity import Entity
 from .species import Species
+from .relationships import PackRelationships, BondMemory
 from .pack import Pack
 
 __all__ = [
     'Entity',
     'Species',
+    'PackRelationships',
+    'BondMemory',
     'Pack',
 ]
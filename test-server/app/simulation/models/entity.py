@@ -63,6 +63,8 @@ class Entity(GameObject):
         self.stats = stats or EntityStats()
         self.traits = traits or set()
         self.components: Dict[str, Component] = {}
+        # Context whose archetype storage holds this entity, set on register
+        self.world: Optional[SimulationContext] = None
 
         # Collision data
         self.collision_mask = 0xFFFFFFFF  # Default to colliding with everything
@@ -84,10 +86,7 @@ class Entity(GameObject):
         # Check lifetime
         if self.stats.age >= self.stats.lifetime:
             self.kill()
-            
-        # Update active effects
-        self._update_effects(dt)
-        
+
         # Handle state transitions
         if self.state == EntityState.SPAWNING and self.state_duration >= 1.0:
             self.set_state(EntityState.ACTIVE)
@@ -99,10 +98,13 @@ class Entity(GameObject):
         """Add a component to the entity"""
         name = component.__class__.__name__
         self.components[name] = component
+        if self.world is not None:
+            self.world.archetypes.component_added(self, name)
 
     def remove_component(self, component_name: str) -> None:
         """Remove a component from the entity"""
-        self.components.pop(component_name, None)
+        if self.components.pop(component_name, None) is not None and self.world is not None:
+            self.world.archetypes.component_removed(self, component_name)
 
     def get_component(self, component_name: str) -> Optional[Component]:
         """Get a component by name"""
@@ -112,6 +114,13 @@ class Entity(GameObject):
         """Check if entity has a specific component"""
         return component_name in self.components
 
+    def on_unregister(self, context: 'SimulationContext') -> None:
+        """Let components clean up after the entity leaves the simulation, e.g. on death"""
+        for component in list(self.components.values()):
+            detach = getattr(component, "detach", None)
+            if detach is not None:
+                detach(self, context)
+
     def add_trait(self, trait: Trait) -> None:
         """Add a trait to the entity"""
         if trait not in self.traits:
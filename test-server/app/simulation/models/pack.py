@@ -1,17 +1,45 @@
-from typing import List, Optional, Set
+from typing import List, Set
 from uuid import UUID, uuid4
 from app.simulation.core.interfaces import GameObject
 from app.simulation.models import Entity
+from app.simulation.models.relationships import PackRelationships
 from app.simulation.core.context import SimulationContext
 
 class Pack(GameObject):
-    def __init__(self, members: List[Entity]):
+    def __init__(self, members: List[Entity], now: float = 0.0):
         self.id: UUID = uuid4()
-        self.members: Set[Entity] = set(members)
+        self.members: Set[Entity] = set()
+        # Bonds between members, held once per pack rather than per member
+        self.relationships = PackRelationships()
+        for member in members:
+            self.add_member(member, now)
+
+    def add_member(self, entity: Entity, now: float) -> None:
+        """Take an entity in, carrying over the bonds it remembers with the members"""
+        social = entity.get_component("SocialComponent")
+        remembered = social.relationships.items(now) if social else None
+        self.members.add(entity)
+        self.relationships.add(entity.id, now, remembered)
+        if social:
+            social.group_id = self.id
+
+    def remove_member(self, entity: Entity, now: float) -> None:
+        """Let an entity go; it keeps its bonds as fading memories"""
+        if entity not in self.members:
+            return
+        self.members.discard(entity)
+        bonds = self.relationships.remove(entity.id, now)
+        social = entity.get_component("SocialComponent")
+        if social:
+            # Weakest first, so a full memory keeps the strongest bonds
+            for other_id, strength in sorted(bonds.items(), key=lambda bond: bond[1]):
+                social.relationships.set(other_id, strength, now)
+            social.group_id = None
+            social.time_in_group = 0
 
     def update(self, context: 'SimulationContext', dt: float) -> None:
-        for member in self.members:
-            member.update(context, dt)
+        # Members are registered objects themselves; the context updates them once per step
+        pass
 
     def serialize(self) -> dict:
         return {
@@ -0,0 +1,136 @@
+import math
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from uuid import UUID
+import numpy as np
+
+# Bond strength gained per second two entities spend in the same pack
+BOND_GROWTH_RATE = 0.01
+
+class PackRelationships:
+    """
+    Bond strengths between the members of one pack, as dense matrices over member slots.
+    Every pair in a pack bonds at the same rate, so instead of touching each pair every
+    step a pair keeps the strength and time of its last settlement, and the current
+    strength is worked out when it is read.
+    """
+    def __init__(self, capacity: int = 8):
+        self._slots: Dict[UUID, int] = {}
+        self._ids: List[Optional[UUID]] = [None] * capacity
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+        self._strength = np.zeros((capacity, capacity), dtype=np.float64)
+        self._since = np.zeros((capacity, capacity), dtype=np.float64)
+
+    def __contains__(self, member_id: UUID) -> bool:
+        return member_id in self._slots
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add(self, member_id: UUID, now: float, bonds: Optional[Dict[UUID, float]] = None) -> None:
+        """Add a member, starting from the bonds it remembers with members already here"""
+        if member_id in self._slots:
+            return
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self._slots[member_id] = slot
+        self._ids[slot] = member_id
+        self._strength[slot, :] = 0.0
+        self._strength[:, slot] = 0.0
+        self._since[slot, :] = now
+        self._since[:, slot] = now
+        for other_id, strength in (bonds or {}).items():
+            other = self._slots.get(other_id)
+            if other is not None and other != slot:
+                self._strength[slot, other] = self._strength[other, slot] = strength
+
+    def remove(self, member_id: UUID, now: float) -> Dict[UUID, float]:
+        """Drop a member, returning its current bonds with the members left behind"""
+        bonds = self.bonds(member_id, now)
+        slot = self._slots.pop(member_id, None)
+        if slot is not None:
+            self._ids[slot] = None
+            self._free.append(slot)
+        return bonds
+
+    def strength(self, member_id: UUID, other_id: UUID, now: float) -> float:
+        slot, other = self._slots.get(member_id), self._slots.get(other_id)
+        if slot is None or other is None or slot == other:
+            return 0.0
+        grown = self._strength[slot, other] + BOND_GROWTH_RATE * (now - self._since[slot, other])
+        return min(1.0, float(grown))
+
+    def bonds(self, member_id: UUID, now: float) -> Dict[UUID, float]:
+        """Current strength of every bond a member has in this pack"""
+        slot = self._slots.get(member_id)
+        if slot is None:
+            return {}
+        others = [other for other in self._slots.values() if other != slot]
+        grown = self._strength[slot, others] + BOND_GROWTH_RATE * (now - self._since[slot, others])
+        return {self._ids[other]: value for other, value in zip(others, np.minimum(grown, 1.0).tolist())}
+
+    def _grow(self) -> None:
+        capacity = len(self._ids)
+        size = capacity * 2
+        strength = np.zeros((size, size), dtype=np.float64)
+        since = np.zeros((size, size), dtype=np.float64)
+        strength[:capacity, :capacity] = self._strength
+        since[:capacity, :capacity] = self._since
+        self._strength, self._since = strength, since
+        self._ids.extend([None] * capacity)
+        self._free.extend(range(size - 1, capacity - 1, -1))
+
+class BondMemory:
+    """
+    An entity's bounded memory of other entities. Values fade with a half-life,
+    applied when read; values that have faded away are forgotten, and when the
+    memory is full the least recently used entry makes room.
+    """
+    def __init__(self, capacity: int = 32, half_life: float = 60.0, forget_below: float = 0.01):
+        self.capacity = capacity
+        self.half_life = half_life
+        self.forget_below = forget_below
+        self._entries: "OrderedDict[UUID, List[float]]" = OrderedDict()  # id -> [value, time]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, other_id: UUID) -> bool:
+        return other_id in self._entries
+
+    def get(self, other_id: UUID, now: float) -> float:
+        entry = self._entries.get(other_id)
+        if entry is None:
+            return 0.0
+        value = self._faded(entry, now)
+        if value < self.forget_below:
+            del self._entries[other_id]
+            return 0.0
+        entry[0], entry[1] = value, now
+        self._entries.move_to_end(other_id)
+        return value
+
+    def set(self, other_id: UUID, value: float, now: float) -> None:
+        if other_id in self._entries:
+            self._entries.move_to_end(other_id)
+        elif len(self._entries) >= self.capacity:
+            self._entries.popitem(last=False)
+        self._entries[other_id] = [value, now]
+
+    def add(self, other_id: UUID, amount: float, now: float, limit: float = math.inf) -> float:
+        """Strengthen a memory, returning the new value"""
+        value = min(limit, self.get(other_id, now) + amount)
+        self.set(other_id, value, now)
+        return value
+
+    def forget(self, other_id: UUID) -> None:
+        self._entries.pop(other_id, None)
+
+    def items(self, now: float) -> Dict[UUID, float]:
+        """Every remembered value as of now, without touching recency"""
+        values = {other_id: self._faded(entry, now) for other_id, entry in self._entries.items()}
+        return {other_id: value for other_id, value in values.items() if value >= self.forget_below}
+
+    def _faded(self, entry: List[float], now: float) -> float:
+        return entry[0] * 0.5 ** (max(0.0, now - entry[1]) / self.half_life)
@@ -1,9 +1,12 @@
-from typing import Set
+from typing import List, Optional, Set
 from uuid import uuid4
 from app.simulation.core.types import EntityType, Trait
 from app.simulation.core.vector import Vector2D
 from app.simulation.models import Entity
 from app.simulation.core.interfaces import GameObject
+from app.simulation.core.context import SimulationContext
+# Imported as a module: the factory imports the models package too
+from app.simulation.factory import component_factory
 
 class Species(GameObject):
     def __init__(
@@ -12,7 +15,8 @@ class Species(GameObject):
         entity_type: EntityType,
         color: str,
         base_traits: Set[Trait],
-        initial_population: int = 10
+        initial_population: int = 10,
+        context: Optional[SimulationContext] = None
     ):
         self.id = str(uuid4())
         self.name = name
@@ -23,27 +27,28 @@ class Species(GameObject):
         self.initial_population = initial_population
         self.total_spawned = 0
         self.generation = 0
+        # Traits resolved to a component layout once, for every entity this species spawns
+        self.template = component_factory.ComponentFactory.template(entity_type, base_traits)
 
-        for _ in range(self.initial_population):
-            self.create_entity(Vector2D(0, 0))
+        self.create_entities(self.initial_population, context=context)
 
     def create_entity(self, position: Vector2D) -> 'Entity':
         """Factory method to create new entities of this species"""
-        entity = Entity(
-            entity_type=self.type,
-            position=position,
-            species_id=self.id,
-            color=self.color,
-            traits=self.base_traits.copy()
-        )
-        
-        # Component initialization moved to a separate factory/builder class
-        from app.simulation.factory.component_factory import ComponentFactory
-        ComponentFactory.initialize_components(entity, self.base_traits)
-        
-        self.population += 1
-        self.total_spawned += 1
-        return entity
+        return self.create_entities(1, [position])[0]
+
+    def create_entities(
+        self,
+        count: int,
+        positions: Optional[List[Vector2D]] = None,
+        context: Optional[SimulationContext] = None
+    ) -> List['Entity']:
+        """Spawn many entities at once, registered with the context as one batch if given"""
+        entities = self.template.spawn(count, self.id, self.color, positions)
+        if context is not None:
+            context.register_many(entities)
+        self.population += count
+        self.total_spawned += count
+        return entities
 
     def serialize(self) -> dict:
         return {
@@ -6,18 +6,30 @@ from typing import Set, Any
 from app.simulation.core.context import SimulationContext
 from app.simulation.models import Entity, Species, Pack
 from app.simulation.core import EntityType, Trait
+from app.simulation.systems import PhysicsSystem, VitalitySystem, SocialSystem, ReproductionSystem, SleepSystem
 
 class SimulationManager:
-    def __init__(self, world_width: int, world_height: int):
-        """Initialize the simulation with a world of given dimensions."""
+    def __init__(self, world_width: int, world_height: int, tick_rate: float = 20.0):
+        """Initialize the simulation with a world of given dimensions, stepped tick_rate times a second."""
         self.world = SimulationContext(world_width, world_height)
+        self.world.tick_rate = tick_rate
+        # Added first: every other system skips what it puts to sleep
+        self.sleep_system = SleepSystem()
+        self.world.add_system(self.sleep_system)
+        self.world.add_system(PhysicsSystem())
+        self.world.add_system(VitalitySystem())
+        self.world.add_system(SocialSystem())
+        self.world.add_system(ReproductionSystem())
         self._is_running: bool = False
         self.connections: Set[Any] = set()  # Add missing connections set
         logging.basicConfig(level=logging.INFO)
         logging.info("SimulationManager initialized with world size (%d, %d)", world_width, world_height)
-        self.fixed_dt = 0.016  # Fixed time step
+        # Authoritative rate, independent of how often clients render; they interpolate between ticks
+        self.fixed_dt = 1 / tick_rate  # Fixed time step
+        self.max_catch_up = 5  # Steps run at most per loop pass after a stall, the rest is dropped
         self.accumulator = 0.0
         self.last_update_time = time.time()
+        self.last_tick_time = self.last_update_time  # Wall clock time of the latest step
         self._update_task = None  # Store the update task
 
     @property
@@ -44,12 +56,18 @@ class SimulationManager:
 
             self.accumulator += frame_time
 
-            while self.accumulator >= self.fixed_dt:
+            steps = 0
+            while self.accumulator >= self.fixed_dt and steps < self.max_catch_up:
                 self.world.update(self.fixed_dt)
                 self.accumulator -= self.fixed_dt
+                steps += 1
+            if steps:
+                self.last_tick_time = time.time()
+            if self.accumulator >= self.fixed_dt:
+                self.accumulator %= self.fixed_dt  # Too far behind to catch up
 
-            # Allow other tasks to run
-            await asyncio.sleep(0.01)
+            # Allow other tasks to run until the next step is due
+            await asyncio.sleep(max(0.0, self.fixed_dt - self.accumulator))
 
     async def pause(self) -> None:
         """Pause the simulation."""
@@ -65,7 +83,7 @@ class SimulationManager:
             if not name or not isinstance(initial_count, int) or initial_count <= 0:
                 raise ValueError("Invalid species parameters")
             
-            species = Species(name, color, entity_type, base_traits, initial_count)
+            species = Species(name, entity_type, color, base_traits, initial_count, context=self.world)
             self.world.register(species)
 
             logging.info("Species '%s' added with initial count %d.", name, initial_count)
@@ -77,15 +95,20 @@ class SimulationManager:
         """Return the current state of the simulation."""
         try:
             return {
-                "entities": {str(id): entity.serialize() 
-                            for id, entity in self.world._objects.items() if isinstance(entity, Entity)},
-                "species": {str(id): species.serialize() 
-                          for id, species in self.world._objects.items() if isinstance(species, Species)},
-                "packs": {str(id): pack.serialize() 
-                         for id, pack in self.world._objects.items() if isinstance(pack, Pack)},
+                "entities": {str(entity.id): entity.serialize()
+                            for entity in self.world.get_objects_by_type(Entity)},
+                "species": {str(species.id): species.serialize()
+                          for species in self.world.get_objects_by_type(Species)},
+                "packs": {str(pack.id): pack.serialize()
+                         for pack in self.world.get_objects_by_type(Pack)},
                 "worldWidth": self.world.width,
                 "worldHeight": self.world.height,
-                "tickCount": self.world.tick_rate,
+                "tickCount": self.world.tick_count,
+                # For client-side interpolation: when this tick was stepped and how far apart ticks are
+                "serverTime": self.last_tick_time,
+                "tickInterval": self.fixed_dt,
+                "systemTimings": self.world.scheduler.timings,
+                "sleepingEntities": self.sleep_system.sleeping_count,
                 "isRunning": self._is_running
             }
         except Exception as e:
@@ -0,0 +1,13 @@
+from .physics import PhysicsSystem
+from .vitality import VitalitySystem
+from .social import SocialSystem
+from .reproduction import ReproductionSystem
+from .sleep import SleepSystem
+
+__all__ = [
+    "PhysicsSystem",
+    "VitalitySystem",
+    "SocialSystem",
+    "ReproductionSystem",
+    "SleepSystem",
+]
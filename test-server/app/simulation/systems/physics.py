@@ -0,0 +1,48 @@
+import numpy as np
+from typing import TYPE_CHECKING
+from app.simulation.components.base import PhysicsComponent, SleepingComponent
+
+if TYPE_CHECKING:
+    from app.simulation.core.context import SimulationContext
+
+class PhysicsSystem:
+    """Integrates every awake entity with a PhysicsComponent, one NumPy pass per archetype"""
+    reads = (PhysicsComponent, SleepingComponent)
+    writes = (PhysicsComponent,)
+
+    def update(self, context: 'SimulationContext', dt: float) -> None:
+        for entities, bodies in context.query(PhysicsComponent, exclude=(SleepingComponent,)):
+            count = len(bodies)
+            px = np.fromiter((body.position.x for body in bodies), dtype=np.float64, count=count)
+            py = np.fromiter((body.position.y for body in bodies), dtype=np.float64, count=count)
+            vx = np.fromiter((body.velocity.x for body in bodies), dtype=np.float64, count=count)
+            vy = np.fromiter((body.velocity.y for body in bodies), dtype=np.float64, count=count)
+            ax = np.fromiter((body.acceleration.x for body in bodies), dtype=np.float64, count=count)
+            ay = np.fromiter((body.acceleration.y for body in bodies), dtype=np.float64, count=count)
+            max_speed = np.fromiter((body.max_speed for body in bodies), dtype=np.float64, count=count)
+
+            # Accumulated forces, then the speed limit
+            vx += ax * dt
+            vy += ay * dt
+            speed = np.hypot(vx, vy)
+            too_fast = speed > max_speed
+            scale = np.ones(count)
+            scale[too_fast] = max_speed[too_fast] / speed[too_fast]
+            vx *= scale
+            vy *= scale
+
+            # Integrate and wrap around world boundaries
+            px = (px + vx * dt) % context.width
+            py = (py + vy * dt) % context.height
+
+            # Written back into the existing vectors, which the entities share
+            for body, x, y, velocity_x, velocity_y in zip(
+                bodies, px.tolist(), py.tolist(), vx.tolist(), vy.tolist()
+            ):
+                position, velocity, acceleration = body.position, body.velocity, body.acceleration
+                position.x = x
+                position.y = y
+                velocity.x = velocity_x
+                velocity.y = velocity_y
+                acceleration.x = 0.0
+                acceleration.y = 0.0
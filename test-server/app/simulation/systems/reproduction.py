@@ -0,0 +1,15 @@
+from typing import TYPE_CHECKING
+from app.simulation.components.base import ReproductionComponent, SleepingComponent
+
+if TYPE_CHECKING:
+    from app.simulation.core.context import SimulationContext
+
+class ReproductionSystem:
+    """Cooldowns and gestation for every awake entity with a ReproductionComponent"""
+    reads = (ReproductionComponent, SleepingComponent)
+    writes = (ReproductionComponent,)
+
+    def update(self, context: 'SimulationContext', dt: float) -> None:
+        for entities, reproductions in context.query(ReproductionComponent, exclude=(SleepingComponent,)):
+            for entity, reproduction in zip(entities, reproductions):
+                reproduction.update(entity, context, dt)
@@ -0,0 +1,277 @@
+import heapq
+import itertools
+import random
+from collections import OrderedDict
+import numpy as np
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from uuid import UUID
+from app.simulation.core import VITALITY_CONFIG
+from app.simulation.components.base import (
+    PhysicsComponent,
+    VitalityComponent,
+    SocialComponent,
+    ReproductionComponent,
+    SleepingComponent
+)
+from app.simulation.models.entity import Entity, EntityState
+
+if TYPE_CHECKING:
+    from app.simulation.core.context import SimulationContext
+
+# Grid cells are numbered (column + 1) * CELL_STRIDE + row + 1
+CELL_STRIDE = 1 << 20
+
+class PointGrid:
+    """Points sorted by grid cell, for finding which points lie within a radius of others"""
+    def __init__(self, xs: np.ndarray, ys: np.ndarray, radius: float):
+        self.radius = radius
+        order = np.argsort(self._keys(xs, ys), kind="stable")
+        self.order = order
+        self.xs, self.ys = xs[order], ys[order]
+        self.keys = self._keys(self.xs, self.ys)
+
+    def near(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Mask of the given points with a grid point within the radius"""
+        found = np.zeros(len(xs), dtype=bool)
+        points, _ = self._pairs(xs, ys)
+        found[points] = True
+        return found
+
+    def reached(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Original indices of the grid points within the radius of any given point"""
+        _, others = self._pairs(xs, ys)
+        return np.unique(self.order[others])
+
+    def _pairs(self, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(given point, sorted grid point) index pairs within the radius"""
+        columns = np.floor(xs / self.radius).astype(np.int64)
+        rows = np.floor(ys / self.radius).astype(np.int64)
+        radius_sq = self.radius * self.radius
+        points: List[np.ndarray] = []
+        others: List[np.ndarray] = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                # Pair every point with each grid point in the neighbouring cell, then test the pairs at once
+                keys = (columns + dx + 1) * CELL_STRIDE + (rows + dy + 1)
+                start = np.searchsorted(self.keys, keys, side="left")
+                counts = np.searchsorted(self.keys, keys, side="right") - start
+                total = int(counts.sum())
+                if total == 0:
+                    continue
+                pair_points = np.repeat(np.arange(len(xs)), counts)
+                pair_others = np.repeat(start - (np.cumsum(counts) - counts), counts) + np.arange(total)
+                hit = ((self.xs[pair_others] - xs[pair_points]) ** 2
+                       + (self.ys[pair_others] - ys[pair_points]) ** 2 <= radius_sq)
+                points.append(pair_points[hit])
+                others.append(pair_others[hit])
+        if not points:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(points), np.concatenate(others)
+
+    def _keys(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        columns = np.floor(xs / self.radius).astype(np.int64)
+        rows = np.floor(ys / self.radius).astype(np.int64)
+        return (columns + 1) * CELL_STRIDE + (rows + 1)
+
+class SleepSystem:
+    """
+    Puts settled entities to sleep and wakes them on events, so the other systems
+    and the per-object update only pay for entities that are doing something.
+    An entity settles when it is active, at rest, not pregnant, has nothing
+    moving within wake_radius and has been awake for settle_time. It wakes when
+    something moving comes that close, just before its energy or hunger would
+    cross a health threshold (metabolism is linear, so the moment is scheduled
+    when it falls asleep), after max_sleep, or when anything calls wake().
+    Waking settles the metabolism, ageing and cooldowns it missed in one go.
+    """
+    reads = (PhysicsComponent, VitalityComponent, SocialComponent, ReproductionComponent, SleepingComponent)
+    writes = (PhysicsComponent, VitalityComponent, SocialComponent, ReproductionComponent, SleepingComponent)
+
+    def __init__(
+        self,
+        wake_radius: float = 50.0,
+        rest_speed: float = 0.05,
+        max_sleep: float = 30.0,
+        settle_time: float = 1.0,
+        low_energy: float = 25.0,
+        high_hunger: float = 75.0
+    ):
+        self.wake_radius = wake_radius
+        self.rest_speed = rest_speed
+        self.max_sleep = max_sleep
+        # How long a woken entity stays awake at least, so passers-by don't make it toggle every step
+        self.settle_time = settle_time
+        # The thresholds where the VitalitySystem starts taking health
+        self.low_energy = low_energy
+        self.high_hunger = high_hunger
+        # Sleepers and their positions as dense arrays, compacted by swap-remove; they don't move
+        self._sleepers: List[Entity] = []
+        self._sleeper_x: List[float] = []
+        self._sleeper_y: List[float] = []
+        self._slots: Dict[UUID, int] = {}
+        self._grid: Optional[PointGrid] = None  # Rebuilt when the sleepers change
+        # Entity id -> when it last woke, oldest first, kept for settle_time
+        self._woken: "OrderedDict[UUID, float]" = OrderedDict()
+        # (wake time, tie breaker, entity); stale entries are skipped when popped
+        self._timers: List[Tuple[float, int, Entity]] = []
+        self._counter = itertools.count()
+        self._dt: float = 0.0
+
+    @property
+    def sleeping_count(self) -> int:
+        return len(self._sleepers)
+
+    def update(self, context: 'SimulationContext', dt: float) -> None:
+        self._dt = dt
+        woken = self._woken
+        while woken and next(iter(woken.values())) <= context.time - self.settle_time:
+            woken.popitem(last=False)
+        movers, resting, resting_x, resting_y = self._survey(context)
+        self._wake_due(context)
+        if movers is not None:
+            self._wake_near(context, movers)
+        self._settle(context, movers, resting, resting_x, resting_y)
+
+    def wake(self, entity: Entity, context: 'SimulationContext') -> None:
+        """Wake a sleeping entity now, e.g. when something interacts with it"""
+        sleeping = entity.components.get("SleepingComponent")
+        if sleeping is None:
+            return
+        self._forget(entity)
+
+        elapsed = context.time - sleeping.since
+        steps = round(elapsed / self._dt) if self._dt > 0 else 0
+        vitality = entity.components.get("VitalityComponent")
+        if vitality is not None:
+            vitality.age += steps
+            vitality.last_ate += steps
+            vitality.energy = max(0, min(100, vitality.energy - VITALITY_CONFIG["ENERGY_DECAY_RATE"] * elapsed))
+            vitality.hunger = max(0, min(100, vitality.hunger + VITALITY_CONFIG["HUNGER_RATE"] * elapsed))
+        social = entity.components.get("SocialComponent")
+        if social is not None and social.group_id:
+            social.time_in_group += steps
+        reproduction = entity.components.get("ReproductionComponent")
+        if reproduction is not None:
+            reproduction.last_reproduced += steps
+
+        entity.remove_component("SleepingComponent")
+        entity.set_state(EntityState.ACTIVE)
+        context.wake(entity)
+        self._woken.pop(entity.id, None)
+        self._woken[entity.id] = context.time
+
+    def _survey(self, context: 'SimulationContext') -> Tuple[Optional[PointGrid], List[Entity], np.ndarray, np.ndarray]:
+        """The awake entities that are moving, and the ones at rest with their positions"""
+        moving_x: List[np.ndarray] = []
+        moving_y: List[np.ndarray] = []
+        resting: List[Entity] = []
+        resting_x: List[np.ndarray] = []
+        resting_y: List[np.ndarray] = []
+        for entities, bodies in context.query(PhysicsComponent, exclude=(SleepingComponent,)):
+            count = len(bodies)
+            px = np.fromiter((body.position.x for body in bodies), dtype=np.float64, count=count)
+            py = np.fromiter((body.position.y for body in bodies), dtype=np.float64, count=count)
+            vx = np.fromiter((body.velocity.x for body in bodies), dtype=np.float64, count=count)
+            vy = np.fromiter((body.velocity.y for body in bodies), dtype=np.float64, count=count)
+            moving = vx * vx + vy * vy > self.rest_speed * self.rest_speed
+            moving_x.append(px[moving])
+            moving_y.append(py[moving])
+            rest = np.flatnonzero(~moving)
+            resting.extend(entities[index] for index in rest.tolist())
+            resting_x.append(px[rest])
+            resting_y.append(py[rest])
+        empty = np.empty(0)
+        xs = np.concatenate(moving_x) if moving_x else empty
+        movers = PointGrid(xs, np.concatenate(moving_y), self.wake_radius) if len(xs) else None
+        return (movers, resting, np.concatenate(resting_x) if resting_x else empty,
+                np.concatenate(resting_y) if resting_y else empty)
+
+    def _wake_due(self, context: 'SimulationContext') -> None:
+        timers = self._timers
+        while timers and timers[0][0] <= context.time:
+            wake_at, _, entity = heapq.heappop(timers)
+            sleeping = entity.components.get("SleepingComponent")
+            # An entity woken early, or woken and asleep again since, left this entry behind
+            if sleeping is not None and sleeping.wake_at == wake_at:
+                self._wake_or_forget(entity, context)
+
+    def _wake_near(self, context: 'SimulationContext', movers: PointGrid) -> None:
+        """Wake the sleepers a moving entity has come within wake_radius of"""
+        if not self._sleepers:
+            return
+        if self._grid is None:
+            self._grid = PointGrid(np.array(self._sleeper_x), np.array(self._sleeper_y), self.wake_radius)
+        reached = self._grid.reached(movers.xs, movers.ys)
+        for sleeper in [self._sleepers[index] for index in reached.tolist()]:
+            self._wake_or_forget(sleeper, context)
+
+    def _settle(self, context: 'SimulationContext', movers: Optional[PointGrid], resting: List[Entity],
+                xs: np.ndarray, ys: np.ndarray) -> None:
+        """Put to sleep the resting entities with nothing moving nearby"""
+        if not resting:
+            return
+        calm = ~movers.near(xs, ys) if movers is not None else np.ones(len(resting), dtype=bool)
+        settled: List[Tuple[Entity, float, float]] = []
+        for index in np.flatnonzero(calm).tolist():
+            entity = resting[index]
+            if entity.state != EntityState.ACTIVE or entity.id in self._woken:
+                continue
+            # A pending force is about to set it moving: the physics step integrates it after this system
+            acceleration = entity.components["PhysicsComponent"].acceleration
+            if acceleration.x or acceleration.y:
+                continue
+            reproduction = entity.components.get("ReproductionComponent")
+            if reproduction is not None and reproduction.is_pregnant:
+                continue
+            settled.append((entity, float(xs[index]), float(ys[index])))
+
+        # Structural changes wait until the query above is done
+        now = context.time
+        for entity, x, y in settled:
+            wake_at = now + self._time_to_threshold(entity)
+            if wake_at <= now:
+                continue
+            body = entity.components["PhysicsComponent"]
+            body.velocity.x = body.velocity.y = 0.0
+            entity.add_component(SleepingComponent(since=now, wake_at=wake_at))
+            entity.set_state(EntityState.DORMANT)
+            context.sleep(entity)
+            self._slots[entity.id] = len(self._sleepers)
+            self._sleepers.append(entity)
+            self._sleeper_x.append(x)
+            self._sleeper_y.append(y)
+            self._grid = None
+            heapq.heappush(self._timers, (wake_at, next(self._counter), entity))
+
+    def _time_to_threshold(self, entity: Entity) -> float:
+        """Seconds an entity can sleep before its metabolism would need the full simulation"""
+        # Spread over the second half of max_sleep, so entities that settled together don't all wake together
+        seconds = self.max_sleep * random.uniform(0.5, 1.0)
+        vitality = entity.components.get("VitalityComponent")
+        if vitality is not None:
+            seconds = min(
+                seconds,
+                (vitality.energy - self.low_energy) / VITALITY_CONFIG["ENERGY_DECAY_RATE"],
+                (self.high_hunger - vitality.hunger) / VITALITY_CONFIG["HUNGER_RATE"]
+            )
+        return seconds
+
+    def _wake_or_forget(self, entity: Entity, context: 'SimulationContext') -> None:
+        if entity.world is None:
+            # Unregistered while asleep
+            self._forget(entity)
+        else:
+            self.wake(entity, context)
+
+    def _forget(self, entity: Entity) -> None:
+        """Drop a sleeper from the dense arrays, moving the last one into its slot"""
+        slot = self._slots.pop(entity.id, None)
+        if slot is None:
+            return
+        last = self._sleepers.pop()
+        last_x, last_y = self._sleeper_x.pop(), self._sleeper_y.pop()
+        if slot < len(self._sleepers):
+            self._sleepers[slot] = last
+            self._sleeper_x[slot], self._sleeper_y[slot] = last_x, last_y
+            self._slots[last.id] = slot
+        self._grid = None
@@ -0,0 +1,16 @@
+from typing import TYPE_CHECKING
+from app.simulation.components.base import SocialComponent, SleepingComponent
+
+if TYPE_CHECKING:
+    from app.simulation.core.context import SimulationContext
+
+class SocialSystem:
+    """Group time for every awake entity with a SocialComponent; packs work out their bonds when read"""
+    reads = (SocialComponent, SleepingComponent)
+    writes = (SocialComponent,)
+
+    def update(self, context: 'SimulationContext', dt: float) -> None:
+        for entities, socials in context.query(SocialComponent, exclude=(SleepingComponent,)):
+            for entity, social in zip(entities, socials):
+                if social.group_id:
+                    social.update(entity, context, dt)
@@ -0,0 +1,40 @@
+import numpy as np
+from typing import TYPE_CHECKING
+from app.simulation.core import VITALITY_CONFIG
+from app.simulation.components.base import VitalityComponent, SleepingComponent
+
+if TYPE_CHECKING:
+    from app.simulation.core.context import SimulationContext
+
+class VitalitySystem:
+    """Metabolism and health for every awake entity with a VitalityComponent, one NumPy pass per archetype"""
+    reads = (VitalityComponent, SleepingComponent)
+    writes = (VitalityComponent,)
+
+    def update(self, context: 'SimulationContext', dt: float) -> None:
+        for entities, vitals in context.query(VitalityComponent, exclude=(SleepingComponent,)):
+            count = len(vitals)
+            energy = np.fromiter((vital.energy for vital in vitals), dtype=np.float64, count=count)
+            hunger = np.fromiter((vital.hunger for vital in vitals), dtype=np.float64, count=count)
+            health = np.fromiter((vital.health for vital in vitals), dtype=np.float64, count=count)
+
+            # Basic metabolism
+            energy -= VITALITY_CONFIG["ENERGY_DECAY_RATE"] * dt
+            hunger += VITALITY_CONFIG["HUNGER_RATE"] * dt
+
+            # Health effects
+            health -= 0.1 * dt * ((hunger > 75).astype(np.float64) + (energy < 25))
+
+            # Cap values
+            np.clip(energy, 0, 100, out=energy)
+            np.clip(hunger, 0, 100, out=hunger)
+            np.clip(health, 0, 100, out=health)
+
+            for vital, new_energy, new_hunger, new_health in zip(
+                vitals, energy.tolist(), hunger.tolist(), health.tolist()
+            ):
+                vital.age += 1
+                vital.last_ate += 1
+                vital.energy = new_energy
+                vital.hunger = new_hunger
+                vital.health = new_health
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.simulation.core.archetype import ArchetypeStorage
+
+
+def make_entity(*names):
+    return SimpleNamespace(id=uuid4(), components={name: object() for name in names})
+
+
+def test_entities_share_a_table_per_component_set():
+    storage = ArchetypeStorage()
+    a, b = make_entity("Physics", "Vitality"), make_entity("Vitality", "Physics")
+    c = make_entity("Physics")
+    storage.insert_many([a, b])
+    storage.insert(c)
+
+    table = storage.archetype_of(a.id)
+    assert table is storage.archetype_of(b.id) and len(table) == 2
+    assert table.columns["Physics"] == [a.components["Physics"], b.components["Physics"]]
+    assert storage.archetype_of(c.id) is not table
+
+
+def test_queries_are_cached_and_see_new_tables():
+    storage = ArchetypeStorage()
+    storage.insert(make_entity("Physics"))
+    moving = storage.query(frozenset({"Physics"}))
+    awake = storage.query(frozenset({"Physics"}), frozenset({"Sleeping"}))
+    assert len(moving) == 1 and len(awake) == 1
+
+    sleeper = make_entity("Physics", "Sleeping")
+    storage.insert(sleeper)
+    assert storage.query(frozenset({"Physics"})) is moving and len(moving) == 2
+    assert storage.archetype_of(sleeper.id) not in awake
+
+
+def test_adding_and_removing_components_moves_rows():
+    storage = ArchetypeStorage()
+    a, b, c = (make_entity("Physics") for _ in range(3))
+    storage.insert_many([a, b, c])
+    source = storage.archetype_of(a.id)
+
+    a.components["Sleeping"] = object()
+    storage.component_added(a, "Sleeping")
+    target = storage.archetype_of(a.id)
+    assert target.key == {"Physics", "Sleeping"}
+    # The last row filled the gap, and every column stayed aligned with it
+    assert source.entities == [c, b] and source.rows == {c.id: 0, b.id: 1}
+    assert source.columns["Physics"] == [c.components["Physics"], b.components["Physics"]]
+    assert source.add_edges["Sleeping"] is target and target.remove_edges["Sleeping"] is source
+
+    del a.components["Sleeping"]
+    storage.component_removed(a, "Sleeping")
+    assert storage.archetype_of(a.id) is source and len(target) == 0
+
+    # Re-adding a component the entity already has swaps the stored instance in place
+    a.components["Physics"] = replacement = object()
+    storage.component_added(a, "Physics")
+    assert source.columns["Physics"][source.rows[a.id]] is replacement
+
+    storage.remove(b)
+    assert b.id not in storage and len(source) == 2
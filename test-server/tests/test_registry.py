@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.simulation.core.registry import ObjectRegistry
+
+
+class Plant(SimpleNamespace):
+    pass
+
+
+class Rock(SimpleNamespace):
+    pass
+
+
+def make(cls):
+    return cls(id=uuid4())
+
+
+def test_removal_moves_the_last_object_into_the_gap():
+    registry = ObjectRegistry()
+    a, b, c = make(Plant), make(Plant), make(Plant)
+    for obj in (a, b, c):
+        registry.add(obj)
+
+    assert registry.remove(a)
+    assert registry.of_type(Plant) == (c, b)
+    assert registry.index_of(c) == 0 and registry.index_of(b) == 1
+    assert not registry.remove(a)
+    assert a.id not in registry and len(registry) == 2
+
+
+def test_types_are_kept_apart_and_views_are_snapshots():
+    registry = ObjectRegistry()
+    plant, rock = make(Plant), make(Rock)
+    registry.add(plant)
+    registry.add(plant)  # Adding twice is a no-op
+    registry.add(rock)
+
+    view = registry.of_type(Plant)
+    assert view == (plant,) and registry.of_type(Plant) is view
+    assert registry.of_type(Rock) == (rock,)
+
+    second = make(Plant)
+    registry.add(second)
+    assert view == (plant,)
+    assert registry.of_type(Plant) == (plant, second)
+    assert registry.get(second.id) is second
+    assert set(map(id, registry.values())) == {id(plant), id(rock), id(second)}
@@ -0,0 +1,51 @@
+from uuid import uuid4
+
+import pytest
+
+from app.simulation.models.relationships import BOND_GROWTH_RATE, BondMemory, PackRelationships
+
+
+def test_bonds_grow_lazily_and_cap_at_one():
+    pack = PackRelationships(capacity=2)
+    a, b, c = uuid4(), uuid4(), uuid4()
+    pack.add(a, now=0.0)
+    pack.add(b, now=10.0)
+    pack.add(c, now=10.0)  # Grows past the initial capacity
+
+    assert pack.strength(a, b, now=30.0) == pytest.approx(20 * BOND_GROWTH_RATE)
+    assert pack.strength(a, a, now=30.0) == 0.0
+    assert pack.bonds(c, now=10.0 + 2 / BOND_GROWTH_RATE) == {a: 1.0, b: 1.0}
+
+
+def test_members_carry_their_bonds_out_and_back_in():
+    pack = PackRelationships()
+    a, b = uuid4(), uuid4()
+    pack.add(a, now=0.0)
+    pack.add(b, now=0.0)
+
+    bonds = pack.remove(b, now=20.0)
+    assert bonds == {a: pytest.approx(20 * BOND_GROWTH_RATE)}
+    assert b not in pack and len(pack) == 1
+
+    pack.add(b, now=50.0, bonds=bonds)
+    assert pack.strength(b, a, now=60.0) == pytest.approx(30 * BOND_GROWTH_RATE)
+
+
+def test_memories_fade_with_their_half_life_and_are_forgotten():
+    memory = BondMemory(half_life=10.0, forget_below=0.1)
+    other = uuid4()
+    memory.set(other, 0.8, now=0.0)
+    assert memory.get(other, now=10.0) == pytest.approx(0.4)
+    assert memory.items(now=20.0) == {other: pytest.approx(0.2)}
+    assert memory.get(other, now=40.0) == 0.0
+    assert other not in memory
+
+
+def test_full_memory_forgets_the_least_recently_used():
+    memory = BondMemory(capacity=2)
+    a, b, c = uuid4(), uuid4(), uuid4()
+    memory.set(a, 0.5, now=0.0)
+    memory.set(b, 0.5, now=0.0)
+    memory.get(a, now=0.0)
+    assert memory.add(c, 0.7, now=0.0, limit=0.6) == 0.6
+    assert a in memory and b not in memory and len(memory) == 2
@@ -0,0 +1,59 @@
+import threading
+
+from app.simulation.core.scheduler import SystemScheduler
+
+
+class FakeSystem:
+    def __init__(self, name, reads=(), writes=(), log=None):
+        self.name = name
+        self.reads = reads
+        self.writes = writes
+        self.log = log
+
+    def update(self, context, dt):
+        self.log.append((self.name, threading.current_thread().name))
+
+
+class Undeclared:
+    def update(self, context, dt):
+        pass
+
+
+def stage_names(scheduler):
+    return [[system.name if hasattr(system, "name") else "undeclared" for system in stage]
+            for stage in scheduler.stages]
+
+
+def test_systems_are_staged_by_conflicting_access():
+    scheduler = SystemScheduler()
+    scheduler.add(FakeSystem("physics", reads=("Physics",), writes=("Physics",)))
+    scheduler.add(FakeSystem("vitality", reads=("Vitality",), writes=("Vitality",)))
+    scheduler.add(FakeSystem("hunting", reads=("Physics",), writes=("Vitality",)))
+    scheduler.add(FakeSystem("render", reads=("Physics", "Vitality")))
+    assert stage_names(scheduler) == [["physics", "vitality"], ["hunting"], ["render"]]
+
+
+def test_readers_share_a_stage_and_undeclared_systems_stand_alone():
+    scheduler = SystemScheduler()
+    scheduler.add(FakeSystem("a", reads=("Physics",)))
+    scheduler.add(FakeSystem("b", reads=("Physics",)))
+    scheduler.add(Undeclared())
+    scheduler.add(FakeSystem("c", reads=("Social",)))
+    assert stage_names(scheduler) == [["a", "b"], ["undeclared"], ["c"]]
+
+
+def test_run_times_every_system_and_uses_the_pool_for_shared_stages():
+    log = []
+    scheduler = SystemScheduler(max_workers=2)
+    for name, writes in (("Physics", ("Physics",)), ("Social", ("Social",)), ("Sleep", ("Physics", "Social"))):
+        # Timings are keyed by class name
+        system_type = type(f"{name}System", (FakeSystem,), {})
+        scheduler.add(system_type(name, writes=writes, log=log))
+    try:
+        scheduler.run(context=None, dt=0.05)
+    finally:
+        scheduler.shutdown()
+
+    assert set(scheduler.timings) == {"PhysicsSystem", "SocialSystem", "SleepSystem"}
+    assert log[-1][0] == "Sleep" and log[-1][1] == threading.current_thread().name
+    assert all(thread.startswith("system") for name, thread in log[:2])
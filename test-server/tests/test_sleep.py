@@ -0,0 +1,60 @@
+import pytest
+
+from app.simulation.simulation import SimulationManager
+from app.simulation.core import EntityType, Trait, VITALITY_CONFIG
+from app.simulation.models import Entity
+from app.simulation.models.entity import EntityState
+
+
+def settled_plants(count: int = 10) -> SimulationManager:
+    simulation = SimulationManager(800, 600)
+    simulation.add_species("Plants", "#2ECC71", EntityType.PLANT, {Trait.SELF_REPLICATING}, count)
+    step(simulation, 3.0)
+    return simulation
+
+
+def step(simulation: SimulationManager, seconds: float) -> None:
+    for _ in range(round(seconds / simulation.fixed_dt)):
+        simulation.world.update(simulation.fixed_dt)
+
+
+def test_resting_entities_fall_asleep_and_leave_the_update():
+    simulation = settled_plants()
+    entities = simulation.world.get_objects_by_type(Entity)
+    assert simulation.sleep_system.sleeping_count == len(entities) == 10
+    assert all(entity.state == EntityState.DORMANT for entity in entities)
+    assert all(not simulation.world.is_awake(entity) for entity in entities)
+
+
+def test_waking_catches_up_on_the_missed_steps():
+    simulation = settled_plants()
+    world, sleep = simulation.world, simulation.sleep_system
+    entity = world.get_objects_by_type(Entity)[0]
+    vitality = entity.components["VitalityComponent"]
+    since = entity.components["SleepingComponent"].since
+    age, hunger = vitality.age, vitality.hunger
+
+    step(simulation, 0.5)
+    elapsed = world.time - since
+    sleep.wake(entity, world)
+
+    assert "SleepingComponent" not in entity.components and world.is_awake(entity)
+    assert vitality.age == age + round(elapsed / simulation.fixed_dt)
+    assert vitality.hunger == pytest.approx(min(100, hunger + VITALITY_CONFIG["HUNGER_RATE"] * elapsed))
+    assert sleep.sleeping_count == 9
+
+
+def test_something_moving_nearby_wakes_sleepers():
+    simulation = settled_plants(2)
+    world, sleep = simulation.world, simulation.sleep_system
+    mover, sleeper = world.get_objects_by_type(Entity)
+    sleep.wake(mover, world)
+    body = mover.components["PhysicsComponent"]
+    target = sleeper.components["PhysicsComponent"].position
+    body.position.x, body.position.y = target.x + 10, target.y
+    body.velocity.x = 5.0
+
+    world.update(simulation.fixed_dt)
+
+    assert "SleepingComponent" not in sleeper.components
+    assert sleep.sleeping_count == 0
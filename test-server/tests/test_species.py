@@ -0,0 +1,43 @@
+from app.simulation.simulation import SimulationManager
+from app.simulation.core import EntityType, Trait
+from app.simulation.models import Entity, Species
+from app.simulation.models.entity import EntityState
+from app.simulation.factory.component_factory import ComponentFactory
+
+
+def make_simulation() -> SimulationManager:
+    simulation = SimulationManager(800, 600)
+    simulation.add_species("Plants", "#2ECC71", EntityType.PLANT, {Trait.SELF_REPLICATING}, 10)
+    simulation.add_species("Herbivores", "#3498DB", EntityType.CREATURE, {Trait.HERBIVORE, Trait.TWO_PARENTS}, 20)
+    return simulation
+
+
+def test_species_registers_its_population():
+    simulation = make_simulation()
+    entities = simulation.world.get_objects_by_type(Entity)
+    assert len(entities) == 30
+    assert len(simulation.world.get_objects_by_type(Species)) == 2
+    assert all(entity.world is simulation.world for entity in entities)
+
+
+def test_world_steps_with_species_registered():
+    simulation = make_simulation()
+    steps = int(1.5 / simulation.fixed_dt)
+    for _ in range(steps):
+        simulation.world.update(simulation.fixed_dt)
+    assert simulation.world.tick_count == steps
+    # Spawning lasts a second, after which entities are active or asleep
+    states = {entity.state for entity in simulation.world.get_objects_by_type(Entity)}
+    assert EntityState.SPAWNING not in states
+
+
+def test_spawn_template_is_cached_and_complete():
+    template = ComponentFactory.template(EntityType.CREATURE, {Trait.HERBIVORE, Trait.TWO_PARENTS})
+    assert template is ComponentFactory.template(EntityType.CREATURE, {Trait.TWO_PARENTS, Trait.HERBIVORE})
+    assert template.key == {
+        "PhysicsComponent", "VitalityComponent", "SocialComponent", "ReproductionComponent", "HerbivoreComponent"
+    }
+    entity = template.spawn(1, species_id=None, color="#fff")[0]
+    # Physics moves the entity itself
+    assert entity.components["PhysicsComponent"].velocity is entity.velocity
+    assert entity.components["PhysicsComponent"].position is entity.position
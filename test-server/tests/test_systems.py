@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from app.simulation.core import EntityType, Trait
+from app.simulation.core.context import SimulationContext
+from app.simulation.factory.component_factory import ComponentFactory
+from app.simulation.systems import PhysicsSystem, VitalitySystem
+
+
+def make_pair(count: int = 50):
+    """Two worlds holding identical creatures, for comparing the bulk and per-entity steps"""
+    template = ComponentFactory.template(EntityType.CREATURE, {Trait.HERBIVORE})
+    worlds = []
+    rng = random.Random(7)
+    states = [
+        (rng.uniform(0, 200), rng.uniform(0, 100), rng.uniform(-30, 30), rng.uniform(-30, 30),
+         rng.uniform(-50, 50), rng.uniform(-50, 50), rng.uniform(0, 100), rng.uniform(0, 100))
+        for _ in range(count)
+    ]
+    for _ in range(2):
+        world = SimulationContext(200, 100)
+        entities = template.spawn(count, species_id=None, color="#fff")
+        for entity, (x, y, vx, vy, ax, ay, energy, hunger) in zip(entities, states):
+            body = entity.components["PhysicsComponent"]
+            body.position.x, body.position.y = x, y
+            body.velocity.x, body.velocity.y = vx, vy
+            body.acceleration.x, body.acceleration.y = ax, ay
+            vitality = entity.components["VitalityComponent"]
+            vitality.energy, vitality.hunger = energy, hunger
+        world.register_many(entities)
+        worlds.append((world, entities))
+    return worlds
+
+
+def test_bulk_systems_match_the_per_entity_update():
+    (bulk_world, bulk), (single_world, single) = make_pair()
+    dt = 0.05
+    PhysicsSystem().update(bulk_world, dt)
+    VitalitySystem().update(bulk_world, dt)
+    for entity in single:
+        for name in ("PhysicsComponent", "VitalityComponent"):
+            entity.components[name].update(entity, single_world, dt)
+
+    for a, b in zip(bulk, single):
+        body_a, body_b = a.components["PhysicsComponent"], b.components["PhysicsComponent"]
+        assert (body_a.position.x, body_a.position.y) == pytest.approx((body_b.position.x, body_b.position.y))
+        assert (body_a.velocity.x, body_a.velocity.y) == pytest.approx((body_b.velocity.x, body_b.velocity.y))
+        assert (body_a.acceleration.x, body_a.acceleration.y) == (0.0, 0.0)
+        vital_a, vital_b = a.components["VitalityComponent"], b.components["VitalityComponent"]
+        assert (vital_a.energy, vital_a.hunger, vital_a.health, vital_a.age) == pytest.approx(
+            (vital_b.energy, vital_b.hunger, vital_b.health, vital_b.age)
+        )